@@ -1,27 +1,230 @@
 """Entry module for the Analyzer."""
 
+import argparse
 import logging
 import os.path
 import sys
+from typing import Optional
 
+from analyzer.analyze.cache import ParseCache
+from analyzer.analyze.graph import InvocationGraph
+from analyzer.analyze.memory import MemoryBudget
+from analyzer.analyze.options import AnalysisOptions
+from analyzer.analyze.packages import CACHE_PATH as PACKAGES_CACHE_PATH, PackageIndex
+from analyzer.analyze.packages import get_global_folders
 from analyzer.analyze.project import Project
+from analyzer.analyze.snapshot import Snapshot, SnapshotDelta
+from analyzer.batch import BatchAnalysis, get_baseline_path
+from analyzer.daemon import DEFAULT_POLL_INTERVAL, DEFAULT_PORT, serve
+from analyzer.profiler import profiler
 from analyzer.render.documentation import Documentation
+from analyzer.render.export import EXPORTS, FORMATS as EXPORT_FORMATS
+from analyzer.review.incremental import IncrementalReview, get_changed_files
+from analyzer.review.results import FORMATS, NUNIT
+from analyzer.review.review import Review, FINDINGS_FILE, TARGET_DIR as REVIEW_DIR
+from analyzer.review.state import STATE_FILE, ReviewState
+from analyzer.render.sharded import ShardedDocumentation, SHARD_BY_FOLDER, SHARD_BY_WORKFLOW
+
+def parse_arguments(argv) -> argparse.Namespace:
+    """Read the command line options."""
+    parser = argparse.ArgumentParser(prog='analyzer', description=__doc__)
+    parser.add_argument(
+        'target_dir', nargs='?', default=None,
+        help='folder of the project to analyze (default: the parent folder)')
+    parser.add_argument(
+        '--batch', action='store_true',
+        help='analyze every project (folder with a project.json) under the target folder')
+    parser.add_argument(
+        '--jobs', '-j', type=int, default=1,
+        help='number of processes parsing the workflows (0: one per CPU)')
+    parser.add_argument(
+        '--include', metavar='PATTERN', nargs='+', default=None,
+        help='.gitignore-style patterns of the workflow files (default: *.xaml)')
+    parser.add_argument(
+        '--exclude', metavar='PATTERN', nargs='+', default=None,
+        help='.gitignore-style patterns of files and folders to skip, besides the defaults')
+    parser.add_argument(
+        '--no-cache', dest='use_cache', action='store_false',
+        help='parse every workflow, ignoring and not updating the parse cache')
+    parser.add_argument(
+        '--max-memory', metavar='MB', type=int, default=None,
+        help='keep the resident memory within MB: load the workflows in batches, drop them and '
+            'move the rendered documentation and the findings to temporary files when exceeded')
+    parser.add_argument(
+        '--packages', metavar='DIR', nargs='+', default=[],
+        help='folders of .nupkg files to resolve the dependencies from')
+    parser.add_argument(
+        '--global-packages', action='store_true',
+        help='resolve the dependencies from the global packages folder of NuGet '
+            '(NUGET_PACKAGES or ~/.nuget/packages) too, after the --packages folders')
+    parser.add_argument(
+        '--sharded', choices=[SHARD_BY_WORKFLOW, SHARD_BY_FOLDER], default=None,
+        help='write one documentation page per workflow or per folder, with a search index')
+    parser.add_argument(
+        '--review', action='store_true',
+        help='check the project against validationRules.json, fail if any rule is violated')
+    parser.add_argument(
+        '--review-format', choices=FORMATS, default=NUNIT,
+        help='format of the review results in deliverables/review (default: nunit)')
+    parser.add_argument(
+        '--changed-since', metavar='REVISION', default=None,
+        help='review only the workflows changed since the git revision, and their callers; the '
+            'other workflows are not read for the review, but still for the documentation')
+    parser.add_argument(
+        '--changed-files', metavar='FILE', nargs='+', default=None,
+        help='review only these workflows (relative to project.json), and their callers')
+    parser.add_argument(
+        '--baseline', metavar='SNAPSHOT', default=None,
+        help='compare the metrics of the workflows with deliverables/snapshot/metrics.json of '
+            'an earlier run, write the delta; with --review, check it against the baseline rules. '
+            'With --batch: the deliverables folder of an earlier batch run')
+    parser.add_argument(
+        '--graph', action='store_true',
+        help='export the graph of workflow invocations as JSON and DOT')
+    parser.add_argument(
+        '--export', choices=EXPORT_FORMATS, nargs='+', default=[],
+        help='export the workflows, arguments, variables, invocations and selectors into '
+            'deliverables/export, as an SQLite database and/or JSON lines')
+    parser.add_argument(
+        '--serve', metavar='PORT', type=int, nargs='?', const=DEFAULT_PORT, default=None,
+        help='keep the project loaded, watch its files, and serve the documentation and the '
+            f'review on http://127.0.0.1:PORT (default: {DEFAULT_PORT})')
+    parser.add_argument(
+        '--poll-interval', metavar='SECONDS', type=float, default=DEFAULT_POLL_INTERVAL,
+        help=f'how often --serve checks the files for changes (default: {DEFAULT_POLL_INTERVAL})')
+    parser.add_argument(
+        '--profile', action='store_true',
+        help='measure the phases of the analysis, write a report and a Chrome trace')
+    arguments = parser.parse_args(argv)
+    if arguments.baseline is not None:
+        if arguments.batch and not os.path.isdir(arguments.baseline):
+            parser.error('with --batch, --baseline is the deliverables folder of a batch run')
+        # absolute, as a batch analyzes each project in its own output folder
+        arguments.baseline = os.path.abspath(arguments.baseline)
+    return arguments
+
+def get_review(project: Project, arguments: argparse.Namespace,
+        delta: Optional[SnapshotDelta] = None) -> Review:
+    """Review the changed workflows only, if there are findings of an earlier review to reuse."""
+    changed_files = arguments.changed_files
+    if arguments.changed_since is not None:
+        changed_files = get_changed_files(project.project_directory, arguments.changed_since)
+
+    findings_path = os.path.join(REVIEW_DIR, FINDINGS_FILE)
+    if changed_files is None:
+        return Review(project, output_format=arguments.review_format, delta=delta)
+    if not os.path.exists(findings_path):
+        logging.info('No earlier review found in %s, reviewing everything.', findings_path)
+        return Review(project, output_format=arguments.review_format, delta=delta)
+
+    logging.info('Reviewing changes: %s', ', '.join(changed_files))
+    return IncrementalReview(project, changed_files, Review.read_findings(findings_path),
+        output_format=arguments.review_format, delta=delta,
+        previous_state=ReviewState.read(os.path.join(REVIEW_DIR, STATE_FILE)))
+
+def compare_snapshots(project: Project, baseline_path: Optional[str]) -> Optional[SnapshotDelta]:
+    """Write the snapshot of the metrics; compare it with the baseline, if one is given."""
+    # read first, as the baseline may be the snapshot of the previous run in the same place
+    baseline = None if baseline_path is None else Snapshot.read(baseline_path)
+    snapshot = Snapshot.from_project(project)
+    snapshot.write()
+    if baseline is None:
+        return None
+    delta = SnapshotDelta(baseline, snapshot)
+    delta.write()
+    delta.write_terminal_output()
+    return delta
+
+def analyze_project(project: Project, arguments: argparse.Namespace,
+        baseline_path: Optional[str]) -> Optional[Review]:
+    """Write the deliverables of the project; return the review, if one was requested."""
+    with profiler.phase('documentation'):
+        if arguments.sharded is None:
+            Documentation(project)
+        else:
+            ShardedDocumentation(project, arguments.sharded)
+
+    if arguments.graph:
+        with profiler.phase('graph'):
+            InvocationGraph(project).write_deliverables()
+
+    for export_format in arguments.export:
+        with profiler.phase('export'):
+            EXPORTS[export_format](project).export()
+
+    with profiler.phase('snapshot'):
+        delta = compare_snapshots(project, baseline_path)
+
+    if not arguments.review:
+        return None
+    with profiler.phase('review'):
+        review = get_review(project, arguments, delta)
+    with profiler.phase('output'):
+        review.write_deliverable()
+        review.write_terminal_output()
+    return review
+
+def get_batch_baseline(baseline_root: Optional[str], root: str,
+        project: Project) -> Optional[str]:
+    """The baseline of a project of the batch, within the deliverables of an earlier batch run."""
+    if baseline_root is None:
+        return None
+    return get_baseline_path(baseline_root, os.path.abspath(root), project.project_directory)
 
 def main(argv):
     """Entry point for the Analyzer: find the target folder, read project, generate output."""
     logging.basicConfig(level=logging.INFO)
-    if len(argv) != 1:
+    arguments = parse_arguments(argv)
+    if arguments.target_dir is None:
         logging.info(
             "No argument passed: assuming parent dictionary to be the input")
         target_dir = os.path.realpath('..')
     else:
-        target_dir = argv[0]
+        target_dir = arguments.target_dir
     logging.info('Target directory is %s', target_dir)
 
-    project = Project(target_dir)
+    cache = ParseCache() if arguments.use_cache else None
+    budget = None if arguments.max_memory is None else MemoryBudget(arguments.max_memory * 1024)
+    package_folders = [
+        *arguments.packages, *(get_global_folders() if arguments.global_packages else [])]
+    packages = (PackageIndex(package_folders, PACKAGES_CACHE_PATH if arguments.use_cache else None)
+        if package_folders else None)
+    options = AnalysisOptions(jobs=arguments.jobs, cache=cache,
+        include=arguments.include, exclude=arguments.exclude, budget=budget, packages=packages)
+    profiler.enabled = arguments.profile
+    if arguments.batch:
+        def analyze_batch_project(project: Project) -> Optional[Review]:
+            profiler.instrument(project)
+            return analyze_project(project, arguments,
+                get_batch_baseline(arguments.baseline, target_dir, project))
+        batch = BatchAnalysis(target_dir, analyze_batch_project, options)
+        batch.run()
+        # the phases and the files of all projects, in one report
+        profiler.write_report()
+        batch.raise_on_failure()
+        return
+
+    with profiler.phase('discovery'):
+        project = Project(target_dir, options)
+    if arguments.serve is not None:
+        serve(project, arguments.serve, arguments.poll_interval)
+        return
+    profiler.instrument(project)
+    if arguments.profile and budget is None:
+        # parse everything up front, so that the other phases are measured without parsing
+        with profiler.phase('extraction'):
+            project.workflow_files.load_all()
+
+    review = analyze_project(project, arguments, arguments.baseline)
 
-    Documentation(project)
+    if cache is not None:
+        cache.prune()
+    if packages is not None:
+        packages.save()
+    profiler.write_report()
 
+    if review is not None:
+        review.raise_on_failure()
 
 if __name__ == "__main__":
     main(sys.argv[1:])
@@ -0,0 +1,276 @@
+"""List the activity types of a .NET assembly, from its metadata tables (ECMA-335, partition II).
+
+No .NET runtime is needed: the PE headers lead to the CLI metadata, whose tables are read up to
+TypeSpec, the last one needed. A type is taken for an activity if it is a public, concrete
+class deriving - directly, or through other types of the assembly - from a type of another
+assembly named *Activity: the activity classes of System.Activities (Activity, CodeActivity,
+NativeActivity, ...), or the base classes of e.g. UiPath activities. Generic base types, like
+CodeActivity<T>, are read from their signatures.
+"""
+
+import struct
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+CLI_HEADER_DIRECTORY = 14
+METADATA_SIGNATURE = 0x424A5342
+
+# the tables used by the columns of the tables up to TypeSpec, by their number
+MODULE, TYPE_REF, TYPE_DEF, FIELD, METHOD_DEF, PARAM = 0x00, 0x01, 0x02, 0x04, 0x06, 0x08
+INTERFACE_IMPL, MEMBER_REF, DECL_SECURITY, STAND_ALONE_SIG = 0x09, 0x0A, 0x0E, 0x11
+EVENT, PROPERTY, MODULE_REF, TYPE_SPEC, ASSEMBLY = 0x14, 0x17, 0x1A, 0x1B, 0x20
+ASSEMBLY_REF, FILE, EXPORTED_TYPE, MANIFEST_RESOURCE = 0x23, 0x26, 0x27, 0x28
+GENERIC_PARAM, METHOD_SPEC, GENERIC_PARAM_CONSTRAINT = 0x2A, 0x2B, 0x2C
+TABLE_COUNT = 64
+
+# coded indexes: the tables they may refer to, in the order of their tags
+TYPE_DEF_OR_REF = (TYPE_DEF, TYPE_REF, TYPE_SPEC)
+HAS_CONSTANT = (FIELD, PARAM, PROPERTY)
+HAS_CUSTOM_ATTRIBUTE = (
+    METHOD_DEF, FIELD, TYPE_REF, TYPE_DEF, PARAM, INTERFACE_IMPL, MEMBER_REF, MODULE,
+    DECL_SECURITY, PROPERTY, EVENT, STAND_ALONE_SIG, MODULE_REF, TYPE_SPEC, ASSEMBLY,
+    ASSEMBLY_REF, FILE, EXPORTED_TYPE, MANIFEST_RESOURCE, GENERIC_PARAM,
+    GENERIC_PARAM_CONSTRAINT, METHOD_SPEC)
+HAS_FIELD_MARSHAL = (FIELD, PARAM)
+HAS_DECL_SECURITY = (TYPE_DEF, METHOD_DEF, ASSEMBLY)
+MEMBER_REF_PARENT = (TYPE_DEF, TYPE_REF, MODULE_REF, METHOD_DEF, TYPE_SPEC)
+HAS_SEMANTICS = (EVENT, PROPERTY)
+METHOD_DEF_OR_REF = (METHOD_DEF, MEMBER_REF)
+# tags 0, 1 and 4 are not used
+CUSTOM_ATTRIBUTE_TYPE = (None, None, METHOD_DEF, MEMBER_REF, None)
+RESOLUTION_SCOPE = (MODULE, MODULE_REF, ASSEMBLY_REF, TYPE_REF)
+
+# The columns of the tables up to TypeSpec: unsigned integers ('u1', 'u2', 'u4'), heap indexes
+# ('string', 'guid', 'blob'), indexes of a table (its number) or coded indexes (their tables).
+Column = Union[str, int, Tuple[Optional[int], ...]]
+SCHEMA: Sequence[Sequence[Column]] = [
+    ['u2', 'string', 'guid', 'guid', 'guid'],                       # Module
+    [RESOLUTION_SCOPE, 'string', 'string'],                         # TypeRef
+    ['u4', 'string', 'string', TYPE_DEF_OR_REF, FIELD, METHOD_DEF], # TypeDef
+    [FIELD],                                                        # FieldPtr
+    ['u2', 'string', 'blob'],                                       # Field
+    [METHOD_DEF],                                                   # MethodPtr
+    ['u4', 'u2', 'u2', 'string', 'blob', PARAM],                    # MethodDef
+    [PARAM],                                                        # ParamPtr
+    ['u2', 'u2', 'string'],                                         # Param
+    [TYPE_DEF, TYPE_DEF_OR_REF],                                    # InterfaceImpl
+    [MEMBER_REF_PARENT, 'string', 'blob'],                          # MemberRef
+    ['u1', 'u1', HAS_CONSTANT, 'blob'],                             # Constant
+    [HAS_CUSTOM_ATTRIBUTE, CUSTOM_ATTRIBUTE_TYPE, 'blob'],          # CustomAttribute
+    [HAS_FIELD_MARSHAL, 'blob'],                                    # FieldMarshal
+    ['u2', HAS_DECL_SECURITY, 'blob'],                              # DeclSecurity
+    ['u2', 'u4', TYPE_DEF],                                         # ClassLayout
+    ['u4', FIELD],                                                  # FieldLayout
+    ['blob'],                                                       # StandAloneSig
+    [TYPE_DEF, EVENT],                                              # EventMap
+    [EVENT],                                                        # EventPtr
+    ['u2', 'string', TYPE_DEF_OR_REF],                              # Event
+    [TYPE_DEF, PROPERTY],                                           # PropertyMap
+    [PROPERTY],                                                     # PropertyPtr
+    ['u2', 'string', 'blob'],                                       # Property
+    ['u2', METHOD_DEF, HAS_SEMANTICS],                              # MethodSemantics
+    [TYPE_DEF, METHOD_DEF_OR_REF, METHOD_DEF_OR_REF],               # MethodImpl
+    ['string'],                                                     # ModuleRef
+    ['blob'],                                                       # TypeSpec
+]
+FIXED_WIDTHS = {'u1': 1, 'u2': 2, 'u4': 4}
+
+# TypeAttributes
+VISIBILITY_MASK = 0x07
+PUBLIC = 0x01
+INTERFACE = 0x20
+ABSTRACT = 0x80
+# signatures
+ELEMENT_TYPE_GENERICINST = 0x15
+
+ACTIVITY_SUFFIX = 'Activity'
+
+class AssemblyError(ValueError):
+    """The file is not a .NET assembly, or its metadata cannot be read."""
+
+class TypeName(NamedTuple):
+    """The namespace and the name of a type, without the arity of generic types (`1)."""
+    namespace: str
+    name: str
+
+    @property
+    def full_name(self) -> str:
+        """Namespace.Name"""
+        return f'{self.namespace}.{self.name}' if self.namespace else self.name
+
+def read_compressed(data: bytes, offset: int) -> Tuple[int, int]:
+    """Decode a compressed unsigned integer of a blob; return it with the offset after it."""
+    first = data[offset]
+    if first & 0x80 == 0:
+        return first, offset + 1
+    if first & 0xC0 == 0x80:
+        return (first & 0x3F) << 8 | data[offset + 1], offset + 2
+    return (first & 0x1F) << 24 | int.from_bytes(data[offset + 1:offset + 4], 'big'), offset + 4
+
+class MetadataReader():
+    """The tables and heaps of the CLI metadata of an assembly, read up to TypeSpec."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        try:
+            metadata = self._find_metadata()
+            streams = self._read_stream_headers(metadata)
+            self.strings = streams['#Strings']
+            self.blobs = streams.get('#Blob', (0, 0))
+            tables = streams.get('#~', streams.get('#-'))
+            if tables is None:
+                raise AssemblyError('No metadata tables.')
+            self.rows = self._read_tables(tables[0])
+        except (struct.error, IndexError, KeyError) as error:
+            raise AssemblyError(f'Invalid assembly: {error}') from error
+
+    def _rva_to_offset(self, rva: int) -> int:
+        for virtual_address, virtual_size, raw_pointer in self.sections:
+            if virtual_address <= rva < virtual_address + virtual_size:
+                return rva - virtual_address + raw_pointer
+        raise AssemblyError(f'RVA {rva:#x} is outside of the sections.')
+
+    def _find_metadata(self) -> int:
+        """Follow the PE headers to the CLI header, then to the metadata root."""
+        data = self.data
+        if data[:2] != b'MZ':
+            raise AssemblyError('Not a PE file.')
+        pe_offset = struct.unpack_from('<I', data, 0x3C)[0]
+        if data[pe_offset:pe_offset + 4] != b'PE\0\0':
+            raise AssemblyError('Not a PE file.')
+        section_count, optional_header_size = struct.unpack_from('<H12xH', data, pe_offset + 6)
+        optional_header = pe_offset + 24
+        magic = struct.unpack_from('<H', data, optional_header)[0]
+        directories = optional_header + (96 if magic == 0x10B else 112)
+        cli_rva, cli_size = struct.unpack_from('<II', data, directories + 8 * CLI_HEADER_DIRECTORY)
+        if cli_size == 0:
+            raise AssemblyError('Not a .NET assembly.')
+
+        section_table = optional_header + optional_header_size
+        # (virtual address, size, offset in the file) of each section
+        self.sections: List[Tuple[int, int, int]] = [
+            (virtual_address, max(virtual_size, raw_size), raw_pointer)
+            for virtual_size, virtual_address, raw_size, raw_pointer in (
+                struct.unpack_from('<8xIIII', data, section_table + 40 * section)
+                for section in range(section_count))]
+        metadata_rva = struct.unpack_from('<I', data, self._rva_to_offset(cli_rva) + 8)[0]
+        return self._rva_to_offset(metadata_rva)
+
+    def _read_stream_headers(self, metadata: int) -> Dict[str, Tuple[int, int]]:
+        """The streams of the metadata: (offset in the file, size) by name."""
+        data = self.data
+        if struct.unpack_from('<I', data, metadata)[0] != METADATA_SIGNATURE:
+            raise AssemblyError('Invalid metadata signature.')
+        version_length = struct.unpack_from('<I', data, metadata + 12)[0]
+        position = metadata + 16 + version_length
+        stream_count = struct.unpack_from('<H', data, position + 2)[0]
+        position += 4
+        streams = {}
+        for _ in range(stream_count):
+            offset, size = struct.unpack_from('<II', data, position)
+            name_end = data.index(b'\0', position + 8)
+            streams[data[position + 8:name_end].decode('ascii')] = (metadata + offset, size)
+            # names are padded to 4 bytes, including the terminating zero
+            position += 8 + (name_end - position - 8 + 4) // 4 * 4
+        return streams
+
+    def _read_tables(self, position: int) -> Dict[int, List[Tuple[int, ...]]]:
+        """Read the rows of the tables up to TypeSpec, as tuples of column values."""
+        data = self.data
+        heap_sizes = data[position + 6]
+        valid = struct.unpack_from('<Q', data, position + 8)[0]
+        position += 24
+        counts = [0] * TABLE_COUNT
+        for table in range(TABLE_COUNT):
+            if valid >> table & 1:
+                counts[table] = struct.unpack_from('<I', data, position)[0]
+                position += 4
+        if heap_sizes & 0x40:
+            # extra data of uncompressed (#-) tables
+            position += 4
+
+        widths = {
+            **FIXED_WIDTHS,
+            'string': 4 if heap_sizes & 0x01 else 2,
+            'guid': 4 if heap_sizes & 0x02 else 2,
+            'blob': 4 if heap_sizes & 0x04 else 2}
+        def get_width(column: Column) -> int:
+            if isinstance(column, str):
+                return widths[column]
+            if isinstance(column, tuple):
+                tag_bits = (len(column) - 1).bit_length()
+                largest = max(counts[table] for table in column if table is not None)
+                return 2 if largest < 1 << (16 - tag_bits) else 4
+            return 2 if counts[column] < 1 << 16 else 4
+
+        rows: Dict[int, List[Tuple[int, ...]]] = {}
+        for table, columns in enumerate(SCHEMA):
+            row_format = '<' + ''.join(
+                {1: 'B', 2: 'H', 4: 'I'}[get_width(column)] for column in columns)
+            row_size = struct.calcsize(row_format)
+            rows[table] = [
+                struct.unpack_from(row_format, data, position + row_size * row)
+                for row in range(counts[table])]
+            position += row_size * counts[table]
+        return rows
+
+    def get_string(self, index: int) -> str:
+        """A string of the #Strings heap."""
+        start = self.strings[0] + index
+        return self.data[start:self.data.index(b'\0', start)].decode('utf-8', 'replace')
+
+    def get_blob(self, index: int) -> bytes:
+        """A blob of the #Blob heap, without its length."""
+        length, start = read_compressed(self.data, self.blobs[0] + index)
+        return self.data[start:start + length]
+
+    def decode_index(self, value: int, tables: Tuple[Optional[int], ...]) -> Tuple[int, int]:
+        """The table and the row (from 1, 0 for none) of a coded index."""
+        tag_bits = (len(tables) - 1).bit_length()
+        table = tables[value & ((1 << tag_bits) - 1)]
+        return (-1 if table is None else table), value >> tag_bits
+
+    def get_type_name(self, table: int, row: int) -> TypeName:
+        """The name of a type defined (TypeDef) or referenced (TypeRef) by the assembly."""
+        if table == TYPE_DEF:
+            _, name, namespace, *_ = self.rows[TYPE_DEF][row - 1]
+        else:
+            _, name, namespace = self.rows[TYPE_REF][row - 1]
+        return TypeName(self.get_string(namespace), self.get_string(name).split('`')[0])
+
+    def get_base_type(self, type_def: int) -> Tuple[int, int]:
+        """The base type of a TypeDef as a TypeDef or a TypeRef; the generic type of a generic
+        instance (TypeSpec). (-1, 0) if there is none, or it cannot be told."""
+        table, row = self.decode_index(self.rows[TYPE_DEF][type_def - 1][3], TYPE_DEF_OR_REF)
+        if table == TYPE_SPEC and row > 0:
+            signature = self.get_blob(self.rows[TYPE_SPEC][row - 1][0])
+            if len(signature) < 3 or signature[0] != ELEMENT_TYPE_GENERICINST:
+                return -1, 0
+            encoded, _ = read_compressed(signature, 2)
+            table, row = self.decode_index(encoded, TYPE_DEF_OR_REF)
+        if table not in (TYPE_DEF, TYPE_REF) or row == 0:
+            return -1, 0
+        return table, row
+
+def get_activity_types(data: bytes) -> List[str]:
+    """The full names of the activity types of the assembly, in the order of their definition.
+
+    AssemblyError if the data is not a .NET assembly."""
+    reader = MetadataReader(data)
+    # whether a TypeDef derives from an activity, by its row
+    derives: Dict[int, bool] = {}
+    def derives_from_activity(type_def: int) -> bool:
+        if type_def not in derives:
+            # no cycles in valid metadata, but in case
+            derives[type_def] = False
+            table, row = reader.get_base_type(type_def)
+            if table == TYPE_REF:
+                derives[type_def] = reader.get_type_name(table, row).name.endswith(ACTIVITY_SUFFIX)
+            elif table == TYPE_DEF:
+                derives[type_def] = derives_from_activity(row)
+        return derives[type_def]
+
+    return [
+        reader.get_type_name(TYPE_DEF, row).full_name
+        for row, (flags, *_) in enumerate(reader.rows[TYPE_DEF], 1)
+        if flags & VISIBILITY_MASK == PUBLIC and not flags & (INTERFACE | ABSTRACT)
+            and derives_from_activity(row)]
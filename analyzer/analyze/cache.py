@@ -0,0 +1,94 @@
+"""Persistent cache of WorkflowSummary objects, so that unchanged files need no parsing.
+
+Entries are addressed by the hash of the file content and the summary version, so a cache
+entry can be neither stale nor tied to a specific file path.
+"""
+
+from dataclasses import asdict, dataclass
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+from typing import Optional
+
+from analyzer.analyze.extractor import SUMMARY_VERSION, WorkflowSummary, extract_workflow
+
+CACHE_DIR = './deliverables/.cache'
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+ENTRY_EXTENSION = '.json'
+
+@dataclass
+class ParseCache():
+    """Store extracted workflow summaries on disk, in a size-bounded directory.
+
+    Only the directory and the limit are stored, so instances can be passed to worker processes.
+    """
+    directory: str = CACHE_DIR
+    max_size: int = DEFAULT_MAX_SIZE
+
+    @staticmethod
+    def get_key(content: bytes) -> str:
+        """Address the entry by the content of the file, and the version of the summary format."""
+        digest = hashlib.sha256(f'v{SUMMARY_VERSION}:'.encode())
+        digest.update(content)
+        return digest.hexdigest()
+
+    def get_entry_path(self, key: str) -> str:
+        """Get the path of the file storing the cache entry."""
+        return os.path.join(self.directory, key + ENTRY_EXTENSION)
+
+    def load(self, key: str, file_path: str) -> Optional[WorkflowSummary]:
+        """Get the summary from the cache, or None in case of a miss."""
+        entry_path = self.get_entry_path(key)
+        try:
+            with open(entry_path, encoding='utf-8') as entry_file:
+                data = json.load(entry_file)
+            # mark the entry as recently used, for the eviction
+            os.utime(entry_path)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            data['file_path'] = file_path
+            return WorkflowSummary.load(data)
+        except (KeyError, TypeError, ValueError):
+            logging.warning('Ignoring invalid cache entry %s', entry_path)
+            return None
+
+    def store(self, key: str, summary: WorkflowSummary) -> None:
+        """Write the summary into the cache. Concurrent writers may store the same entry."""
+        os.makedirs(self.directory, exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(file_descriptor, 'w', encoding='utf-8') as entry_file:
+            json.dump(asdict(summary), entry_file)
+        os.replace(temporary_path, self.get_entry_path(key))
+
+    def extract(self, file_path: str) -> WorkflowSummary:
+        """Extract the workflow at file_path, unless its content has already been extracted."""
+        with open(file_path, 'rb') as workflow_file:
+            content = workflow_file.read()
+        key = self.get_key(content)
+
+        summary = self.load(key, file_path)
+        if summary is None:
+            summary = extract_workflow(file_path, io.BytesIO(content))
+            self.store(key, summary)
+        return summary
+
+    def prune(self) -> None:
+        """Evict the least recently used entries, until the cache fits into max_size."""
+        if not os.path.isdir(self.directory):
+            return
+
+        with os.scandir(self.directory) as directory_entries:
+            entries = [entry
+                for entry in directory_entries
+                if entry.is_file() and entry.name.endswith(ENTRY_EXTENSION)]
+        total_size = sum(entry.stat().st_size for entry in entries)
+        for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+            if total_size <= self.max_size:
+                break
+            total_size -= entry.stat().st_size
+            os.remove(entry.path)
@@ -0,0 +1,76 @@
+"""Check the arguments passed by InvokeWorkflowFile activities against the invoked workflows.
+
+The signatures (name, direction, type of the arguments) of all workflows are collected into a
+table once; each invocation is then checked with lookups into the table, so the check is linear
+in the number of invocations and passed arguments, and no invoked workflow is read again.
+"""
+
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from analyzer.analyze.index import normalize_relative_path
+from analyzer.analyze.records import ArgumentDirection, PassedArgumentRecord
+from analyzer.analyze.workflow import Workflow
+
+class Parameter(NamedTuple):
+    """An argument of the invoked workflow, as seen by its callers."""
+    direction: str
+    type: str
+    # In and InOut arguments must be passed, unless they have a default value
+    required: bool
+
+# the parameters of a workflow by their names
+Signature = Dict[str, Parameter]
+
+class ContractViolations(NamedTuple):
+    """How an invocation breaks the contract of the invoked workflow.
+
+    Each issue is described by the argument name and the details, e.g. in_Config (In String)."""
+    missing: Tuple[str, ...] = ()
+    extra: Tuple[str, ...] = ()
+    directions: Tuple[str, ...] = ()
+    types: Tuple[str, ...] = ()
+
+def compare_types(passed_type: str, declared_type: str) -> bool:
+    """Types are compared without namespace prefixes (see normalize_type) and spaces."""
+    return passed_type.replace(' ', '') == declared_type.replace(' ', '')
+
+def check_invocation(signature: Signature,
+        passed_arguments: Iterable[PassedArgumentRecord]) -> ContractViolations:
+    """Compare the arguments passed by an invocation with the signature of the invoked workflow."""
+    passed_names = set()
+    extra, directions, types = [], [], []
+    for passed in passed_arguments:
+        passed_names.add(passed.name)
+        parameter = signature.get(passed.name)
+        if parameter is None:
+            extra.append(passed.name)
+        elif parameter.direction != passed.direction:
+            directions.append(f'{passed.name} ({passed.direction}, not {parameter.direction})')
+        elif not compare_types(passed.type, parameter.type):
+            types.append(f'{passed.name} ({passed.type}, not {parameter.type})')
+    missing = [
+        f'{name} ({parameter.direction} {parameter.type})'
+        for name, parameter in signature.items()
+        if parameter.required and name not in passed_names]
+    return ContractViolations(tuple(missing), tuple(extra), tuple(directions), tuple(types))
+
+def get_signature(workflow: Workflow) -> Signature:
+    """The arguments of a workflow, as seen by its callers."""
+    return {
+        argument.name: Parameter(
+            argument.direction, argument.type,
+            argument.direction != ArgumentDirection.out_arg and argument.default_value is None)
+        for argument in workflow.get_arguments()}
+
+class SignatureTable():
+    """The signatures of all workflows of the project, by their path relative to project.json."""
+
+    def __init__(self, signatures: Dict[str, Signature]):
+        self.signatures = signatures
+
+    def get(self, invoked_path: str) -> Optional[Signature]:
+        """The signature of an invoked workflow; None if it is not part of the project."""
+        return self.signatures.get(normalize_relative_path(invoked_path))
+
+    def __len__(self) -> int:
+        return len(self.signatures)
@@ -0,0 +1,151 @@
+"""Find the workflow files of a project with a single os.scandir walk.
+
+Excluded directories (screenshots, git objects, node_modules, etc.) are pruned before
+descending into them. Patterns follow the .gitignore syntax; the .gitignore files of the
+project are honored as well, each relative to its own directory.
+"""
+
+import os
+import re
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+GITIGNORE_FILE = '.gitignore'
+DEFAULT_INCLUDE = ['*.xaml']
+DEFAULT_EXCLUDE = [
+    # hidden entries: .git, .screenshots, .local, .objects, .tmh, .settings, ...
+    '.*',
+    'node_modules/',
+    # output of the analyzer
+    'deliverables/',
+    # As the analyzer can be checked out within the to-be-analyzed project,
+    # its own test files are to be excluded.
+    '**/tests/assets/',
+]
+
+class DiscoveredFile(NamedTuple):
+    """A file found by the discovery, with the size and modification time seen by the walk."""
+    path: str
+    size: int
+    mtime_ns: int = 0
+
+class IgnoreRule(NamedTuple):
+    """A compiled .gitignore-style pattern; it applies within the base directory only."""
+    regex: re.Pattern
+    negated: bool
+    directory_only: bool
+    # relative to the project, '' or ending with '/'
+    base: str
+
+def translate_pattern(pattern: str) -> str:
+    """Translate the glob of a .gitignore line into a regular expression.
+
+    * and ? do not match '/', ** matches any number of directories."""
+    parts = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if pattern.startswith('**/', index):
+            parts.append('(?:.*/)?')
+            index += 3
+            continue
+        if pattern.startswith('/**', index) and index + 3 == len(pattern):
+            parts.append('/.*')
+            index += 3
+            continue
+        if pattern.startswith('**', index):
+            parts.append('.*')
+            index += 2
+            continue
+        if char == '*':
+            parts.append('[^/]*')
+        elif char == '?':
+            parts.append('[^/]')
+        elif char == '[' and pattern.find(']', index + 2) != -1:
+            # a ] right after [ is part of the set
+            end = pattern.find(']', index + 2)
+            content = pattern[index + 1:end].replace('\\', '\\\\').replace('[', '\\[')
+            if content.startswith('!'):
+                content = '^' + content[1:]
+            parts.append(f'[{content}]')
+            index = end
+        elif char == '\\' and index + 1 < len(pattern):
+            index += 1
+            parts.append(re.escape(pattern[index]))
+        else:
+            parts.append(re.escape(char))
+        index += 1
+    return ''.join(parts)
+
+def compile_patterns(patterns: Sequence[str], base: str = '') -> List[IgnoreRule]:
+    """Compile .gitignore-style lines; comments and blank lines are skipped."""
+    rules = []
+    for line in patterns:
+        pattern = line.rstrip('\n')
+        if not pattern.endswith('\\ '):
+            pattern = pattern.rstrip()
+        if pattern == '' or pattern.startswith('#'):
+            continue
+
+        negated = pattern.startswith('!')
+        if negated:
+            pattern = pattern[1:]
+        directory_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+        # a pattern without a slash (except a trailing one) matches at any depth
+        anchored = '/' in pattern
+        regex = translate_pattern(pattern.lstrip('/'))
+        if not anchored:
+            regex = '(?:.*/)?' + regex
+        rules.append(IgnoreRule(re.compile(regex), negated, directory_only, base))
+    return rules
+
+def is_matched(rules: Sequence[IgnoreRule], relative_path: str, is_directory: bool) -> bool:
+    """Decide by the rules whether the path matches: the last matching rule wins."""
+    matched = False
+    for rule in rules:
+        if rule.directory_only and not is_directory:
+            continue
+        if not relative_path.startswith(rule.base):
+            continue
+        if rule.regex.fullmatch(relative_path[len(rule.base):]) is not None:
+            matched = not rule.negated
+    return matched
+
+def read_gitignore(directory: str, base: str) -> List[IgnoreRule]:
+    """Compile the .gitignore file of the directory, if there is one."""
+    try:
+        with open(os.path.join(directory, GITIGNORE_FILE), encoding='utf-8') as gitignore:
+            return compile_patterns(gitignore.readlines(), base)
+    except OSError:
+        return []
+
+def discover_files(project_directory: str, include: Optional[Sequence[str]] = None,
+        exclude: Optional[Sequence[str]] = None,
+        use_gitignore: bool = True) -> List[DiscoveredFile]:
+    """List the files of the project matching include and none of the exclude patterns.
+
+    Both pattern lists are in the .gitignore syntax, relative to project_directory; the exclude
+    patterns are added to DEFAULT_EXCLUDE. Symbolic links to directories are not followed.
+    The files are sorted by path."""
+    include_rules = compile_patterns(DEFAULT_INCLUDE if include is None else include)
+    exclude_rules = compile_patterns([*DEFAULT_EXCLUDE, *(exclude or [])])
+
+    found = []
+    # directories still to be walked: (path, path relative to the project, exclude rules)
+    pending: List[Tuple[str, str, List[IgnoreRule]]] = [(project_directory, '', exclude_rules)]
+    while pending:
+        directory, relative_directory, rules = pending.pop()
+        if use_gitignore:
+            rules = rules + read_gitignore(directory, relative_directory)
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                relative_path = relative_directory + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if not is_matched(rules, relative_path, True):
+                        pending.append((entry.path, relative_path + '/', rules))
+                elif (entry.is_file()
+                        and is_matched(include_rules, relative_path, False)
+                        and not is_matched(rules, relative_path, False)):
+                    stat = entry.stat()
+                    found.append(DiscoveredFile(entry.path, stat.st_size, stat.st_mtime_ns))
+    return sorted(found)
@@ -0,0 +1,52 @@
+"""Tokenize the VB and C# expressions of a workflow into the identifiers they use.
+
+Expressions are written in brackets into attributes and argument elements, e.g.
+Condition="[Not String.IsNullOrEmpty(in_Name)]", or into CSharpValue/CSharpReference elements.
+Only the identifiers which may refer to a variable or an argument are kept: string literals,
+numbers and members (the Name of row.Name) are skipped, and each identifier is listed once.
+The same expressions are repeated all over a project, so each distinct one is tokenized once.
+"""
+
+from functools import lru_cache
+import re
+import sys
+from typing import Dict, Optional, Tuple
+
+VB = 'VB'
+CSHARP = 'C#'
+
+# a member (.Name, or row!Name in VB) is not a variable, neither are numbers like 1e5
+TOKEN_REGEX = {
+    VB: re.compile(r'''
+        (?P<string>\$?"(?:[^"]|"")*"?c?)
+        | [.!]\s*[A-Za-z_]\w*
+        | \d[\w.]*
+        | (?P<identifier>[A-Za-z_]\w*)''', re.VERBOSE),
+    CSHARP: re.compile(r'''
+        (?P<string>\$?@?"(?:[^"\\]|\\.|"")*"?|'(?:[^'\\]|\\.)*')
+        | \.\s*[A-Za-z_]\w*
+        | \d[\w.]*
+        | @?(?P<identifier>[A-Za-z_]\w*)''', re.VERBOSE),
+}
+# the expressions within an interpolated string: $"Hello {name}" or {count:D2}, but not {{
+INTERPOLATION_REGEX = re.compile(r'(?<!\{)\{([^{}]+?)(?::[^{}()"]*)?\}')
+
+def get_expression(value: str) -> Optional[str]:
+    """The expression within the brackets of a value, e.g. [in_Name]; None for literals."""
+    stripped = value.strip()
+    if len(stripped) > 1 and stripped[0] == '[' and stripped[-1] == ']':
+        return stripped[1:-1]
+    return None
+
+@lru_cache(maxsize=None)
+def tokenize_expression(expression: str, language: str = VB) -> Tuple[str, ...]:
+    """The distinct identifiers of the expression, in the order of their first use."""
+    identifiers: Dict[str, None] = {}
+    for match in TOKEN_REGEX[language].finditer(expression):
+        identifier, string = match.group('identifier'), match.group('string')
+        if identifier is not None:
+            identifiers[sys.intern(identifier)] = None
+        elif string is not None and string.startswith('$'):
+            for hole in INTERPOLATION_REGEX.findall(string):
+                identifiers.update(dict.fromkeys(tokenize_expression(hole, language)))
+    return tuple(identifiers)
@@ -0,0 +1,322 @@
+"""Single-pass extraction of the workflow parts needed by the analysis.
+
+The XAML file is read with iterparse, and every element is cleared as soon as it has been
+processed, so that even several MB large workflows are processed with a flat memory profile,
+instead of keeping (and repeatedly traversing) the entire tree.
+"""
+
+from dataclasses import dataclass, field
+import sys
+from typing import Any, BinaryIO, Dict, List, Optional, Union
+
+import lxml.etree as ET
+
+from analyzer.analyze.expressions import CSHARP, VB, get_expression, tokenize_expression
+from analyzer.analyze.metrics import (
+    ID_REF_ATTRIBUTE, ActivityMetrics, MetricsCollector, local_name)
+from analyzer.analyze.namespaces import default_namespaces
+from analyzer.analyze.records import (
+    DIRECTION_PREFIXES, ArgumentDirection, ArgumentRecord, DelegateArgumentRecord,
+    InvocationRecord, PassedArgumentRecord, ScopeRecord, SelectorRecord, UsageRecord,
+    VariableRecord, get_direction, get_type, intern, normalize_type)
+
+ARGUMENT_TAG = f'{{{default_namespaces["x"]}}}Property'
+MEMBERS_TAG = f'{{{default_namespaces["x"]}}}Members'
+VARIABLE_TAG = f'{{{default_namespaces["wf"]}}}Variable'
+DELEGATE_ARGUMENT_TAGS = frozenset([
+    f'{{{default_namespaces["wf"]}}}DelegateInArgument',
+    f'{{{default_namespaces["wf"]}}}DelegateOutArgument'])
+# expressions of C# workflows, written as the text of the element
+CSHARP_EXPRESSION_TAGS = frozenset(['CSharpValue', 'CSharpReference'])
+LANGUAGE_ATTRIBUTE = 'ExpressionActivityEditor.ExpressionActivityEditor'
+INVOKE_TAG = f'{{{default_namespaces["ui"]}}}InvokeWorkflowFile'
+INVOKE_ARGUMENTS_TAG = f'{INVOKE_TAG}.Arguments'
+KEY_ATTRIBUTE = f'{{{default_namespaces["x"]}}}Key'
+ARGUMENT_DEFAULT_PREFIX = f'{{{default_namespaces["this"]}}}'
+ANNOTATION_ATTRIBUTE = f'{{{default_namespaces["presentation2010"]}}}Annotation.AnnotationText'
+TYPE_ARGUMENTS_ATTRIBUTE = f'{{{default_namespaces["x"]}}}TypeArguments'
+
+# To be increased whenever WorkflowSummary or its extraction changes, invalidating cached summaries.
+SUMMARY_VERSION = 7
+
+@dataclass
+class WorkflowSummary():  # pylint: disable=too-many-instance-attributes
+    """Everything the analysis needs from a workflow file, as plain (picklable) data."""
+    # Flat on purpose: one field per part of the workflow, stored as is in the parse cache.
+    file_path: str
+    root_activity_tag: Optional[str] = None
+    root_activity_attributes: Dict[str, str] = field(default_factory=dict)
+    arguments: List[ArgumentRecord] = field(default_factory=list)
+    variables: List[VariableRecord] = field(default_factory=list)
+    invocations: List[InvocationRecord] = field(default_factory=list)
+    selectors: List[SelectorRecord] = field(default_factory=list)
+    activity_metrics: ActivityMetrics = field(
+        default_factory=lambda: ActivityMetrics({}, 0, (), ()))
+    element_count: int = 0
+    # language of the expressions: VB or C#
+    language: str = VB
+    scopes: List[ScopeRecord] = field(default_factory=lambda: [ScopeRecord(-1, 'Activity')])
+    delegate_arguments: List[DelegateArgumentRecord] = field(default_factory=list)
+    usages: List[UsageRecord] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, data: Dict[str, Any]) -> 'WorkflowSummary':
+        """Restore a summary from its JSON form (see dataclasses.asdict), e.g. from the cache."""
+        data['root_activity_tag'] = intern(data['root_activity_tag'])
+        data['arguments'] = list(map(ArgumentRecord.load, data['arguments']))
+        data['variables'] = list(map(VariableRecord.load, data['variables']))
+        data['invocations'] = list(map(InvocationRecord.load, data['invocations']))
+        data['selectors'] = list(map(SelectorRecord.load, data['selectors']))
+        data['activity_metrics'] = ActivityMetrics.load(data['activity_metrics'])
+        data['scopes'] = list(map(ScopeRecord.load, data['scopes']))
+        data['delegate_arguments'] = list(
+            map(DelegateArgumentRecord.load, data['delegate_arguments']))
+        data['usages'] = list(map(UsageRecord.load, data['usages']))
+        return cls(**data)
+
+def _is_root_activity_candidate(element: ET.Element) -> bool:
+    """See Workflow.get_root_activity(): first wf:* child of Activity not being a TextExpression."""
+    return (isinstance(element.tag, str)
+        and element.tag.startswith(f'{{{default_namespaces["wf"]}}}')
+        and not 'TextExpression' in element.tag)
+
+def _clear(element: ET.Element) -> None:
+    """Free the processed element, and its already processed siblings."""
+    element.clear(keep_tail=True)
+    parent = element.getparent()
+    if parent is not None:
+        while element.getprevious() is not None:
+            del parent[0]
+
+class ScopeCollector():
+    """Number the elements enclosing declarations or expressions as nodes, with their parents.
+
+    The declarations of an activity may follow its expressions (e.g. the Variables of a
+    StateMachine come after its States), so nodes are mapped to scopes once it is known which
+    of them declare anything."""
+
+    def __init__(self):
+        # the node of each open element, if numbered yet
+        self.node_stack: List[Optional[int]] = []
+        # the parent of each node, and the owners of the declaring nodes
+        self.node_parents: List[int] = []
+        self.declaring_nodes: Dict[int, ScopeRecord] = {}
+
+    def start(self) -> None:
+        """An element is entered."""
+        self.node_stack.append(None)
+
+    def end(self) -> None:
+        """An element is left."""
+        self.node_stack.pop()
+
+    def get_node(self, position: int) -> int:
+        """Number the open element at position in the stack, and its ancestors if needed."""
+        if self.node_stack[position] is not None:
+            return self.node_stack[position]
+        first = position
+        while first > 0 and self.node_stack[first - 1] is None:
+            first -= 1
+        for current in range(first, position + 1):
+            self.node_stack[current] = len(self.node_parents)
+            self.node_parents.append(-1 if current == 0 else self.node_stack[current - 1])
+        return self.node_stack[position]
+
+    def declare(self, position: int, owner: ET.Element) -> int:
+        """Make the open element at position, owning a declaration, a scope. Return its node."""
+        node = self.get_node(position)
+        if node not in self.declaring_nodes:
+            self.declaring_nodes[node] = ScopeRecord(
+                self.node_parents[node], sys.intern(local_name(owner.tag)),
+                owner.attrib.get('DisplayName'), owner.attrib.get(ID_REF_ATTRIBUTE))
+        return node
+
+    def map_scopes(self, summary: WorkflowSummary) -> None:
+        """Keep the declaring nodes as scopes, and refer to the scopes instead of the nodes."""
+        scopes = summary.scopes
+        node_scopes: List[int] = []
+        for node, parent in enumerate(self.node_parents):
+            parent_scope = 0 if parent < 0 else node_scopes[parent]
+            if node in self.declaring_nodes and parent >= 0:
+                node_scopes.append(len(scopes))
+                scopes.append(self.declaring_nodes[node]._replace(parent=parent_scope))
+            else:
+                node_scopes.append(parent_scope)
+        summary.variables = [
+            variable._replace(scope=node_scopes[variable.scope]) for variable in summary.variables]
+        summary.delegate_arguments = [
+            argument._replace(scope=node_scopes[argument.scope])
+            for argument in summary.delegate_arguments]
+        summary.usages = [
+            usage._replace(scope=node_scopes[usage.scope]) for usage in summary.usages]
+
+class WorkflowExtractor():
+    """Collect the WorkflowSummary from the start events of a single iterparse pass."""
+
+    def __init__(self, file_path: str):
+        self.summary = WorkflowSummary(file_path)
+        self.metrics = MetricsCollector()
+        # Elements currently open: the ancestors of the one being processed.
+        self.stack: List[ET.Element] = []
+        self.scopes = ScopeCollector()
+        self.root_activity: Optional[ET.Element] = None
+        # this:Class.argument attributes of the document element
+        self.argument_defaults: Dict[str, str] = {}
+        # the arguments passed by the InvokeWorkflowFile being processed (None if unknown)
+        self.passed_arguments: Optional[List[PassedArgumentRecord]] = None
+
+    def start(self, element: ET.Element) -> None:
+        """Process an element whose attributes (but not yet its children) are available."""
+        depth = len(self.stack)
+        self.stack.append(element)
+        self.scopes.start()
+        self.summary.element_count += 1
+        if not isinstance(element.tag, str):
+            # comments and processing instructions
+            return
+
+        if depth == 0:
+            self.argument_defaults = {
+                name: value for name, value in element.attrib.items()
+                if name.startswith(ARGUMENT_DEFAULT_PREFIX)}
+            if any(local_name(name) == LANGUAGE_ATTRIBUTE and value == CSHARP
+                    for name, value in element.attrib.items()):
+                self.summary.language = CSHARP
+        elif depth == 1:
+            if self.summary.root_activity_tag is None and _is_root_activity_candidate(element):
+                self.root_activity = element
+                self.summary.root_activity_tag = sys.intern(element.tag)
+                self.summary.root_activity_attributes = dict(element.attrib)
+        elif depth == 2 and element.tag == ARGUMENT_TAG and self.stack[1].tag == MEMBERS_TAG:
+            self._add_argument(element)
+
+        if element.tag == VARIABLE_TAG:
+            attributes = element.attrib
+            self.summary.variables.append(VariableRecord(
+                attributes.get('Name', ''),
+                sys.intern(attributes.get(TYPE_ARGUMENTS_ATTRIBUTE, '')),
+                attributes.get('Default', ''),
+                attributes.get(ANNOTATION_ATTRIBUTE, ''),
+                self._declare()))
+        elif element.tag in DELEGATE_ARGUMENT_TAGS and 'Name' in element.attrib:
+            self.summary.delegate_arguments.append(
+                DelegateArgumentRecord(element.attrib['Name'], self._declare()))
+        if self.root_activity is not None:
+            self._start_within_root_activity(element)
+        if 'Selector' in element.attrib:
+            self._add_selector(element)
+
+    def _declare(self) -> int:
+        """The declaration being processed (e.g. Sequence > Sequence.Variables > Variable)
+        makes its owner a scope. Return the node of the owner."""
+        owner = max(0, len(self.stack) - 3)
+        return self.scopes.declare(owner, self.stack[owner])
+
+    def _add_usage(self, expression: str) -> None:
+        """Record the identifiers of the expression, in the innermost scope."""
+        identifiers = tokenize_expression(expression, self.summary.language)
+        if len(identifiers) == 0:
+            return
+        id_ref = next(
+            (ancestor.attrib[ID_REF_ATTRIBUTE] for ancestor in reversed(self.stack)
+                if ID_REF_ATTRIBUTE in ancestor.attrib),
+            None)
+        self.summary.usages.append(
+            UsageRecord(self.scopes.get_node(len(self.stack) - 1), id_ref, identifiers))
+
+    def _add_argument(self, element: ET.Element) -> None:
+        """Properties of other than argument types are not arguments, they are skipped."""
+        attributes = element.attrib
+        raw_type = attributes.get('Type', '')
+        direction, argument_type = get_direction(raw_type), get_type(raw_type)
+        if direction is None or argument_type is None:
+            return
+
+        name = attributes.get('Name')
+        default_value = None
+        if direction == ArgumentDirection.in_arg:
+            # the attribute is this:Class.name; the class is not necessarily the file name
+            default_value = next(
+                (value for key, value in self.argument_defaults.items()
+                    if key.endswith(f'.{name}')),
+                None)
+        self.summary.arguments.append(ArgumentRecord(
+            name, direction, argument_type, attributes.get(ANNOTATION_ATTRIBUTE), default_value))
+
+    def _start_within_root_activity(self, element: ET.Element) -> None:
+        self.metrics.start(element)
+        for name, value in element.attrib.items():
+            # DisplayName and the namespaced attributes, like annotations, are not expressions
+            if value[:1] == '[' and name != 'DisplayName' and name[0] != '{':
+                expression = get_expression(value)
+                if expression is not None:
+                    self._add_usage(expression)
+        if element.tag == INVOKE_TAG and 'WorkflowFileName' in element.attrib:
+            self.summary.invocations.append(InvocationRecord(
+                str(element.attrib['WorkflowFileName']).replace('\\', '/'),
+                element.attrib.get('DisplayName'),
+                element.attrib.get(ID_REF_ATTRIBUTE)))
+            arguments_variable = element.attrib.get('ArgumentsVariable', '{x:Null}')
+            self.passed_arguments = [] if arguments_variable == '{x:Null}' else None
+        elif (self.passed_arguments is not None
+                and len(self.stack) > 2 and self.stack[-2].tag == INVOKE_ARGUMENTS_TAG
+                and self.stack[-3].tag == INVOKE_TAG):
+            direction = DIRECTION_PREFIXES.get(local_name(element.tag))
+            if direction is not None and KEY_ATTRIBUTE in element.attrib:
+                self.passed_arguments.append(PassedArgumentRecord(
+                    element.attrib[KEY_ATTRIBUTE], direction,
+                    normalize_type(element.attrib.get(TYPE_ARGUMENTS_ATTRIBUTE, ''))))
+
+    def _add_selector(self, element: ET.Element) -> None:
+        """Selectors may be set on a Target, in this case the first other ancestor is the owner."""
+        owner = next(
+            ancestor for ancestor in reversed(self.stack)
+            if not ancestor.tag.endswith('Target'))
+        self.summary.selectors.append(SelectorRecord(
+            sys.intern(owner.tag), owner.attrib.get('DisplayName'),
+            owner.attrib.get(ID_REF_ATTRIBUTE), element.attrib['Selector']))
+
+    def end(self, element: ET.Element) -> None:
+        """Process an element with all its children, then free it."""
+        if self.root_activity is not None and len(element) == 0:
+            text = element.text
+            if text is not None and isinstance(element.tag, str):
+                expression = (text
+                    if local_name(element.tag) in CSHARP_EXPRESSION_TAGS
+                    else get_expression(text))
+                if expression is not None:
+                    self._add_usage(expression)
+        self.stack.pop()
+        self.scopes.end()
+        if self.root_activity is not None:
+            self.metrics.end(element)
+            # invocations do not nest: this is the one being processed
+            if element.tag == INVOKE_TAG and 'WorkflowFileName' in element.attrib:
+                self.summary.invocations[-1] = self.summary.invocations[-1]._replace(
+                    arguments=None if self.passed_arguments is None
+                        else tuple(self.passed_arguments))
+                self.passed_arguments = None
+        if element is self.root_activity:
+            self.root_activity = None
+        _clear(element)
+
+    def finish(self) -> WorkflowSummary:
+        """Return the summary once the entire document is processed."""
+        self.summary.activity_metrics = self.metrics.finish()
+        self.scopes.map_scopes(self.summary)
+        return self.summary
+
+def extract_workflow(
+        file_path: str, source: Optional[Union[str, BinaryIO]] = None) -> WorkflowSummary:
+    """Read the file once, collecting all parts of the workflow needed for the analysis.
+
+    The content may be passed as source, in case it has already been read from file_path."""
+    extractor = WorkflowExtractor(file_path)
+    for event, element in ET.iterparse(
+            source if source is not None else file_path, events=('start', 'end'),
+            recover=True, resolve_entities=False):
+        if event == 'start':
+            extractor.start(element)
+        else:
+            extractor.end(element)
+    return extractor.finish()
@@ -0,0 +1,193 @@
+"""Contains InvocationGraph: which workflow invokes which, across the entire Project.
+
+Workflows are identified by their path relative to project.json, with '/' separators.
+"""
+
+from collections import deque
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from analyzer.analyze.expressions import get_expression
+from analyzer.analyze.index import normalize_relative_path
+from analyzer.analyze.project import Project
+
+TARGET_DIR  = './deliverables/graph'
+TARGET_FILE_JSON = 'InvocationGraph.json'
+TARGET_FILE_DOT = 'InvocationGraph.dot'
+
+class InvocationGraph():
+    """Graph of InvokeWorkflowFile references, built once in O(V+E).
+
+    Invoked files not found in the project are kept as missing references instead of nodes.
+    Files invoked by an expression, e.g. [Row("WorkflowFile").ToString], are only known when
+    the workflow runs: these are kept as dynamic invocations, and not drawn.
+    """
+
+    def __init__(self, project: Project, references: Optional[Dict[str, Iterable[str]]] = None):
+        """references are the paths invoked by each workflow, by its path, in the order of the
+        index; unless given (e.g. by a review reusing them), they are read from the workflows."""
+        self.project = project
+        self.nodes: List[str] = []
+        self.edges: Dict[str, List[str]] = {}
+        self.callers: Dict[str, List[str]] = {}
+        self.missing: Dict[str, List[str]] = {}
+        self.dynamic: Dict[str, List[str]] = {}
+
+        if references is None:
+            index = project.workflow_files
+            references = {
+                index.get_relative_path(workflow.file_path): list(
+                    workflow.get_referenced_workflows())
+                for workflow in index}
+        for node in references:
+            self.nodes.append(node)
+            self.edges[node] = []
+            self.callers[node] = []
+
+        for caller, invoked in references.items():
+            paths = dict.fromkeys(invoked)
+            expressions = [path for path in paths if get_expression(path) is not None]
+            if expressions:
+                self.dynamic[caller] = expressions
+            # each callee is counted once per caller, even if invoked several times
+            for callee in dict.fromkeys(normalize_relative_path(path)
+                    for path in paths if get_expression(path) is None):
+                if callee in self.callers:
+                    self.edges[caller].append(callee)
+                    self.callers[callee].append(caller)
+                else:
+                    self.missing.setdefault(caller, []).append(callee)
+
+    def get_entry_points(self) -> List[str]:
+        """The main workflow of a process; every workflow of a library may be public."""
+        if self.project.main is not None:
+            main = normalize_relative_path(self.project.main)
+            return [main] if main in self.edges else []
+        return list(self.nodes)
+
+    def get_reachable(self, entry_points: Optional[Iterable[str]] = None) -> Set[str]:
+        """Workflows invoked directly or indirectly from the entry points (breadth-first)."""
+        if entry_points is None:
+            entry_points = self.get_entry_points()
+        reached = {node for node in entry_points if node in self.edges}
+        queue = deque(reached)
+        while queue:
+            for callee in self.edges[queue.popleft()]:
+                if callee not in reached:
+                    reached.add(callee)
+                    queue.append(callee)
+        return reached
+
+    def get_unreachable(self, entry_points: Optional[Iterable[str]] = None) -> List[str]:
+        """Workflows that can never be invoked starting from the entry points."""
+        reached = self.get_reachable(entry_points)
+        return [node for node in self.nodes if node not in reached]
+
+    def get_unreferenced(self) -> List[str]:
+        """Workflows not invoked by any other workflow, and not being entry points."""
+        entry_points = set(self.get_entry_points())
+        return [node
+            for node in self.nodes
+            if len(self.callers[node]) == 0 and node not in entry_points]
+
+    def get_fan_in(self) -> Dict[str, int]:
+        """Number of distinct workflows invoking each workflow."""
+        return {node: len(self.callers[node]) for node in self.nodes}
+
+    def get_fan_out(self) -> Dict[str, int]:
+        """Number of distinct workflows invoked by each workflow."""
+        return {node: len(self.edges[node]) for node in self.nodes}
+
+    def get_cycles(self) -> List[List[str]]:
+        """Groups of workflows invoking each other recursively (Tarjan's algorithm).
+
+        Implemented iteratively, as invocation chains may be deeper than the recursion limit."""
+        order: Dict[str, int] = {}
+        low_link: Dict[str, int] = {}
+        stack: List[str] = []
+        on_stack: Set[str] = set()
+        cycles: List[List[str]] = []
+
+        for start in self.nodes:
+            if start in order:
+                continue
+            # (node, index of the next callee to visit)
+            work = [(start, 0)]
+            while work:
+                node, next_callee = work.pop()
+                if next_callee == 0:
+                    order[node] = low_link[node] = len(order)
+                    stack.append(node)
+                    on_stack.add(node)
+                callees = self.edges[node]
+                if next_callee < len(callees):
+                    work.append((node, next_callee + 1))
+                    callee = callees[next_callee]
+                    if callee not in order:
+                        work.append((callee, 0))
+                    elif callee in on_stack:
+                        low_link[node] = min(low_link[node], order[callee])
+                    continue
+
+                if low_link[node] == order[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in self.edges[node]:
+                        cycles.append(sorted(component))
+                if work:
+                    parent = work[-1][0]
+                    low_link[parent] = min(low_link[parent], low_link[node])
+        return cycles
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get a JSON-serializable representation of the graph."""
+        return {
+            "nodes": [
+                {"id": node, "fanIn": len(self.callers[node]), "fanOut": len(self.edges[node])}
+                for node in self.nodes],
+            "edges": [
+                {"source": caller, "target": callee}
+                for caller in self.nodes
+                for callee in self.edges[caller]],
+            "missing": [
+                {"source": caller, "target": callee}
+                for caller, callees in self.missing.items()
+                for callee in callees],
+            "dynamic": [
+                {"source": caller, "expression": expression}
+                for caller, expressions in self.dynamic.items()
+                for expression in expressions],
+            "entryPoints": self.get_entry_points(),
+            "unreachable": self.get_unreachable(),
+            "cycles": self.get_cycles(),
+        }
+
+    def to_dot(self) -> str:
+        """Render the graph in Graphviz's DOT language."""
+        quote = json.dumps
+        lines = [f'digraph {quote(self.project.name)} {{']
+        lines.extend(f'    {quote(node)};' for node in self.nodes)
+        lines.extend(
+            f'    {quote(caller)} -> {quote(callee)};'
+            for caller in self.nodes
+            for callee in self.edges[caller])
+        lines.extend(
+            f'    {quote(caller)} -> {quote(callee)} [style=dashed, color=red];'
+            for caller, callees in self.missing.items()
+            for callee in callees)
+        lines.append('}')
+        return '\n'.join(lines) + '\n'
+
+    def write_deliverables(self, target_dir: str = TARGET_DIR) -> None:
+        """Export the graph as JSON and DOT files, for dashboards."""
+        os.makedirs(target_dir, exist_ok=True)
+        with open(os.path.join(target_dir, TARGET_FILE_JSON), 'w', encoding='utf-8') as json_file:
+            json.dump(self.to_dict(), json_file, indent=1)
+        with open(os.path.join(target_dir, TARGET_FILE_DOT), 'w', encoding='utf-8') as dot_file:
+            dot_file.write(self.to_dot())
@@ -0,0 +1,184 @@
+"""Contains WorkflowIndex, the collection of the workflows of a Project."""
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+import os
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from analyzer.analyze.extractor import WorkflowSummary, extract_workflow
+from analyzer.analyze.options import AnalysisOptions
+from analyzer.analyze.workflow import Workflow
+
+# Number of workflows loaded at once, when iterating within a memory budget.
+BATCH_SIZE = 256
+
+def extract_in_parallel(file_paths: List[str], jobs: int,
+        extract: Callable[[str], WorkflowSummary] = extract_workflow,
+        file_sizes: Optional[List[int]] = None,
+        executor: Optional[Executor] = None) -> List[WorkflowSummary]:
+    """Extract the workflows using a pool of worker processes.
+
+    The workers return WorkflowSummary objects (not XML trees), in the order of file_paths.
+    If the sizes of the files are known, the largest ones are scheduled first, so that no
+    worker is left with a big file at the end while the others are idle.
+    A pool shared by several projects may be passed as executor; otherwise one is started.
+    """
+    if len(file_paths) == 0:
+        return []
+    if jobs == 1:
+        return [extract(file_path) for file_path in file_paths]
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=jobs) as own_executor:
+            return extract_in_parallel(file_paths, jobs, extract, file_sizes, own_executor)
+
+    order = list(range(len(file_paths)))
+    if file_sizes is not None:
+        order.sort(key=lambda position: file_sizes[position], reverse=True)
+    # Bigger chunks spare the inter-process communication, while keeping the workers busy.
+    chunk_size = max(1, len(file_paths) // (jobs * 4))
+    summaries = executor.map(
+        extract, [file_paths[position] for position in order], chunksize=chunk_size)
+    results: List[Optional[WorkflowSummary]] = [None] * len(file_paths)
+    for position, summary in zip(order, summaries):
+        results[position] = summary
+    return results
+
+def normalize_relative_path(relative_path: str) -> str:
+    """Make relative paths comparable: InvokeWorkflowFile may use backslashes, or './'."""
+    return os.path.normpath(relative_path.replace('\\', '/')).replace(os.sep, '/')
+
+class WorkflowIndex():  # pylint: disable=too-many-instance-attributes
+    """The workflows of a project, built once, in a stable order.
+
+    Workflows are found by their absolute or their relative path (relative to project.json)
+    in constant time. Each file is loaded only once, when it is first accessed - or all at
+    once, in parallel, when iterating with more than one job.
+
+    Within a memory budget, iterating loads the workflows in batches, and drops the loaded ones
+    whenever the budget is exceeded: these are loaded again when accessed the next time.
+    """
+    # Besides the files, looked up by either path in constant time, and the loaded workflows,
+    # it keeps how to load them: grouping these would only add a level of indirection.
+
+    def __init__(self, project_directory: str, file_paths: Iterable[str],
+            file_sizes: Optional[Iterable[int]] = None,
+            options: Optional[AnalysisOptions] = None):
+        self.project_directory = os.path.abspath(project_directory)
+        # jobs, executor (pool of worker processes, if shared with other indexes) and budget
+        self.options = options if options is not None else AnalysisOptions()
+        self.extract = self.options.get_extract()
+        # called with the relative path and the summary of every extracted file, e.g. by the
+        # profiler; workflows loaded again after being dropped are extracted again
+        self.on_extract: Optional[Callable[[str, WorkflowSummary], None]] = None
+
+        # file paths as listed, by their normalized absolute path
+        self._file_paths: Dict[str, str] = {}
+        # sizes in bytes, as seen by the discovery; used for scheduling only
+        self._file_sizes: Optional[Dict[str, int]] = None
+        self._by_relative_path: Dict[str, str] = {}
+        self._workflows: Dict[str, Workflow] = {}
+        self.set_file_paths(file_paths, file_sizes)
+
+    @staticmethod
+    def normalize_path(file_path: str) -> str:
+        """Get the normalized absolute path used as the key of the index."""
+        return os.path.normpath(os.path.abspath(file_path))
+
+    def get_relative_path(self, file_path: str) -> str:
+        """Get the path of the workflow file relative to project.json, with '/' separators."""
+        return normalize_relative_path(
+            os.path.relpath(self.normalize_path(file_path), self.project_directory))
+
+    def set_file_paths(self, file_paths: Iterable[str],
+            file_sizes: Optional[Iterable[int]] = None, changed: Iterable[str] = ()) -> None:
+        """Replace the list of files, e.g. after files were added or deleted.
+
+        The workflows of the removed files and of the changed ones are dropped, to be extracted
+        again on next access; the others are kept."""
+        self._file_paths = {
+            self.normalize_path(file_path): file_path for file_path in file_paths}
+        self._file_sizes = (
+            None if file_sizes is None else dict(zip(self._file_paths, file_sizes)))
+        self._by_relative_path = {
+            self.get_relative_path(path): path for path in self._file_paths}
+        dropped = {self.normalize_path(file_path) for file_path in changed}
+        self._workflows = {path: workflow
+            for path, workflow in self._workflows.items()
+            if path in self._file_paths and path not in dropped}
+
+    def get_file_paths(self) -> List[str]:
+        """List the file paths in the order of the index, without loading the workflows."""
+        return list(self._file_paths.values())
+
+    def _add(self, path: str, summary: WorkflowSummary) -> Workflow:
+        if self.on_extract is not None:
+            self.on_extract(self.get_relative_path(path), summary)
+        workflow = Workflow(summary.file_path, summary)
+        self._workflows[path] = workflow
+        return workflow
+
+    def _load(self, path: str) -> Workflow:
+        workflow = self._workflows.get(path)
+        if workflow is None:
+            workflow = self._add(path, self.extract(self._file_paths[path]))
+        return workflow
+
+    def load_all(self, file_paths: Optional[Iterable[str]] = None) -> None:
+        """Load every workflow (or the listed ones) not yet loaded, using the worker processes
+        if allowed."""
+        paths = (self._file_paths
+            if file_paths is None
+            else [self.normalize_path(file_path) for file_path in file_paths])
+        missing = [path for path in paths if path not in self._workflows]
+        summaries = extract_in_parallel(
+            [self._file_paths[path] for path in missing], self.options.jobs, self.extract,
+            None if self._file_sizes is None else [self._file_sizes[path] for path in missing],
+            self.options.executor)
+        for path, summary in zip(missing, summaries):
+            self._add(path, summary)
+
+    def release(self) -> None:
+        """Drop the loaded workflows, if the memory budget is exceeded."""
+        if self.options.budget is not None and self.options.budget.exceeded():
+            self._workflows = {}
+
+    def get(self, file_path: str) -> Optional[Workflow]:
+        """Find a workflow by its path: absolute, or relative to the current directory."""
+        path = self.normalize_path(file_path)
+        if path not in self._file_paths:
+            return None
+        return self._load(path)
+
+    def get_file_path(self, relative_path: str) -> Optional[str]:
+        """Find the file of a workflow by its path relative to project.json, without loading it."""
+        path = self._by_relative_path.get(normalize_relative_path(relative_path))
+        return None if path is None else self._file_paths[path]
+
+    def get_by_relative_path(self, relative_path: str) -> Optional[Workflow]:
+        """Find a workflow by its path relative to project.json, e.g. as invoked by others."""
+        path = self._by_relative_path.get(normalize_relative_path(relative_path))
+        if path is None:
+            return None
+        return self._load(path)
+
+    def __contains__(self, file_path: str) -> bool:
+        return self.normalize_path(file_path) in self._file_paths
+
+    def __len__(self) -> int:
+        return len(self._file_paths)
+
+    def __iter__(self) -> Iterator[Workflow]:
+        if self.options.budget is not None:
+            return self._iter_batches()
+        if self.options.jobs > 1:
+            self.load_all()
+        return (self._load(path) for path in self._file_paths)
+
+    def _iter_batches(self) -> Iterator[Workflow]:
+        paths = list(self._file_paths)
+        for start in range(0, len(paths), BATCH_SIZE):
+            batch = paths[start:start + BATCH_SIZE]
+            if self.options.jobs > 1:
+                self.load_all(batch)
+            for path in batch:
+                yield self._load(path)
+            self.release()
@@ -0,0 +1,109 @@
+"""Keep an analysis within a memory budget: measure the resident memory, spill results to disk.
+
+With a budget, the workflows are loaded in batches, and the loaded ones are dropped whenever
+the budget is exceeded, to be extracted again (or read from the parse cache) when needed.
+Results collected across the entire project, like the sections of the documentation or the
+findings of the review, are kept in SpillLists: in memory while within the budget, in a
+temporary file once it is exceeded. Either way they are read back in the same order, so the
+output is the same as without a budget.
+"""
+
+from dataclasses import dataclass
+import json
+import os
+import sys
+import tempfile
+from typing import Any, Callable, Generic, Iterable, Iterator, List, Optional, TextIO, TypeVar
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows
+    resource = None
+
+# The memory is measured once per this many items added to a SpillList.
+CHECK_INTERVAL = 256
+
+def get_peak_rss_kb(children: bool = False) -> Optional[int]:
+    """Peak resident memory of the process, or of its terminated workers, in kilobytes; None if
+    the platform does not tell it."""
+    if resource is None:
+        return None
+    # kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+        ).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+def get_rss_kb() -> Optional[int]:
+    """Resident memory of the process in kilobytes: the current one where /proc is available,
+    the peak one otherwise; None if it cannot be measured."""
+    try:
+        with open('/proc/self/statm', encoding='ascii') as statm_file:
+            return int(statm_file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, IndexError, AttributeError):
+        return get_peak_rss_kb()
+
+@dataclass
+class MemoryBudget():
+    """Resident memory allowed for the analysis; only the limit is stored, so that instances
+    can be passed to worker processes."""
+    max_kb: int
+
+    def exceeded(self) -> bool:
+        """If the memory cannot be measured, the budget is assumed to be exceeded."""
+        rss_kb = get_rss_kb()
+        return rss_kb is None or rss_kb >= self.max_kb
+
+T = TypeVar('T')
+
+class SpillList(Generic[T]):
+    """A list that is only appended to and iterated, moved into a temporary file of JSON lines
+    when the budget is exceeded. Items are converted by encode and decode on the way."""
+
+    def __init__(self, budget: MemoryBudget,
+            encode: Callable[[T], Any] = lambda item: item,
+            decode: Callable[[Any], T] = lambda item: item):
+        self.budget = budget
+        self.encode = encode
+        self.decode = decode
+        self.items: List[T] = []
+        self.spill_file: Optional[TextIO] = None
+        self.length = 0
+
+    @property
+    def spilled(self) -> bool:
+        """Whether the items are in the temporary file."""
+        return self.spill_file is not None
+
+    def spill(self) -> None:
+        """Move the items kept in memory into the temporary file."""
+        if self.spill_file is None:
+            self.spill_file = tempfile.TemporaryFile('w+', encoding='utf-8')
+        self.spill_file.writelines(json.dumps(self.encode(item)) + '\n' for item in self.items)
+        self.items = []
+
+    def append(self, item: T) -> None:
+        """Add an item; every CHECK_INTERVAL items, spill if the budget is exceeded."""
+        self.length += 1
+        if self.spill_file is not None:
+            self.spill_file.seek(0, os.SEEK_END)
+            self.spill_file.write(json.dumps(self.encode(item)) + '\n')
+            return
+        self.items.append(item)
+        if self.length % CHECK_INTERVAL == 0 and self.budget.exceeded():
+            self.spill()
+
+    def extend(self, items: Iterable[T]) -> None:
+        """Add the items one by one."""
+        for item in items:
+            self.append(item)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self) -> Iterator[T]:
+        if self.spill_file is None:
+            return iter(self.items)
+        self.spill_file.flush()
+        self.spill_file.seek(0)
+        return (self.decode(json.loads(line)) for line in self.spill_file)
@@ -0,0 +1,123 @@
+"""Metrics of the activities of a workflow, gathered in a single walk.
+
+MetricsCollector is fed the start and the end of every element below the root activity, either
+by the streaming extractor, or by measure_activities walking an already parsed tree. Either way
+each element is visited once, so the metrics cost O(n) even for huge workflows.
+"""
+
+from collections import Counter
+from functools import lru_cache
+import re
+import sys
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+import lxml.etree as ET
+
+from analyzer.analyze.namespaces import default_namespaces
+
+ID_REF_ATTRIBUTE = f'{{{default_namespaces["presentation2010"]}}}WorkflowViewState.IdRef'
+
+# Studio assigns an IdRef to every activity, but also to a few structural elements.
+NON_ACTIVITY_TAGS = frozenset(['Catch', 'FlowStep', 'State', 'Transition'])
+
+WORD_BOUNDARY_REGEX = re.compile(r'(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])')
+
+def local_name(tag: str) -> str:
+    """Remove the {namespace} part of an lxml tag."""
+    return tag.rsplit('}', 1)[-1]
+
+def is_activity(element: ET.Element) -> bool:
+    """Decide whether an element is an activity (as opposed to a property, ViewState, etc.)"""
+    return (isinstance(element.tag, str)
+        and ID_REF_ATTRIBUTE in element.attrib
+        and local_name(element.tag) not in NON_ACTIVITY_TAGS)
+
+@lru_cache(maxsize=None)
+def get_default_display_name(activity_type: str) -> str:
+    """The DisplayName given by Studio to a new activity: MultipleAssign is Multiple Assign."""
+    return WORD_BOUNDARY_REGEX.sub(' ', activity_type)
+
+class ActivityMetrics(NamedTuple):
+    """The activities of a workflow (within its root activity), in numbers."""
+    # by {namespace}Name tag: the namespace tells the package an activity comes from
+    tag_counts: Dict[str, int]
+    # the root activity is at depth 1; 0 if there is no root activity
+    max_depth: int
+    # DisplayName (or type) of the activities from the root to the most deeply nested one
+    deepest_path: Tuple[str, ...]
+    # (activity type, IdRef) of the activities still having their default DisplayName
+    default_named: Tuple[Tuple[str, str], ...]
+
+    @property
+    def activity_counts(self) -> Dict[str, int]:
+        """Number of activities by activity type, whatever their namespace."""
+        counts: Counter = Counter()
+        for tag, count in self.tag_counts.items():
+            counts[local_name(tag)] += count
+        return dict(counts)
+
+    @property
+    def activity_count(self) -> int:
+        """Number of activities of any type."""
+        return sum(self.tag_counts.values())
+
+    @property
+    def default_name_count(self) -> int:
+        """Number of activities still having their default DisplayName."""
+        return len(self.default_named)
+
+    @classmethod
+    def load(cls, values: Iterable[Any]) -> 'ActivityMetrics':
+        """Restore metrics read from JSON."""
+        tag_counts, max_depth, deepest_path, default_named = values
+        return cls(
+            {sys.intern(tag): count for tag, count in tag_counts.items()},
+            max_depth, tuple(deepest_path),
+            tuple((sys.intern(activity_type), id_ref) for activity_type, id_ref in default_named))
+
+class MetricsCollector():
+    """Accumulate the metrics from the start and end events of the elements."""
+
+    def __init__(self):
+        self.tag_counts: Counter = Counter()
+        # labels of the activities enclosing the current element
+        self.path: List[str] = []
+        self.deepest_path: Tuple[str, ...] = ()
+        self.default_named: List[Tuple[str, str]] = []
+
+    def start(self, element: ET.Element) -> None:
+        """An element (with its attributes, but maybe not yet its children) is entered."""
+        if not is_activity(element):
+            return
+        self.tag_counts[sys.intern(element.tag)] += 1
+        activity_type = local_name(element.tag)
+
+        display_name = element.attrib.get('DisplayName')
+        if display_name is None or display_name == get_default_display_name(activity_type):
+            self.default_named.append(
+                (sys.intern(activity_type), element.attrib[ID_REF_ATTRIBUTE]))
+
+        self.path.append(display_name or activity_type)
+        if len(self.path) > len(self.deepest_path):
+            self.deepest_path = tuple(self.path)
+
+    def end(self, element: ET.Element) -> None:
+        """An element is left; it must still have its attributes."""
+        if is_activity(element):
+            self.path.pop()
+
+    def finish(self) -> ActivityMetrics:
+        """Return the metrics once the root activity is left."""
+        return ActivityMetrics(
+            dict(self.tag_counts), len(self.deepest_path), self.deepest_path,
+            tuple(self.default_named))
+
+def measure_activities(root_activity: ET.Element) -> ActivityMetrics:
+    """Walk a parsed root activity (see Workflow.get_root_activity()) once."""
+    collector = MetricsCollector()
+    for event, element in ET.iterwalk(root_activity, events=('start', 'end')):
+        if event == 'start':
+            collector.start(element)
+        else:
+            collector.end(element)
+    return collector.finish()
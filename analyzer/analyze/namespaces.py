@@ -0,0 +1,10 @@
+"""XML namespaces used in UiPath's XAML workflow files."""
+
+default_namespaces = {
+    "wf": "http://schemas.microsoft.com/netfx/2009/xaml/activities",
+    "presentation": "http://schemas.microsoft.com/netfx/2009/xaml/activities/presentation",
+    "presentation2010": "http://schemas.microsoft.com/netfx/2010/xaml/activities/presentation",
+    "this": "clr-namespace:",
+    "ui": "http://schemas.uipath.com/workflow/activities",
+    "x": "http://schemas.microsoft.com/winfx/2006/xaml",
+}
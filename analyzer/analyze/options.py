@@ -0,0 +1,39 @@
+"""Contains AnalysisOptions, how the workflows of a project are found and loaded."""
+
+from concurrent.futures import Executor
+from dataclasses import dataclass
+import os
+from typing import Callable, Optional, Sequence
+
+from analyzer.analyze.cache import ParseCache
+from analyzer.analyze.extractor import WorkflowSummary, extract_workflow
+from analyzer.analyze.memory import MemoryBudget
+from analyzer.analyze.packages import PackageIndex
+
+@dataclass
+class AnalysisOptions():
+    """How to find and load the workflows of a project; the same for all projects of a batch.
+
+    The defaults analyze a single project sequentially, parsing every workflow."""
+    # 0 stands for as many jobs as there are CPUs.
+    jobs: int = 1
+    # Summaries of unchanged files are read from here instead of parsing them again.
+    cache: Optional[ParseCache] = None
+    # .gitignore-style patterns of the workflow files (default: *.xaml), and of the files
+    # and folders not to analyze, besides the defaults (see discovery.DEFAULT_EXCLUDE)
+    include: Optional[Sequence[str]] = None
+    exclude: Optional[Sequence[str]] = None
+    # Workflows are loaded in batches, and results spilled to disk, to stay within it.
+    budget: Optional[MemoryBudget] = None
+    # The dependencies are resolved to the packages found here.
+    packages: Optional[PackageIndex] = None
+    # pool of worker processes shared by several projects, see analyzer/batch.py
+    executor: Optional[Executor] = None
+
+    def __post_init__(self):
+        if self.jobs <= 0:
+            self.jobs = os.cpu_count() or 1
+
+    def get_extract(self) -> Callable[[str], WorkflowSummary]:
+        """The function extracting a workflow file: through the cache, if any."""
+        return self.cache.extract if self.cache is not None else extract_workflow
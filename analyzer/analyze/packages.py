@@ -0,0 +1,316 @@
+"""Resolve the dependencies of project.json to local NuGet packages, and list what they export.
+
+Packages are looked up in the folders given with --packages, then, with --global-packages, in the
+global packages folder of NuGet (NUGET_PACKAGES, or ~/.nuget/packages, also used by UiPath
+Studio). Without either, the dependencies are not resolved. Both layouts are
+supported: <id>/<version>/<id>.<version>.nupkg, and flat folders of <id>.<version>.nupkg files,
+like local feeds. Of the versions in the requested range, the lowest one is taken, as NuGet does.
+
+A .nupkg is a zip archive: its central directory lists the files, then only the assemblies of
+lib/ are decompressed, one at a time and in memory, to list their activity types (see
+assemblies.py); the .xaml files are the workflows of the package. What a package exports is
+cached by its path, size and modification time, in memory and in the cache folder, so that the
+next runs, and the other projects of a batch, do not open the archive again.
+"""
+
+import json
+import logging
+import os
+import posixpath
+import re
+import tempfile
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+from urllib.parse import unquote
+import zipfile
+
+from analyzer.analyze.assemblies import AssemblyError, get_activity_types
+from analyzer.analyze.cache import CACHE_DIR
+from analyzer.analyze.metrics import local_name
+
+# in a folder of its own, as ParseCache.prune() evicts the files of CACHE_DIR
+CACHE_PATH = os.path.join(CACHE_DIR, 'packages', 'index.json')
+PACKAGE_EXTENSION = '.nupkg'
+CLR_NAMESPACE_PREFIX = 'clr-namespace:'
+
+# To be increased whenever the exports read from the packages change.
+INDEX_VERSION = 1
+
+VERSION_REGEX = re.compile(
+    r'(?P<numbers>\d+(?:\.\d+){0,3})(?:-(?P<prerelease>[0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?')
+# <id>.<version>.nupkg, the id being the shortest prefix followed by a version
+PACKAGE_FILE_REGEX = re.compile(
+    r'(?P<id>.+?)\.(?P<version>\d+(?:\.\d+){0,3}(?:-[0-9A-Za-z.-]+)?)'
+    + re.escape(PACKAGE_EXTENSION), re.IGNORECASE)
+
+class PackageVersion(NamedTuple):
+    """A NuGet version, ordered as NuGet does: 1.0 = 1.0.0.0 < 1.0.1-beta < 1.0.1."""
+    numbers: Tuple[int, int, int, int]
+    # a release is above its prereleases
+    release: bool
+    # identifiers of the prerelease label: numeric ones (0, n) below alphanumeric ones (1, s)
+    prerelease: Tuple[Tuple[int, Union[int, str]], ...]
+
+    @classmethod
+    def parse(cls, text: str) -> 'PackageVersion':
+        """ValueError if the text is not a version; build metadata (+...) is ignored."""
+        match = VERSION_REGEX.fullmatch(text.strip())
+        if match is None:
+            raise ValueError(f'Not a version: {text}')
+        numbers = [int(number) for number in match['numbers'].split('.')]
+        prerelease = match['prerelease']
+        return cls(
+            tuple((numbers + [0, 0, 0])[:4]),
+            prerelease is None,
+            tuple(
+                (0, int(identifier)) if identifier.isdigit() else (1, identifier.lower())
+                for identifier in (prerelease or '').split('.') if identifier))
+
+    def __str__(self):
+        numbers = self.numbers if self.numbers[3] else self.numbers[:3]
+        label = '.'.join(str(identifier) for _, identifier in self.prerelease)
+        return '.'.join(map(str, numbers)) + (f'-{label}' if label else '')
+
+class VersionRange(NamedTuple):
+    """A version range of NuGet: 1.0 (at least), [1.0] (exactly), [1.0,2.0), (,2.0], ..."""
+    minimum: Optional[PackageVersion]
+    include_minimum: bool
+    maximum: Optional[PackageVersion]
+    include_maximum: bool
+
+    @classmethod
+    def parse(cls, text: str) -> 'VersionRange':
+        """ValueError if the text is not a range, e.g. a floating version like 1.*"""
+        text = text.strip()
+        if text[:1] not in ('[', '('):
+            return cls(PackageVersion.parse(text), True, None, False)
+        if len(text) < 3 or text[-1] not in (']', ')'):
+            raise ValueError(f'Not a version range: {text}')
+        bounds = text[1:-1].split(',')
+        if len(bounds) == 1:
+            if text[0] != '[' or text[-1] != ']':
+                raise ValueError(f'Not a version range: {text}')
+            version = PackageVersion.parse(bounds[0])
+            return cls(version, True, version, True)
+        if len(bounds) != 2:
+            raise ValueError(f'Not a version range: {text}')
+        minimum, maximum = (
+            PackageVersion.parse(bound) if bound.strip() else None for bound in bounds)
+        return cls(minimum, text[0] == '[', maximum, text[-1] == ']')
+
+    def __contains__(self, version: object) -> bool:
+        if not isinstance(version, PackageVersion):
+            return False
+        if self.minimum is not None and (
+                version < self.minimum or version == self.minimum and not self.include_minimum):
+            return False
+        if self.maximum is not None and (
+                version > self.maximum or version == self.maximum and not self.include_maximum):
+            return False
+        # prereleases only if asked for by the lower bound
+        return version.release or (self.minimum is not None and not self.minimum.release)
+
+class PackageExports(NamedTuple):
+    """What a package offers to the projects depending on it."""
+    # full names of the activity types, e.g. UiPath.Core.Activities.LogMessage
+    activities: Tuple[str, ...]
+    # paths of the workflow files within the package
+    workflows: Tuple[str, ...]
+
+class ResolvedDependency(NamedTuple):
+    """A dependency of project.json, and the package found for it."""
+    name: str
+    # the version range, as written in project.json
+    requested: str
+    # None if no package of the range was found
+    version: Optional[str]
+    path: Optional[str]
+
+def get_global_folders() -> List[str]:
+    """The global packages folder of NuGet, if it exists."""
+    folder = os.environ.get('NUGET_PACKAGES') or os.path.join(
+        os.path.expanduser('~'), '.nuget', 'packages')
+    return [folder] if os.path.isdir(folder) else []
+
+def read_package(path: str) -> PackageExports:
+    """List the activities and the workflows of a .nupkg, reading only the members needed.
+
+    The same assembly of several target frameworks (lib/net45, lib/net6.0, ...) is read once."""
+    activities: Dict[str, None] = {}
+    assemblies_read = set()
+    with zipfile.ZipFile(path) as archive:
+        names = archive.namelist()
+        for name in sorted(names):
+            lower_name = name.lower()
+            file_name = posixpath.basename(lower_name)
+            if (not lower_name.startswith('lib/') or not file_name.endswith('.dll')
+                    or file_name.endswith('.resources.dll') or file_name in assemblies_read):
+                continue
+            assemblies_read.add(file_name)
+            try:
+                activities.update(dict.fromkeys(get_activity_types(archive.read(name))))
+            except AssemblyError as error:
+                logging.debug('Skipping %s of %s: %s', name, path, error)
+    # NuGet escapes the file names in the archive, e.g. spaces as %20
+    workflows = tuple(unquote(name) for name in names if name.lower().endswith('.xaml'))
+    return PackageExports(tuple(activities), workflows)
+
+class PackageIndex():
+    """The packages of the local folders, and what they export; shared by the projects of a
+    batch. Folders are listed, and archives read, only when first needed."""
+
+    def __init__(self, folders: Sequence[str], cache_path: Optional[str] = None):
+        self.folders = [os.path.abspath(folder) for folder in folders]
+        # absolute, as the working directory changes between the projects of a batch
+        self.cache_path = None if cache_path is None else os.path.abspath(cache_path)
+        # the packages of the flat folders: path by version by lowercase id
+        self._flat_folders: Dict[str, Dict[str, Dict[PackageVersion, str]]] = {}
+        self._versions: Dict[str, Dict[PackageVersion, str]] = {}
+        # exports by the path of the archive, with its size and modification time
+        self._exports: Dict[str, Tuple[int, int, PackageExports]] = self.read_cache()
+        self.changed = False
+        # number of archives opened, as the others were found in the cache
+        self.opened = 0
+
+    def read_cache(self) -> Dict[str, Tuple[int, int, PackageExports]]:
+        """The exports stored by an earlier run; empty if there are none."""
+        if self.cache_path is None:
+            return {}
+        try:
+            with open(self.cache_path, encoding='utf-8') as cache_file:
+                data = json.load(cache_file)
+            if data['version'] != INDEX_VERSION:
+                return {}
+            return {
+                path: (size, mtime_ns, PackageExports(tuple(activities), tuple(workflows)))
+                for path, (size, mtime_ns, activities, workflows) in data['packages'].items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def save(self) -> None:
+        """Store the exports in the cache file, if any archive was read."""
+        if self.cache_path is None or not self.changed:
+            return
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            dir=os.path.dirname(self.cache_path), suffix='.tmp')
+        with os.fdopen(file_descriptor, 'w', encoding='utf-8') as cache_file:
+            json.dump({
+                'version': INDEX_VERSION,
+                'packages': {
+                    path: [size, mtime_ns, *exports]
+                    for path, (size, mtime_ns, exports) in self._exports.items()},
+            }, cache_file, separators=(',', ':'))
+        os.replace(temporary_path, self.cache_path)
+        self.changed = False
+
+    def _list_flat_folder(self, folder: str) -> Dict[str, Dict[PackageVersion, str]]:
+        if folder not in self._flat_folders:
+            packages: Dict[str, Dict[PackageVersion, str]] = {}
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    match = PACKAGE_FILE_REGEX.fullmatch(entry.name)
+                    if match is not None and entry.is_file():
+                        packages.setdefault(match['id'].lower(), {})[
+                            PackageVersion.parse(match['version'])] = entry.path
+            self._flat_folders[folder] = packages
+        return self._flat_folders[folder]
+
+    def get_versions(self, package_id: str) -> Dict[PackageVersion, str]:
+        """The archives of the package by their versions; the first folder wins."""
+        key = package_id.lower()
+        if key in self._versions:
+            return self._versions[key]
+        versions: Dict[PackageVersion, str] = {}
+        for folder in self.folders:
+            if not os.path.isdir(folder):
+                continue
+            package_folder = os.path.join(folder, key)
+            if os.path.isdir(package_folder):
+                with os.scandir(package_folder) as entries:
+                    for entry in entries:
+                        try:
+                            version = PackageVersion.parse(entry.name)
+                        except ValueError:
+                            continue
+                        archives = [name for name in os.listdir(entry.path)
+                            if name.lower().endswith(PACKAGE_EXTENSION)] if entry.is_dir() else []
+                        if archives:
+                            versions.setdefault(version, os.path.join(entry.path, archives[0]))
+            for version, path in self._list_flat_folder(folder).get(key, {}).items():
+                versions.setdefault(version, path)
+        self._versions[key] = versions
+        return versions
+
+    def resolve(self, package_id: str, requested: str) -> ResolvedDependency:
+        """Find the lowest version of the requested range."""
+        try:
+            version_range = VersionRange.parse(requested)
+        except ValueError as error:
+            logging.warning('Dependency %s: %s', package_id, error)
+            return ResolvedDependency(package_id, requested, None, None)
+        versions = self.get_versions(package_id)
+        applicable = [version for version in versions if version in version_range]
+        if not applicable:
+            return ResolvedDependency(package_id, requested, None, None)
+        version = min(applicable)
+        return ResolvedDependency(package_id, requested, str(version), versions[version])
+
+    def get_exports(self, path: str) -> PackageExports:
+        """What the archive exports; read from the cache, unless the file changed."""
+        stat = os.stat(path)
+        cached = self._exports.get(path)
+        if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            return cached[2]
+        self.opened += 1
+        try:
+            exports = read_package(path)
+        except (OSError, zipfile.BadZipFile) as error:
+            logging.warning('Cannot read package %s: %s', path, error)
+            exports = PackageExports((), ())
+        self._exports[path] = (stat.st_size, stat.st_mtime_ns, exports)
+        self.changed = True
+        return exports
+
+class Dependencies():
+    """The dependencies of a project resolved to packages, and the activities they export."""
+
+    def __init__(self, dependencies: Dict[str, str], index: PackageIndex):
+        self.resolved = [
+            index.resolve(name, str(requested)) for name, requested in dependencies.items()]
+        self.exports: Dict[str, PackageExports] = {
+            dependency.name: index.get_exports(dependency.path)
+            for dependency in self.resolved if dependency.path is not None}
+        # package by the full names of the activities, and by their names, if unambiguous
+        self.by_full_name: Dict[str, str] = {}
+        self.by_name: Dict[str, Optional[str]] = {}
+        for package, exports in self.exports.items():
+            for full_name in exports.activities:
+                self.by_full_name.setdefault(full_name, package)
+                name = full_name.rsplit('.', 1)[-1]
+                self.by_name[name] = package if self.by_name.get(name, package) == package else None
+
+    def find_activity(self, tag: str) -> Optional[str]:
+        """The package of an activity used as {xml namespace}Name in a workflow.
+
+        The namespace of clr-namespace:Namespace;assembly=Assembly is a CLR namespace. Other
+        ones (e.g. http://schemas.uipath.com/workflow/activities) are mapped to CLR namespaces
+        by the assemblies, so the activity is found by its name only."""
+        name = local_name(tag)
+        namespace = tag[1:tag.index('}')] if tag.startswith('{') else ''
+        if namespace.startswith(CLR_NAMESPACE_PREFIX):
+            clr_namespace = namespace[len(CLR_NAMESPACE_PREFIX):].split(';')[0]
+            return self.by_full_name.get(f'{clr_namespace}.{name}')
+        return self.by_name.get(name)
+
+    def get_used_activities(self, tag_counts: Iterable[Dict[str, int]]
+            ) -> Dict[str, Dict[str, int]]:
+        """How many times the activities of each package are used, by activity name.
+        tag_counts are counts by {xml namespace}Name, see ActivityMetrics."""
+        used: Dict[str, Dict[str, int]] = {}
+        for counts in tag_counts:
+            for tag, count in counts.items():
+                package = self.find_activity(tag)
+                if package is not None:
+                    activities = used.setdefault(package, {})
+                    activities[local_name(tag)] = activities.get(local_name(tag), 0) + count
+        return used
@@ -1,21 +1,22 @@
 """Contains Project to represent an entire UiPath project being analysed."""
 
-from glob import glob
 import json.decoder
-from os.path import join, dirname, exists
+from os.path import join, exists
 from dataclasses import dataclass
-from typing import Any, Iterable, Dict
+from typing import Any, Iterable, Dict, List, Optional
 import logging
 
+from analyzer.analyze.discovery import DiscoveredFile, discover_files
+from analyzer.analyze.index import WorkflowIndex
+from analyzer.analyze.options import AnalysisOptions
+from analyzer.analyze.packages import Dependencies
 from analyzer.analyze.workflow import Workflow
 
-# As the analyzer can be checked out within the to-be-analyzed project,
-# its own test files are to be excluded from the direcetory listing.
-TEST_ASSET_DIR = '/tests/assets'
-
 @dataclass
-class Project():
+class Project():  # pylint: disable=too-many-instance-attributes
     """Represent an entire UiPath project being analysed."""
+    # One attribute per property of project.json, besides the options and the loaded
+    # workflows and dependencies: splitting them would only add a level of indirection.
 
     @staticmethod
     def get_project_properties(target_dir: str) -> Dict[str, Any]:
@@ -26,21 +27,43 @@ class Project():
 
         raise FileNotFoundError('No project.json found - not a valid project folder.')
 
+    def discover_workflow_files(self) -> List[DiscoveredFile]:
+        """Find the .xaml files, with their sizes, skipping the excluded folders."""
+        return discover_files(
+            self.project_directory, self.options.include, self.options.exclude)
+
     def get_workflow_files(self) -> Iterable[str]:
         """List the .xaml files (assuming all of them are workflows)."""
-        return (file_name
-            for file_name
-            in
-                glob(
-                    join(
-                        self.project_directory,
-                        './**/*.xaml'),
-                    recursive=True)
-                if not dirname(file_name).endswith(TEST_ASSET_DIR))
-
-    def __init__(self, project_directory):
+        return (discovered.path for discovered in self.discover_workflow_files())
+
+    def load_workflows(self) -> WorkflowIndex:
+        """Index the workflows; they are loaded on first access, in parallel if allowed."""
+        discovered_files = self.discover_workflow_files()
+        return WorkflowIndex(
+            self.project_directory, [discovered.path for discovered in discovered_files],
+            [discovered.size for discovered in discovered_files], self.options)
+
+    def get_main_workflow(self) -> Optional[Workflow]:
+        """Find the main workflow from the relative path found in project.json.
+        Return None in case there is none - e.g. in case of a library."""
+        if self.main is None:
+            return None
+        return self.workflow_files.get_by_relative_path(self.main)
+
+    def get_dependencies(self) -> Optional[Dependencies]:
+        """Resolve the dependencies of project.json to packages, on first call.
+        Return None in case no package folders were given."""
+        if self.options.packages is None:
+            return None
+        if self._dependencies is None:
+            self._dependencies = Dependencies(self.dependencies, self.options.packages)
+        return self._dependencies
+
+    def __init__(self, project_directory, options: Optional[AnalysisOptions] = None):
         logging.basicConfig(level=logging.INFO)
         self.project_directory = project_directory
+        self.options = options if options is not None else AnalysisOptions()
+        self._dependencies: Optional[Dependencies] = None
         properties = self.get_project_properties(project_directory)
 
         #  these fields can be missing in case of a template, like ReFramework.
@@ -56,9 +79,12 @@ class Project():
             self.type = 'Workflow'
 
         # Libraries have no Main
+        self.main: Optional[str] = None
         if self.type == 'Workflow':
             self.main = properties['main']
 
+        # package name: version range
+        self.dependencies: Dict[str, str] = properties.get('dependencies', {})
+
         # This assumes that each .xaml file can be processed as a workflow
-        self.workflow_files: Iterable[Workflow] = (
-            Workflow(file_path) for file_path in self.get_workflow_files())
+        self.workflow_files: WorkflowIndex = self.load_workflows()
@@ -0,0 +1,158 @@
+"""Compact records of the workflow parts: arguments, variables, invocations, selectors.
+
+They are named tuples (no per-instance __dict__), carry no reference to any lxml element, and
+the strings repeated all over a project (types, directions, tags) are interned, so that the
+parts of tens of thousands of workflows can be kept in memory, pickled and cached cheaply.
+"""
+
+from dataclasses import dataclass
+import re
+import sys
+from typing import Any, Iterable, NamedTuple, Optional, Tuple
+
+TYPE_REGEX = re.compile(r'^[OIntu]+Argument\((.*)\)$')
+NAMESPACE_REGEX = re.compile(r'[a-z]+:')
+
+@dataclass
+class ArgumentDirection():
+    """Enumerates possible argument directions."""
+    in_arg = "In"
+    out_arg = "Out"
+    inout_arg = "InOut"
+
+# the prefix of the Type attribute of an argument, by direction
+DIRECTION_PREFIXES = {
+    'InArgument': ArgumentDirection.in_arg,
+    'OutArgument': ArgumentDirection.out_arg,
+    'InOutArgument': ArgumentDirection.inout_arg,
+}
+DIRECTIONS = {direction: direction for direction in DIRECTION_PREFIXES.values()}
+
+def intern(value: Optional[str]) -> Optional[str]:
+    """Keep a single copy of strings repeated in many workflows."""
+    return None if value is None else sys.intern(value)
+
+def get_direction(raw_type: str) -> Optional[str]:
+    """InArgument(x:String) is an In argument; None if the type is not an argument type."""
+    return DIRECTION_PREFIXES.get(raw_type.split('(', 1)[0])
+
+def normalize_type(type_name: str) -> str:
+    """scg:List(x:String) is a List(String)."""
+    return sys.intern(NAMESPACE_REGEX.sub('', type_name))
+
+def get_type(raw_type: str) -> Optional[str]:
+    """InArgument(scg:List(x:String)) is a List(String); None if not an argument type."""
+    type_match = TYPE_REGEX.match(raw_type)
+    if type_match is None:
+        return None
+    return normalize_type(type_match.group(1))
+
+class ArgumentRecord(NamedTuple):
+    """An argument of a workflow, declared in x:Members."""
+    name: str
+    direction: str
+    type: str
+    annotation: Optional[str] = None
+    # only In arguments may have a default value
+    default_value: Optional[str] = None
+
+    @classmethod
+    def load(cls, values: Iterable[Any]) -> 'ArgumentRecord':
+        """Restore a record read from JSON, interning its strings again."""
+        name, direction, argument_type, annotation, default_value = values
+        return cls(name, DIRECTIONS[direction], sys.intern(argument_type),
+            annotation, default_value)
+
+class VariableRecord(NamedTuple):
+    """A variable declared in any scope of a workflow."""
+    name: str = ""
+    data_type: str = ""
+    default_value: str = ""
+    annotation: str = ""
+    # position of the declaring activity in WorkflowSummary.scopes
+    scope: int = 0
+
+    @classmethod
+    def load(cls, values: Iterable[Any]) -> 'VariableRecord':
+        """Restore a record read from JSON, interning its strings again."""
+        name, data_type, default_value, annotation, scope = values
+        return cls(name, sys.intern(data_type), default_value, annotation, scope)
+
+class ScopeRecord(NamedTuple):
+    """An activity declaring variables (e.g. a Sequence), or delegate arguments (e.g. the item
+    of a ForEach). The scope of the entire workflow, with its arguments, is the first one."""
+    # position of the enclosing scope; -1 for the workflow
+    parent: int
+    owner_tag: str
+    owner_display_name: Optional[str] = None
+    owner_id_ref: Optional[str] = None
+
+    @classmethod
+    def load(cls, values: Iterable[Any]) -> 'ScopeRecord':
+        """Restore a record read from JSON, interning its strings again."""
+        parent, owner_tag, owner_display_name, owner_id_ref = values
+        return cls(parent, sys.intern(owner_tag), owner_display_name, owner_id_ref)
+
+class DelegateArgumentRecord(NamedTuple):
+    """A name declared by a delegate, e.g. the exception of a Catch, or the row of a ForEach."""
+    name: str
+    scope: int
+
+    @classmethod
+    def load(cls, values: Iterable[Any]) -> 'DelegateArgumentRecord':
+        """Restore a record read from JSON."""
+        return cls(*values)
+
+class UsageRecord(NamedTuple):
+    """The identifiers used by an expression, in the innermost scope enclosing it."""
+    scope: int
+    # IdRef of the activity the expression belongs to
+    id_ref: Optional[str]
+    identifiers: Tuple[str, ...]
+
+    @classmethod
+    def load(cls, values: Iterable[Any]) -> 'UsageRecord':
+        """Restore a record read from JSON, interning its strings again."""
+        scope, id_ref, identifiers = values
+        return cls(scope, id_ref, tuple(map(sys.intern, identifiers)))
+
+class PassedArgumentRecord(NamedTuple):
+    """An argument passed by an InvokeWorkflowFile activity, e.g.
+    <InArgument x:TypeArguments="x:String" x:Key="in_Name">[name]</InArgument>"""
+    name: str
+    direction: str
+    type: str
+
+    @classmethod
+    def load(cls, values: Iterable[Any]) -> 'PassedArgumentRecord':
+        """Restore a record read from JSON, interning its strings again."""
+        name, direction, argument_type = values
+        return cls(name, DIRECTIONS[direction], sys.intern(argument_type))
+
+class InvocationRecord(NamedTuple):
+    """An InvokeWorkflowFile activity; the path uses forward slashes."""
+    path: str
+    display_name: Optional[str] = None
+    id_ref: Optional[str] = None
+    # None if the arguments are passed in a dictionary (ArgumentsVariable), thus unknown
+    arguments: Optional[Tuple[PassedArgumentRecord, ...]] = ()
+
+    @classmethod
+    def load(cls, values: Iterable[Any]) -> 'InvocationRecord':
+        """Restore a record read from JSON."""
+        path, display_name, id_ref, arguments = values
+        return cls(path, display_name, id_ref,
+            None if arguments is None else tuple(map(PassedArgumentRecord.load, arguments)))
+
+class SelectorRecord(NamedTuple):
+    """A selector, with the activity it belongs to (and not the Target holding it)."""
+    owner_tag: str
+    owner_display_name: Optional[str]
+    owner_id_ref: Optional[str]
+    selector: str
+
+    @classmethod
+    def load(cls, values: Iterable[Any]) -> 'SelectorRecord':
+        """Restore a record read from JSON, interning its strings again."""
+        owner_tag, owner_display_name, owner_id_ref, selector = values
+        return cls(sys.intern(owner_tag), owner_display_name, owner_id_ref, selector)
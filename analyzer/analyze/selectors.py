@@ -0,0 +1,87 @@
+"""Analysis of the selectors of the UI activities.
+
+A selector is a fragment of XML, e.g. <wnd app='notepad.exe' /><ctrl name='Save' idx='2' />.
+The same selectors are repeated all over a project, so each distinct selector string is parsed
+and analysed once; SelectorAnalyzer keeps the results for the entire project.
+"""
+
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import lxml.etree as ET
+
+from analyzer.analyze.metrics import local_name
+
+# Prefixes used in attribute names of selectors, e.g. matching:title='regex'
+SELECTOR_NAMESPACES = {
+    'matching': 'urn:uipath:selector:matching',
+    'fuzzylevel': 'urn:uipath:selector:fuzzylevel',
+}
+MATCHING_PREFIX = f'{{{SELECTOR_NAMESPACES["matching"]}}}'
+# the nodes of a selector are wrapped into a single element, declaring the prefixes
+SELECTOR_START = '<selector ' + ' '.join(
+    f'xmlns:{prefix}="{uri}"' for prefix, uri in SELECTOR_NAMESPACES.items()) + '>'
+SELECTOR_END = '</selector>'
+WILDCARDS = frozenset('*?')
+
+class SelectorAnalysis(NamedTuple):
+    """What is wrong with a selector. Each issue is described as tag attribute='value'."""
+    # the message of the parser, if the selector is not valid XML
+    error: Optional[str] = None
+    # selectors set by an expression, e.g. ["<wnd title='" + title + "' />"], or by a markup
+    # extension, e.g. {x:Null}, are not analysed
+    dynamic: bool = False
+    idx: Tuple[str, ...] = ()
+    wildcards: Tuple[str, ...] = ()
+    regex: Tuple[str, ...] = ()
+
+def analyze_selector(selector: str) -> SelectorAnalysis:
+    """Parse the selector, and look for idx attributes, wildcards and regular expressions."""
+    stripped = selector.strip()
+    if stripped.startswith('[') or (stripped.startswith('{') and not stripped.startswith('{{')):
+        return SelectorAnalysis(dynamic=True)
+    try:
+        root = ET.fromstring(
+            SELECTOR_START + selector + SELECTOR_END,
+            ET.XMLParser(resolve_entities=False, no_network=True))
+    except ET.XMLSyntaxError as error:
+        # the position would be the one within the wrapper
+        return SelectorAnalysis(error=error.msg.split(', line ')[0])
+
+    idx, wildcards, regex = [], [], []
+    for node in root:
+        if not isinstance(node.tag, str):
+            continue
+        tag = local_name(node.tag)
+        # attributes matched by a regular expression (or fuzzily) do not use wildcards
+        matched_by_pattern = {
+            name[len(MATCHING_PREFIX):]
+            for name in node.attrib if name.startswith(MATCHING_PREFIX)}
+        for name, value in node.attrib.items():
+            if name == 'idx':
+                idx.append(f"{tag} idx='{value}'")
+            elif name.startswith(MATCHING_PREFIX):
+                if value == 'regex':
+                    attribute = name[len(MATCHING_PREFIX):]
+                    regex.append(f"{tag} {attribute}='{node.get(attribute, '')}'")
+            elif name not in matched_by_pattern and not WILDCARDS.isdisjoint(value):
+                wildcards.append(f"{tag} {local_name(name)}='{value}'")
+    return SelectorAnalysis(None, False, tuple(idx), tuple(wildcards), tuple(regex))
+
+class SelectorAnalyzer():
+    """Analyse each distinct selector of the project only once."""
+
+    def __init__(self):
+        self._analyses: Dict[str, SelectorAnalysis] = {}
+        self.hits = 0
+
+    def analyze(self, selector: str) -> SelectorAnalysis:
+        """Get the analysis of the selector, from the cache if it has been seen already."""
+        analysis = self._analyses.get(selector)
+        if analysis is None:
+            analysis = self._analyses[selector] = analyze_selector(selector)
+        else:
+            self.hits += 1
+        return analysis
+
+    def __len__(self) -> int:
+        return len(self._analyses)
@@ -0,0 +1,144 @@
+"""Snapshot the metrics of every workflow, and compare them with the snapshot of an earlier run.
+
+Every run writes a compact snapshot: a few numbers per workflow, by path. Kept as a build
+artifact of the base branch, it is the baseline of the runs of later changes: comparing the two
+is a single pass over each, matching the workflows by path, so the base revision never needs to
+be analyzed again. The review checks the changes against the baseline rules (see review.py).
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+from analyzer.analyze.index import normalize_relative_path
+from analyzer.analyze.project import Project
+from analyzer.analyze.workflow import Workflow
+
+TARGET_DIR = './deliverables/snapshot'
+SNAPSHOT_FILE = 'metrics.json'
+DELTA_FILE = 'delta.json'
+
+# To be increased whenever the metrics change, as snapshots of other versions cannot be compared.
+SNAPSHOT_VERSION = 1
+
+class WorkflowMetrics(NamedTuple):
+    """The numbers of a workflow that are compared between runs."""
+    arguments: int
+    variables: int
+    activities: int
+    nesting_depth: int
+    # 1 if the workflow has an annotation, 0 otherwise
+    annotated: int
+    annotated_arguments: int
+    # number of distinct workflows invoked
+    fan_out: int
+
+METRICS = list(WorkflowMetrics._fields)
+
+def get_workflow_metrics(workflow: Workflow) -> WorkflowMetrics:
+    """Measure a workflow, from its summary only."""
+    arguments = list(workflow.get_arguments())
+    activity_metrics = workflow.get_activity_metrics()
+    return WorkflowMetrics(
+        len(arguments),
+        len(workflow.summary.variables),
+        activity_metrics.activity_count,
+        activity_metrics.max_depth,
+        int(bool(workflow.get_annotation())),
+        sum(1 for argument in arguments if argument.annotation),
+        len(set(map(normalize_relative_path, workflow.get_referenced_workflows()))))
+
+class Snapshot():
+    """The metrics of the workflows of a project, by their path relative to project.json."""
+
+    def __init__(self, project_name: str, workflows: Dict[str, WorkflowMetrics]):
+        self.project_name = project_name
+        self.workflows = workflows
+
+    @classmethod
+    def from_project(cls, project: Project) -> 'Snapshot':
+        """Measure every workflow of the project."""
+        index = project.workflow_files
+        return cls(project.name, {
+            index.get_relative_path(workflow.file_path): get_workflow_metrics(workflow)
+            for workflow in index})
+
+    @classmethod
+    def read(cls, path: str) -> 'Snapshot':
+        """Read a snapshot written by write(); ValueError if it is of another version."""
+        with open(path, encoding='utf-8') as snapshot_file:
+            data = json.load(snapshot_file)
+        if data.get('version') != SNAPSHOT_VERSION or data.get('metrics') != METRICS:
+            raise ValueError(f'{path} is not a snapshot of version {SNAPSHOT_VERSION}.')
+        return cls(data['project'], {
+            path: WorkflowMetrics(*values) for path, values in data['workflows'].items()})
+
+    def write(self, path: str = os.path.join(TARGET_DIR, SNAPSHOT_FILE)) -> None:
+        """Write the snapshot compactly: one list of numbers per workflow."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as snapshot_file:
+            json.dump({
+                'version': SNAPSHOT_VERSION,
+                'project': self.project_name,
+                'metrics': METRICS,
+                'workflows': self.workflows,
+            }, snapshot_file, separators=(',', ':'))
+
+    def get_coverage(self) -> Dict[str, float]:
+        """Share of the workflows, and of the arguments, having an annotation."""
+        workflows = list(self.workflows.values())
+        arguments = sum(metrics.arguments for metrics in workflows)
+        return {
+            'workflows': (sum(metrics.annotated for metrics in workflows) / len(workflows)
+                if workflows else 1.0),
+            'arguments': (sum(metrics.annotated_arguments for metrics in workflows) / arguments
+                if arguments else 1.0),
+        }
+
+class SnapshotDelta():
+    """What changed between the baseline and the current snapshot."""
+
+    def __init__(self, baseline: Snapshot, current: Snapshot):
+        self.baseline = baseline
+        self.current = current
+        self.added: List[str] = []
+        # the changed metrics of the workflows, as (baseline, current) values
+        self.changed: Dict[str, Dict[str, Tuple[int, int]]] = {}
+        for path, metrics in current.workflows.items():
+            previous = baseline.workflows.get(path)
+            if previous is None:
+                self.added.append(path)
+            elif previous != metrics:
+                self.changed[path] = {
+                    metric: (old, new)
+                    for metric, old, new in zip(METRICS, previous, metrics)
+                    if old != new}
+        self.removed = [path for path in baseline.workflows if path not in current.workflows]
+        current_coverage = current.get_coverage()
+        self.coverage: Dict[str, Tuple[float, float]] = {
+            name: (baseline_coverage, current_coverage[name])
+            for name, baseline_coverage in baseline.get_coverage().items()}
+
+    def get_report(self) -> Dict[str, Any]:
+        """The delta, ready to be serialized as JSON."""
+        return {
+            'added': {path: self.current.workflows[path]._asdict() for path in self.added},
+            'removed': self.removed,
+            'changed': self.changed,
+            'coverage': self.coverage,
+        }
+
+    def write(self, path: str = os.path.join(TARGET_DIR, DELTA_FILE)) -> None:
+        """Write the delta report."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as delta_file:
+            json.dump(self.get_report(), delta_file, indent=1)
+
+    def write_terminal_output(self) -> None:
+        """Summarize the delta on the terminal."""
+        logging.info('Compared with the baseline: %d workflows added, %d removed, %d changed.',
+            len(self.added), len(self.removed), len(self.changed))
+        for path, changes in self.changed.items():
+            logging.info('%s: %s', path, ', '.join(
+                f'{metric} {old} -> {new}' for metric, (old, new) in changes.items()))
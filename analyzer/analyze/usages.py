@@ -0,0 +1,88 @@
+"""Where the variables and arguments of a workflow are used, resolved to their declarations.
+
+The expressions are tokenized on extraction (see expressions.py), each usage site being recorded
+in the innermost scope enclosing it. IdentifierIndex inverts the usages into a map from
+identifier to usage sites, and resolves each site once, as the compiler would: to the
+declaration of the innermost enclosing scope. Unused, shadowing and out-of-scope declarations
+are then found by lookups, instead of scanning every expression for every declaration.
+"""
+
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from analyzer.analyze.expressions import CSHARP
+from analyzer.analyze.extractor import WorkflowSummary
+from analyzer.analyze.records import ScopeRecord, UsageRecord
+
+class Declaration(NamedTuple):
+    """A name declared in a scope."""
+    name: str
+    scope: int
+
+class IdentifierIndex():
+    """The usages of the declared names of a workflow, resolved to their declarations."""
+
+    def normalize(self, name: str) -> str:
+        """VB is case-insensitive, C# is not."""
+        return name if self.case_sensitive else name.casefold()
+
+    def get_scope(self, scope: int) -> ScopeRecord:
+        """The activity declaring the scope; 0 is the workflow."""
+        return self.scopes[scope]
+
+    def resolve(self, name: str, scope: int) -> Optional[Declaration]:
+        """The declaration a (normalized) name refers to, when used in the scope."""
+        declared_in = self.declarations.get(name, {})
+        while scope >= 0:
+            if scope in declared_in:
+                return declared_in[scope]
+            scope = self.scopes[scope].parent
+        return None
+
+    def get_usage_count(self, name: str, scope: int) -> int:
+        """Number of expressions using the declaration."""
+        return self.usage_counts[Declaration(self.normalize(name), scope)]
+
+    def get_shadowed(self, name: str, scope: int) -> Optional[Declaration]:
+        """The declaration of an enclosing scope hidden by the declaration, if any."""
+        if scope == 0:
+            return None
+        return self.resolve(self.normalize(name), self.scopes[scope].parent)
+
+    def get_out_of_scope_usages(self, name: str) -> List[UsageRecord]:
+        """Usages of a declared name, where no declaration of it is visible."""
+        return self.unresolved.get(self.normalize(name), [])
+
+    def __init__(self, summary: WorkflowSummary):
+        self.case_sensitive = summary.language == CSHARP
+        self.scopes = summary.scopes
+        # scope: declaration, by normalized name
+        self.declarations: Dict[str, Dict[int, Declaration]] = {}
+        # arguments first, so that they are kept in case a variable of the workflow has the
+        # same name (which is not a valid workflow)
+        declared: List[Tuple[str, int]] = [
+            *((argument.name, 0) for argument in summary.arguments),
+            *((variable.name, variable.scope) for variable in summary.variables),
+            *((argument.name, argument.scope) for argument in summary.delegate_arguments)]
+        for name, scope in declared:
+            normalized = self.normalize(name)
+            self.declarations.setdefault(normalized, {}).setdefault(
+                scope, Declaration(normalized, scope))
+
+        # the inverted index: usage sites by declared name; other identifiers are not kept
+        self.usages: Dict[str, List[UsageRecord]] = {}
+        for usage in summary.usages:
+            for identifier in usage.identifiers:
+                normalized = self.normalize(identifier)
+                if normalized in self.declarations:
+                    self.usages.setdefault(normalized, []).append(usage)
+
+        self.usage_counts: Counter = Counter()
+        self.unresolved: Dict[str, List[UsageRecord]] = {}
+        for name, usages in self.usages.items():
+            for usage in usages:
+                declaration = self.resolve(name, usage.scope)
+                if declaration is None:
+                    self.unresolved.setdefault(name, []).append(usage)
+                else:
+                    self.usage_counts[declaration] += 1
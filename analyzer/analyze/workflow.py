@@ -2,18 +2,16 @@
 
 import re
 from dataclasses import dataclass
-from typing import Optional, Iterable, Callable, Dict
+from typing import Optional, Iterable, Dict
 
 import lxml.etree as ET
 
-default_namespaces = {
-    "wf": "http://schemas.microsoft.com/netfx/2009/xaml/activities",
-    "presentation": "http://schemas.microsoft.com/netfx/2009/xaml/activities/presentation",
-    "presentation2010": "http://schemas.microsoft.com/netfx/2010/xaml/activities/presentation",
-    "this": "clr-namespace:",
-    "ui": "http://schemas.uipath.com/workflow/activities",
-    "x": "http://schemas.microsoft.com/winfx/2006/xaml",
-}
+from analyzer.analyze.extractor import WorkflowSummary, extract_workflow
+from analyzer.analyze.metrics import ID_REF_ATTRIBUTE, ActivityMetrics
+from analyzer.analyze.namespaces import default_namespaces
+from analyzer.analyze.records import (
+    ArgumentRecord, InvocationRecord, SelectorRecord, VariableRecord)
+from analyzer.analyze.usages import IdentifierIndex
 
 @dataclass
 class XamlParser():
@@ -39,91 +37,27 @@ class XamlParser():
             f'{{{self.namespaces["presentation2010"]}}}Annotation.AnnotationText')
         return self._get_attribute(annotation_attrib_name)
 
-@dataclass
-class Variable():
+class Variable(VariableRecord):
     """Represents Variable in a workflow for further analysis."""
-    _element: ET.Element
-    data_type: str
-    default_value: str
-    name: str
-    read_only: bool
-    annotation: str = ""
-
-    def __init__(self, element: ET.Element, namespaces: dict = None):
-        if namespaces is None:
-            namespaces = {}
-
-        self._element = element
-        self.data_type = self._get_attribute(f'{{{namespaces["x"]}}}TypeArguments')
-        self.default_value = self._get_attribute('Default')
-        self.name = self._get_attribute('Name')
-        self.annotation = self._get_attribute(
-            f'{{{namespaces["presentation2010"]}}}Annotation.AnnotationText')
-
-    def _get_attribute(self, attribute_name: str, fallback_value: str = ""):
-        attrib = self._element.attrib
-        if attribute_name in attrib:
-            return attrib[attribute_name]
-        return fallback_value
+    __slots__ = ()
 
     def __str__(self):
-        first_line = self.default_value.splitlines()[0]
+        first_line = (self.default_value.splitlines() or [''])[0]
         return f'<Variable "{self.name}" ({self.data_type}) = "{first_line}...">'
 
-@dataclass
-class WorkflowArgument(XamlParser):
-    """Extract the Argument's properties from the element node"""
-    def __init__(self, argument_element: ET.Element, root_element: ET.Element,
-            namespaces: Dict[str, str] = None):
-        if namespaces is None:
-            namespaces = {}
-        super().__init__(argument_element)
-        self._attribs = argument_element.attrib
-
-        self.annotation = self._get_annotation()
-        self.name       = self._get_attribute("Name")
-        self._raw_type  = self._get_attribute("Type")
-        self.direction  = self._get_direction()
-        self.type       = self._get_type()
-
-        # get default value
-        if self.direction == ArgumentDirection.in_arg:
-            default_value = [x
-                for x in root_element.attrib
-                if x.endswith(f'.{self.name}')
-                    and x.startswith('{clr-namespace:}')]
-            if len(default_value) > 0:
-                self.default_value = default_value[0]
-
-    def _get_direction(self) -> str:
-        if self._raw_type.startswith('InArgument'):
-            return ArgumentDirection.in_arg
-        if self._raw_type.startswith('OutArgument'):
-            return ArgumentDirection.out_arg
-        if self._raw_type.startswith('InOutArgument'):
-            return ArgumentDirection.inout_arg
-        raise ValueError
-
-    def _get_type(self) -> str:
-        type_regex = re.compile(r'^[OIntu]+Argument\((.*)\)$')
-        argmatch = type_regex.match(self._raw_type)
-        if argmatch is None:
-            raise ValueError
-        return self._remove_namespace_from_type_string(argmatch.group(1))
+class WorkflowArgument(ArgumentRecord):
+    """An argument of the workflow: name, direction, type (without namespaces), annotation."""
+    __slots__ = ()
 
     def __str__(self):
         return f'{self.name, self.direction, self.type}'
 
-@dataclass
-class ArgumentDirection():
-    """Enumerates possible argument directions."""
-    in_arg = "In"
-    out_arg = "Out"
-    inout_arg = "InOut"
-
 @dataclass
 class Workflow(XamlParser):
-    """Represents a workflow file from the project"""
+    """Represents a workflow file from the project.
+
+    The file is read once into a WorkflowSummary; the full XML tree is only parsed
+    when the document itself is requested (e.g. by get_root_activity())."""
 
     default_namespaces = default_namespaces
 
@@ -133,29 +67,44 @@ class Workflow(XamlParser):
 
     def get_referenced_workflows(self) -> Iterable[str]:
         """List the paths of the workflow files referenced by this file."""
-        invoke_activities = self.get_root_activity().iterfind(
-            './/ui:InvokeWorkflowFile',
-            self.default_namespaces)
-        return map(
-            lambda invoke_activity:
-                str(invoke_activity.attrib['WorkflowFileName']).replace('\\', '/'),
-            invoke_activities)
+        return (invocation.path for invocation in self.summary.invocations)
+
+    def get_invocations(self) -> Iterable[InvocationRecord]:
+        """List the InvokeWorkflowFile activities, with the arguments they pass."""
+        return iter(self.summary.invocations)
 
     def get_arguments(self) -> Iterable[WorkflowArgument]:
         """List the Arguments of the workflow."""
-        return map(
-            lambda argNode: WorkflowArgument(argNode, self.document.getroot()),
-            self.document.iterfind(
-                "./x:Members/x:Property",
-                namespaces=self.default_namespaces))
+        return map(WorkflowArgument._make, self.summary.arguments)
 
     def get_variables(self) -> Iterable[Variable]:
         """List Variables for further analysys."""
-        return map(
-            lambda varNode: Variable(varNode, self.default_namespaces),
-            self.document.iterfind(
-                './/wf:Variable',
-                namespaces=self.default_namespaces))
+        return map(Variable._make, self.summary.variables)
+
+    def get_usages(self) -> IdentifierIndex:
+        """Where the variables and arguments are used, resolved to their declarations."""
+        return IdentifierIndex(self.summary)
+
+    def get_activity_counts(self) -> Dict[str, int]:
+        """Number of activities within the root activity, by activity type."""
+        return self.summary.activity_metrics.activity_counts
+
+    def get_activity_metrics(self) -> ActivityMetrics:
+        """Counts, nesting depth and default names of the activities, measured on extraction."""
+        return self.summary.activity_metrics
+
+    @property
+    def document(self) -> ET.ElementTree:
+        """The entire XML tree of the workflow, parsed on first access."""
+        if self._document is None:
+            parser = ET.XMLParser(recover=True, resolve_entities=False)
+            with open(self.file_path, 'rb') as workflow_file:
+                self._document = ET.parse(workflow_file, parser=parser)
+        return self._document
+
+    def drop_document(self) -> None:
+        """Free the XML tree parsed by document; the summary is kept."""
+        self._document = None
 
     def get_root_activity(self) -> Optional[ET.Element]:
         """The Activity should have a StateMachine, Flowchart or Sequence as its child.
@@ -170,30 +119,32 @@ class Workflow(XamlParser):
                 return child
         return None
 
+    def get_selectors(self) -> Iterable[SelectorRecord]:
+        """List the selectors of the workflow, with the activities they belong to."""
+        return iter(self.summary.selectors)
+
     def get_elements_with_selectors(self) -> Iterable[ET.Element]:
         """Find the elements on which the selector checks may be done.
 
         These elements may be Target attribute of an activity.
 
         In this case, return the first ancestor for which the name doesn't end with Target.
+        The returned elements are detached, carrying the tag, DisplayName, IdRef and Selector.
         """
-
-        elements_with_selectors: Iterable[ET.Element] = self.document.findall('.//*[@Selector]')
-        is_target: Callable[[], bool] = lambda element: element.tag.endswith('Target')
-
-        return map(
-            lambda element: (element
-                if not is_target(element)
-                else (ancestor
-                    for ancestor in element.iterancestors()
-                    if not is_target(ancestor)).__next__()),
-            elements_with_selectors)
-
-    def __init__(self, file_path: str):
+        return (
+            ET.Element(selector.owner_tag, {
+                name: value
+                for name, value in [
+                    ('DisplayName', selector.owner_display_name),
+                    (ID_REF_ATTRIBUTE, selector.owner_id_ref),
+                    ('Selector', selector.selector)]
+                if value is not None})
+            for selector in self.summary.selectors)
+
+    def __init__(self, file_path: str, summary: Optional[WorkflowSummary] = None):
         self.file_path = file_path
-        parser = ET.XMLParser(recover=True, resolve_entities=False)
-        self.document: ET = ET.parse(open(file_path), parser=parser)
-        self._root_activity = self.get_root_activity()
-        self._attribs = self._root_activity.attrib
+        self.summary = summary if summary is not None else extract_workflow(file_path)
+        self._document: Optional[ET.ElementTree] = None
+        self._attribs = self.summary.root_activity_attributes
 
         self.display_name = self._get_attribute('DisplayName')
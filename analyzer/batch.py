@@ -0,0 +1,169 @@
+"""Analyze every project found under a root folder, e.g. a monorepo, in a single process.
+
+The projects share the pool of worker processes and the parse cache, so a library workflow
+copied into several projects is parsed only once. Each project gets the deliverables of a
+single run in deliverables/projects/<path of the project>, and a summary of all projects is
+written to deliverables/batch-summary.json.
+"""
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, replace
+import json
+import logging
+import os
+import time
+from typing import Callable, Iterator, List, Optional, Sequence
+
+from analyzer.analyze.cache import ParseCache
+from analyzer.analyze.discovery import discover_files
+from analyzer.analyze.options import AnalysisOptions
+from analyzer.analyze.project import Project
+from analyzer.analyze.snapshot import SNAPSHOT_FILE, TARGET_DIR as SNAPSHOT_DIR
+from analyzer.review.review import Review
+
+TARGET_DIR = './deliverables'
+PROJECTS_DIR = 'projects'
+SUMMARY_FILE = 'batch-summary.json'
+PROJECT_FILE = 'project.json'
+
+class BatchFailedError(Exception):
+    """Raised when any project could not be analyzed, or failed its review."""
+
+@dataclass
+class ProjectResult():
+    """The outcome of the analysis of one project, for the summary."""
+    # relative to the root
+    path: str
+    name: Optional[str] = None
+    workflows: int = 0
+    seconds: float = 0.0
+    # None if no review was requested
+    findings: Optional[int] = None
+    passed: Optional[bool] = None
+    error: Optional[str] = None
+
+def find_projects(root: str) -> List[str]:
+    """List the folders under root containing a project.json, pruning the excluded folders."""
+    return sorted(os.path.dirname(discovered.path)
+        for discovered in discover_files(root, include=[PROJECT_FILE]))
+
+def get_nested_projects(project_directory: str, project_directories: Sequence[str]) -> List[str]:
+    """Exclude patterns of the projects within the project: their workflows are not its own."""
+    return [f'/{os.path.relpath(other, project_directory).replace(os.sep, "/")}/'
+        for other in project_directories
+        if other != project_directory
+            and os.path.commonpath([project_directory, other]) == project_directory]
+
+def get_output_directory(root: str, project_directory: str) -> str:
+    """The folder of the deliverables of a project, named after its path within the root."""
+    relative_path = os.path.relpath(project_directory, root)
+    name = (os.path.basename(os.path.abspath(root))
+        if relative_path == os.curdir
+        else relative_path.replace(os.sep, '-'))
+    return os.path.join(TARGET_DIR, PROJECTS_DIR, name)
+
+def get_baseline_path(baseline_root: str, root: str, project_directory: str) -> Optional[str]:
+    """The snapshot of the project written by an earlier batch run, whose deliverables folder is
+    baseline_root; None if the project was not part of it."""
+    output_directory = os.path.relpath(get_output_directory(root, project_directory), TARGET_DIR)
+    path = os.path.normpath(
+        os.path.join(baseline_root, output_directory, SNAPSHOT_DIR, SNAPSHOT_FILE))
+    if not os.path.exists(path):
+        logging.info('No baseline of %s in %s.', project_directory, baseline_root)
+        return None
+    return path
+
+@contextmanager
+def working_directory(directory: str) -> Iterator[None]:
+    """Run the enclosed block in the directory, so that ./deliverables is the project's own."""
+    previous = os.getcwd()
+    os.makedirs(os.path.join(directory, 'deliverables'), exist_ok=True)
+    os.chdir(directory)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+class BatchAnalysis():
+    """Find the projects under root, and analyze each of them with the analyze function."""
+
+    def __init__(self, root: str, analyze: Callable[[Project], Optional[Review]],
+            options: Optional[AnalysisOptions] = None):
+        self.root = os.path.abspath(root)
+        self.analyze = analyze
+        options = options if options is not None else AnalysisOptions()
+        # The options of every project: with one package index, a package is read once,
+        # whichever projects depend on it. The cache is addressed by an absolute path, as the
+        # working directory changes.
+        self.options = replace(options, cache=None if options.cache is None
+            else ParseCache(os.path.abspath(options.cache.directory), options.cache.max_size))
+        self.results: List[ProjectResult] = []
+
+    def analyze_project(self, project_directory: str, project_directories: Sequence[str],
+            executor: Optional[Executor]) -> ProjectResult:
+        """Analyze a single project in its own output folder; errors are reported, not raised."""
+        result = ProjectResult(os.path.relpath(project_directory, self.root).replace(os.sep, '/'))
+        start = time.perf_counter()
+        try:
+            with working_directory(get_output_directory(self.root, project_directory)):
+                project = Project(project_directory, replace(self.options,
+                    exclude=[*(self.options.exclude or []),
+                        *get_nested_projects(project_directory, project_directories)],
+                    executor=executor))
+                result.name = project.name
+                result.workflows = len(project.workflow_files)
+                review = self.analyze(project)
+            if review is not None:
+                result.findings = len(review.findings)
+                result.passed = review.passed
+        except Exception as error:  # pylint: disable=broad-except
+            # one broken project must not stop the analysis of the others
+            logging.exception('Analysis of %s failed.', project_directory)
+            result.error = f'{type(error).__name__}: {error}'
+        result.seconds = time.perf_counter() - start
+        return result
+
+    def run(self) -> List[ProjectResult]:
+        """Analyze all projects, sharing one pool of worker processes, then write the summary."""
+        project_directories = find_projects(self.root)
+        logging.info('Found %d projects under %s', len(project_directories), self.root)
+        summary_path = os.path.abspath(os.path.join(TARGET_DIR, SUMMARY_FILE))
+
+        jobs = self.options.jobs
+        executor = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+        try:
+            self.results = [
+                self.analyze_project(project_directory, project_directories, executor)
+                for project_directory in project_directories]
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        if self.options.cache is not None:
+            self.options.cache.prune()
+        if self.options.packages is not None:
+            self.options.packages.save()
+        self.write_summary(summary_path)
+        return self.results
+
+    def write_summary(self, path: str) -> None:
+        """Write the results of all projects, with their totals."""
+        summary = {
+            "root": self.root,
+            "projects": len(self.results),
+            "workflows": sum(result.workflows for result in self.results),
+            "failed": sum(1 for result in self.results
+                if result.error is not None or result.passed is False),
+            "results": [asdict(result) for result in self.results],
+        }
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as summary_file:
+            json.dump(summary, summary_file, indent=1)
+
+    def raise_on_failure(self) -> None:
+        """Raise BatchFailedError, if any project failed."""
+        failed = [result.path for result in self.results
+            if result.error is not None or result.passed is False]
+        if failed:
+            raise BatchFailedError(f'{len(failed)} projects failed: {", ".join(failed)}')
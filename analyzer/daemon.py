@@ -0,0 +1,190 @@
+"""Keep a project in memory, and serve its documentation and review over local HTTP.
+
+Loading the project once spares the start of the interpreter, the import of lxml and the
+extraction of every workflow on each check. The workflow files are polled for changes of their
+modification time (or size): only the changed and added files are extracted again, and the review
+is evaluated again for the changed workflows and the ones invoking them (see IncrementalReview).
+The server handles one request at a time, so requests and refreshes never overlap.
+
+    GET /documentation  the HTML documentation
+    GET /review         the findings of the review, as JSON
+    GET /status         the number of workflows, and the files changed by the last refresh
+"""
+
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import lxml.etree as ET
+
+from analyzer.analyze.project import Project
+from analyzer.render.documentation import Documentation
+from analyzer.review.incremental import IncrementalReview
+from analyzer.review.review import Review
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_POLL_INTERVAL = 1.0
+
+class ProjectWatcher():
+    """A project loaded once, kept up to date by polling the files of its workflows."""
+
+    def __init__(self, project: Project):
+        self.project = project
+        # (modification time, size) of the workflow files, by path
+        self.states: Dict[str, Tuple[int, int]] = {
+            discovered.path: (discovered.mtime_ns, discovered.size)
+            for discovered in project.discover_workflow_files()}
+        # paths relative to project.json changed by the last refresh, and since the last review
+        self.changed: List[str] = []
+        self.unreviewed: Set[str] = set()
+        self.refreshed_at = time.time()
+
+        self._documentation: Optional[str] = None
+        self._review: Optional[Review] = None
+        project.workflow_files.load_all()
+
+    def refresh(self) -> List[str]:
+        """Find the changed, added and deleted files; extract the changed and added ones again.
+
+        Return the paths of the changes, relative to project.json."""
+        discovered_files = self.project.discover_workflow_files()
+        states = {
+            discovered.path: (discovered.mtime_ns, discovered.size)
+            for discovered in discovered_files}
+        changed = [path for path, state in states.items() if self.states.get(path) != state]
+        deleted = [path for path in self.states if path not in states]
+        if len(changed) == 0 and len(deleted) == 0:
+            return []
+
+        index = self.project.workflow_files
+        index.set_file_paths(
+            states, [discovered.size for discovered in discovered_files], changed)
+        # if a file cannot be extracted (e.g. it is being saved), the states are kept, so it is
+        # extracted again on the next refresh
+        index.load_all(changed)
+        self.states = states
+        self.refreshed_at = time.time()
+
+        self.changed = [index.get_relative_path(path) for path in changed + deleted]
+        self.unreviewed.update(self.changed)
+        self._documentation = None
+        logging.info('Changed: %s', ', '.join(self.changed))
+        return self.changed
+
+    def get_documentation(self) -> str:
+        """Render the documentation once per change."""
+        if self._documentation is None:
+            self._documentation = ''.join(
+                Documentation(self.project, build=False).render_documentation())
+        return self._documentation
+
+    def get_review(self) -> Review:
+        """Review the entire project first, then only the workflows affected by the changes.
+
+        Each review builds the invocation graph once, of the workflows as of that review."""
+        if self._review is None:
+            self._review = Review(self.project)
+        elif len(self.unreviewed) > 0:
+            self._review = IncrementalReview(
+                self.project, sorted(self.unreviewed), self._review.findings)
+        self.unreviewed = set()
+        return self._review
+
+    def get_review_results(self) -> Dict[str, Any]:
+        """The results of the review, ready to be serialized as JSON."""
+        review = self.get_review()
+        return {
+            "passed": review.passed,
+            "rulesChecked": review.rules_checked,
+            "findings": [asdict(finding) for finding in review.findings],
+        }
+
+    def get_status(self) -> Dict[str, Any]:
+        """What is being watched, and what changed last."""
+        return {
+            "project": self.project.name,
+            "workflows": len(self.project.workflow_files),
+            "changed": self.changed,
+            "refreshedAt": self.refreshed_at,
+        }
+
+def render_json(data: Any) -> bytes:
+    """Encode the response of the JSON endpoints."""
+    return json.dumps(data, indent=1).encode('utf-8')
+
+# path: (content type, rendering of the response)
+ROUTES: Dict[str, Tuple[str, Callable[[ProjectWatcher], bytes]]] = {
+    '/documentation': (
+        'text/html; charset=utf-8',
+        lambda watcher: watcher.get_documentation().encode('utf-8')),
+    '/review': (
+        'application/json',
+        lambda watcher: render_json(watcher.get_review_results())),
+    '/status': (
+        'application/json',
+        lambda watcher: render_json(watcher.get_status())),
+}
+
+class AnalysisServer(HTTPServer):
+    """Serve the results of the watched project; poll its files whenever idle."""
+
+    def __init__(self, address: Tuple[str, int], watcher: ProjectWatcher,
+            poll_interval: float = DEFAULT_POLL_INTERVAL):
+        super().__init__(address, AnalysisRequestHandler)
+        self.watcher = watcher
+        self.poll_interval = poll_interval
+        self.polled_at = time.monotonic()
+
+    def poll(self) -> None:
+        """Refresh the project; a file failing to be extracted is logged, not raised."""
+        self.polled_at = time.monotonic()
+        try:
+            self.watcher.refresh()
+        except (OSError, ET.LxmlError) as error:
+            logging.warning('Refresh failed, retrying on next poll: %s', error)
+
+    def service_actions(self) -> None:
+        """Called by serve_forever between requests."""
+        if time.monotonic() - self.polled_at >= self.poll_interval:
+            self.poll()
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """Answer GET requests of the ROUTES."""
+    server: AnalysisServer
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Refresh first, so that a file saved just before the request is taken into account."""
+        route = ROUTES.get(urlsplit(self.path).path)
+        if route is None:
+            self.send_error(404, 'Not found. Try ' + ', '.join(ROUTES))
+            return
+
+        self.server.poll()
+        content_type, render = route
+        try:
+            body = render(self.server.watcher)
+        except (OSError, ET.LxmlError) as error:
+            self.send_error(500, str(error))
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def serve(project: Project, port: int = DEFAULT_PORT,
+        poll_interval: float = DEFAULT_POLL_INTERVAL, host: str = DEFAULT_HOST) -> None:
+    """Serve the project until interrupted."""
+    watcher = ProjectWatcher(project)
+    with AnalysisServer((host, port), watcher, poll_interval) as server:
+        logging.info('Serving %s on http://%s:%d/ (%s)',
+            project.name, host, server.server_port, ', '.join(ROUTES))
+        try:
+            server.serve_forever(poll_interval)
+        except KeyboardInterrupt:
+            logging.info('Stopped.')
@@ -0,0 +1,131 @@
+"""Measure where the time of an analysis goes: phases, parsing of each file, memory.
+
+The report is written into deliverables/profile: a JSON summary, and a timeline which can be
+opened by Chrome's about://tracing or https://ui.perfetto.dev.
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from analyzer.analyze.extractor import WorkflowSummary
+from analyzer.analyze.memory import get_peak_rss_kb
+from analyzer.analyze.project import Project
+
+TARGET_DIR  = './deliverables/profile'
+REPORT_FILE = 'profile.json'
+TRACE_FILE = 'trace.json'
+SLOWEST_FILES = 20
+
+class ExtractionProfile(NamedTuple):
+    """The extraction of a workflow file, as measured by the process extracting it."""
+    start_ns: int
+    duration_ns: int
+    process_id: int
+    size: int
+
+@dataclass
+class ProfiledSummary(WorkflowSummary):
+    """A summary with the measurement of its extraction, as it may run in a worker process."""
+    extraction_profile: Optional[ExtractionProfile] = None
+
+@dataclass
+class ProfiledExtract():
+    """Wrap the extraction of the workflows, timing each file."""
+    extract: Callable[[str], WorkflowSummary]
+
+    def __call__(self, file_path: str) -> ProfiledSummary:
+        start = time.perf_counter_ns()
+        summary = self.extract(file_path)
+        duration = time.perf_counter_ns() - start
+        return ProfiledSummary(
+            **{summary_field.name: getattr(summary, summary_field.name)
+                for summary_field in fields(summary)},
+            extraction_profile=ExtractionProfile(
+                start, duration, os.getpid(), os.path.getsize(file_path)))
+
+@dataclass
+class Profiler():
+    """Collect the duration of the phases; does nothing unless enabled."""
+    enabled: bool = False
+    phases: Dict[str, float] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+    trace_events: List[Dict[str, Any]] = field(default_factory=list)
+    # the measurements of the extracted files, as they are extracted
+    files: List[Dict[str, Any]] = field(default_factory=list)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Measure the enclosed block as a phase of the analysis."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter_ns() - start
+            self.phases[name] = self.phases.get(name, 0) + duration / 1e9
+            self.add_trace_event(name, 'phase', (start, duration), os.getpid())
+
+    def count(self, counter: str, value: int = 1) -> None:
+        """Increase a counter."""
+        if self.enabled:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def add_trace_event(self, name: str, category: str, span: Tuple[int, int],
+            thread_id: int, arguments: Optional[Dict[str, Any]] = None) -> None:
+        """Add a complete event to the timeline, in Chrome's trace event format.
+
+        The span is the start and the duration of the event, in nanoseconds."""
+        start_ns, duration_ns = span
+        self.trace_events.append({
+            "name": name, "cat": category, "ph": "X",
+            "ts": start_ns / 1000, "dur": duration_ns / 1000,
+            "pid": os.getpid(), "tid": thread_id,
+            "args": arguments or {}})
+
+    def instrument(self, project: Project) -> None:
+        """Time the extraction of each workflow of the project, as it is extracted."""
+        if self.enabled:
+            index = project.workflow_files
+            index.extract = ProfiledExtract(index.extract)
+            index.on_extract = self.add_file
+
+    def add_file(self, relative_path: str, summary: WorkflowSummary) -> None:
+        """Record the measurement of an extracted workflow."""
+        if not isinstance(summary, ProfiledSummary) or summary.extraction_profile is None:
+            return
+        start, duration, process_id, size = summary.extraction_profile
+        self.count('files', 1)
+        self.count('bytes_read', size)
+        self.count('elements_visited', summary.element_count)
+        # perf_counter of other processes is on the same (monotonic) clock on Linux;
+        # elsewhere the worker lanes may be shifted.
+        self.add_trace_event(relative_path, 'parse', (start, duration), process_id,
+            {"bytes": size, "elements": summary.element_count})
+        self.files.append({"file": relative_path, "seconds": duration / 1e9, "bytes": size,
+            "elements": summary.element_count})
+
+    def write_report(self, target_dir: str = TARGET_DIR) -> None:
+        """Write the JSON report and the timeline."""
+        if not self.enabled:
+            return
+        files = sorted(self.files, key=lambda entry: entry['seconds'], reverse=True)
+        report = {
+            "phases": self.phases,
+            "counters": self.counters,
+            "peakRssKb": get_peak_rss_kb(),
+            "peakRssWorkersKb": get_peak_rss_kb(children=True),
+            "slowestFiles": files[:SLOWEST_FILES],
+        }
+        os.makedirs(target_dir, exist_ok=True)
+        with open(os.path.join(target_dir, REPORT_FILE), 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, indent=1)
+        with open(os.path.join(target_dir, TRACE_FILE), 'w', encoding='utf-8') as trace_file:
+            json.dump({"traceEvents": self.trace_events, "displayTimeUnit": "ms"}, trace_file)
+
+profiler = Profiler()
@@ -7,41 +7,49 @@ Create a folder deliverables/documentation, renders the contents in HTML.
 
 import logging
 import os
+from collections import Counter
 from html import escape as e
-from itertools import tee
-from typing import Iterable, Optional
+from typing import Dict, Iterable, Iterator, Optional, Tuple
 
+from analyzer.analyze.memory import SpillList
 from analyzer.analyze.project import Project
 from analyzer.analyze.workflow import Workflow, WorkflowArgument
 
 TARGET_DIR  = './deliverables/documentation'
 TARGET_FILE = 'Documentation.html'
 
-OUTPUT_TEMPLATE = """<!doctype html>
+# The start of every page, up to <body>. Formatted with the title into the start of a
+# template, so the braces of the style are doubled twice.
+OUTPUT_TEMPLATE_HEAD = """<!doctype html>
 <html>
     <head>
         <meta charset='utf-8'>
         <meta name="viewport" content="width=device-width">
-        <title>{0} - Documentation</title>
+        <title>{title}</title>
         <style>
-            .annotation {{
+            .annotation {{{{
                 white-space: pre-wrap;
-            }}
+            }}}}
         </style>
     </head>
     <body>
+"""
+OUTPUT_TEMPLATE_HEADER = OUTPUT_TEMPLATE_HEAD.format(title='{0} - Documentation') + """\
         <header>
             <h1>{0}</h1>
             <p>Version: {1}</p>
             <p class='description'>{2}</p>
             <nav>
-                <dl>{5}
+                <dl>"""
+OUTPUT_TEMPLATE_MAIN = """
                 </dl>
             </nav>
         </header>
         <main>
-            {3}
-            {4}
+            """
+OUTPUT_TEMPLATE_SEPARATOR = """
+            """
+OUTPUT_TEMPLATE_FOOTER = """
         </main>
     </body>
 </html>
@@ -53,6 +61,7 @@ OUTPUT_TEMPLATE_TOC_ITEM = """
 OUTPUT_TEMPLATE_WF = """<h2 id="{4}">{0}</h2>
 <p>File name: {1}</p>
 <p class='annotation'>{2}</p>
+<p class='metrics'>Activities: {5}, nested {6} layers deep, {7} with default name</p>
 <h3>Arguments</h3>
 <table>
     <thead>
@@ -81,6 +90,33 @@ OUTPUT_TEMPLATE_ARG = """
 OUTPUT_TEMPLATE_LINE = """<p>{0}</p>
 """
 
+OUTPUT_TEMPLATE_DEPENDENCIES = """<h2 id="dependencies">Dependencies</h2>
+<table>
+    <thead>
+        <tr>
+            <th>Package</th>
+            <th>Requested</th>
+            <th>Resolved</th>
+            <th>Exports</th>
+            <th>Activities used</th>
+        </tr>
+    </thead>
+    <tbody>
+{0}
+    </tbody>
+</table>
+"""
+
+OUTPUT_TEMPLATE_DEPENDENCY = """
+        <tr>
+            <td>{0}</td>
+            <td>{1}</td>
+            <td>{2}</td>
+            <td>{3} activities, {4} workflows</td>
+            <td>{5}</td>
+        </tr>
+"""
+
 class Documentation():
     """Build HTML documentation from a Project and its workflows."""
 
@@ -115,20 +151,25 @@ class Documentation():
         """Generate a document fragment containing documentation for a single workflow."""
         if workflow is not None:
             annotation = workflow.get_annotation() if workflow.get_annotation() is not None else ""
+            metrics = workflow.get_activity_metrics()
             return OUTPUT_TEMPLATE_WF.format(
                 e(workflow.display_name or ""),
                 e(self.get_workflow_relative_path(workflow)),
                 e(annotation),
                 self.render_arguments(workflow.get_arguments()),
-                self.get_workflow_id(workflow))
+                self.get_workflow_id(workflow),
+                metrics.activity_count,
+                metrics.max_depth,
+                metrics.default_name_count)
         return ""
 
-    def render_documentation_toc(self) -> str:
-        """Render table of contents with links to sections."""
-        return self.render_documentation_toc_item(self.get_main_workflow()) + str.join(
-                    '',
-                    [ self.render_documentation_toc_item(wf)
-                        for wf in  self.__workflow_toc])
+    def render_documentation_toc(self) -> Iterator[str]:
+        """Render table of contents with links to sections, one item at a time."""
+        main_workflow = self.get_main_workflow()
+        yield self.render_documentation_toc_item(main_workflow)
+        for workflow in self.project.workflow_files:
+            if workflow is not main_workflow:
+                yield self.render_documentation_toc_item(workflow)
 
     def render_documentation_toc_item(self, workflow: Workflow) -> str:
         """Render one line of the table of contents."""
@@ -143,39 +184,96 @@ class Documentation():
             self.get_workflow_relative_path(workflow))
 
     def get_main_workflow(self) -> Optional[Workflow]:
-        """Find the full path of the main workflow from the relative path found in project.json.
+        """Find the main workflow from the relative path found in project.json.
         Return None in case there is none - e.g. in case of a library."""
-        if self.project.main is not None:
-            main_workflow_path = os.path.normpath(os.path.join(
-                self.project.project_directory, self.project.main))
-            for workflow_file in self.project.workflow_files:
-                if main_workflow_path ==  os.path.normpath(workflow_file.file_path):
-                    return workflow_file
-        return None
+        return self.project.get_main_workflow()
+
+    def render_sections(self, main_workflow: Optional[Workflow],
+            tag_counts: Counter) -> Iterator[str]:
+        """Render the sections of the workflows other than the main one, adding up the
+        activities they use into tag_counts as they are rendered."""
+        for workflow in self.project.workflow_files:
+            if workflow is not main_workflow:
+                tag_counts.update(workflow.get_activity_metrics().tag_counts)
+                yield self.render_workflow_documentation(workflow)
+
+    def spill_documentation(self, main_workflow: Optional[Workflow],
+            tag_counts: Counter) -> Tuple[SpillList[str], SpillList[str]]:
+        """Render the table of contents and the sections in a single pass over the workflows,
+        moving them to disk if the memory budget of the project is exceeded. The activities
+        used are added up into tag_counts."""
+        budget = self.project.options.budget
+        toc_items: SpillList[str] = SpillList(budget)
+        sections: SpillList[str] = SpillList(budget)
+        toc_items.append(self.render_documentation_toc_item(main_workflow))
+        # the main workflow may have been dropped and loaded again: compared by path
+        main_path = None if main_workflow is None else main_workflow.file_path
+        for workflow in self.project.workflow_files:
+            if workflow.file_path != main_path:
+                tag_counts.update(workflow.get_activity_metrics().tag_counts)
+                toc_items.append(self.render_documentation_toc_item(workflow))
+                sections.append(self.render_workflow_documentation(workflow))
+        return toc_items, sections
+
+    def render_dependencies(self, tag_counts: Iterable[Dict[str, int]]) -> str:
+        """Generate a document fragment for the packages the project depends on, and the
+        activities of theirs it uses, as counted while rendering the workflows; empty if the
+        dependencies were not resolved."""
+        dependencies = self.project.get_dependencies()
+        if dependencies is None or not dependencies.resolved:
+            return ""
+        used = dependencies.get_used_activities(tag_counts)
+        rows = []
+        for dependency in dependencies.resolved:
+            exports = dependencies.exports.get(dependency.name)
+            rows.append(OUTPUT_TEMPLATE_DEPENDENCY.format(
+                e(dependency.name),
+                e(dependency.requested),
+                e(dependency.version or "not found"),
+                len(exports.activities) if exports is not None else 0,
+                len(exports.workflows) if exports is not None else 0,
+                e(', '.join(f'{activity} ({count})'
+                    for activity, count in sorted(used.get(dependency.name, {}).items())))))
+        return OUTPUT_TEMPLATE_DEPENDENCIES.format(''.join(rows))
+
+    def render_documentation(self) -> Iterator[str]:
+        """Render the document as a sequence of fragments, each of them only once.
+
+        Within a memory budget, the workflows are read once, and the fragments are kept until
+        the document is written: the same document is rendered either way."""
+        main_workflow = self.get_main_workflow()
+        yield OUTPUT_TEMPLATE_HEADER.format(
+            e(self.project.name),
+            e(self.project.version),
+            e(self.project.description))
+        # the activities used by the workflows, counted as their sections are rendered
+        tag_counts: Counter = Counter()
+        if self.project.options.budget is None:
+            toc_items: Iterable[str] = self.render_documentation_toc()
+            sections: Iterable[str] = self.render_sections(main_workflow, tag_counts)
+        else:
+            toc_items, sections = self.spill_documentation(main_workflow, tag_counts)
+        yield from toc_items
+        yield OUTPUT_TEMPLATE_MAIN
+        if main_workflow is not None:
+            tag_counts.update(main_workflow.get_activity_metrics().tag_counts)
+        yield self.render_workflow_documentation(main_workflow)
+        yield OUTPUT_TEMPLATE_SEPARATOR
+        yield from sections
+        yield self.render_dependencies([tag_counts])
+        yield OUTPUT_TEMPLATE_FOOTER
 
     def build_documentation(self):
-        """Generate the documentation from the project."""
-        self.__workflow_toc, self.__workflow_doc = tee(self.project.workflow_files)
-        with open(self.target_path, 'w') as documentation_file:
-            main_workfow: Workflow = self.get_main_workflow()
-            documentation_file.write(OUTPUT_TEMPLATE.format(
-                e(self.project.name),
-                e(self.project.version),
-                e(self.project.description),
-                self.render_workflow_documentation(main_workfow),
-                str.join(
-                    '',
-                    [ self.render_workflow_documentation(wf)
-                        for wf in self.__workflow_doc
-                        if wf.file_path != main_workfow.file_path]),
-                self.render_documentation_toc()
-            ))
-        logging.info(self.render_documentation_toc())
-
-    def __init__(self, project: Project):
+        """Generate the documentation from the project, writing each fragment once rendered."""
+        with open(self.target_path, 'w', encoding='utf-8') as documentation_file:
+            documentation_file.writelines(self.render_documentation())
+
+    def __init__(self, project: Project, build: bool = True):
         logging.info(project.name)
         self.project = project
 
-        self.make_directory()
         self.target_path = os.path.join(TARGET_DIR, TARGET_FILE)
-        self.build_documentation()
+        # without build, the document is only rendered on request, e.g. by analyzer/daemon.py
+        if build:
+            self.make_directory()
+            self.build_documentation()
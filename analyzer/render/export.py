@@ -0,0 +1,278 @@
+"""
+Export the model of the project for other tools: into an SQLite database, or as JSON lines.
+
+The database is normalized (workflows, arguments, variables, invocations, selectors) and indexed
+for the usual questions, e.g. which workflows take an argument of a given type, or which ones
+invoke a given workflow:
+
+    SELECT w.path FROM arguments a JOIN workflows w ON w.id = a.workflow_id
+        WHERE a.type = 'DataTable';
+    SELECT w.path FROM invocations i JOIN workflows w ON w.id = i.workflow_id
+        WHERE i.path = 'Framework/InitAllSettings.xaml';
+
+The JSON lines file has one workflow per line, with its parts nested, using the same names.
+Both exports are updated incrementally: only the workflows whose files changed (by size or
+modification time) since the last export are extracted and written again.
+"""
+
+from abc import ABC, abstractmethod
+import json
+import logging
+import os
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from analyzer.analyze.discovery import DiscoveredFile
+from analyzer.analyze.index import normalize_relative_path
+from analyzer.analyze.metrics import local_name
+from analyzer.analyze.project import Project
+
+TARGET_DIR = './deliverables/export'
+SQLITE_FILE = 'project.sqlite'
+JSONL_FILE = 'project.jsonl'
+
+SQLITE = 'sqlite'
+JSONL = 'jsonl'
+FORMATS = [SQLITE, JSONL]
+
+# To be increased whenever the exported model changes, so that the export is built again.
+EXPORT_VERSION = 1
+
+# the columns of the parts of a workflow, in the order of the records in the model
+PART_COLUMNS = {
+    'arguments': ['name', 'direction', 'type', 'annotation', 'default_value'],
+    'variables': ['name', 'data_type', 'default_value', 'annotation'],
+    'invocations': ['path', 'display_name', 'id_ref'],
+    'selectors': ['owner_tag', 'owner_display_name', 'owner_id_ref', 'selector'],
+}
+WORKFLOW_COLUMNS = [
+    'path', 'size', 'mtime_ns', 'display_name', 'annotation', 'root_activity',
+    'activity_count', 'max_depth']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS project (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS workflows (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    display_name TEXT,
+    annotation TEXT,
+    root_activity TEXT,
+    activity_count INTEGER NOT NULL,
+    max_depth INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS arguments (
+    workflow_id INTEGER NOT NULL REFERENCES workflows(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    type TEXT NOT NULL,
+    annotation TEXT,
+    default_value TEXT,
+    PRIMARY KEY (workflow_id, position));
+CREATE TABLE IF NOT EXISTS variables (
+    workflow_id INTEGER NOT NULL REFERENCES workflows(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    data_type TEXT NOT NULL,
+    default_value TEXT,
+    annotation TEXT,
+    PRIMARY KEY (workflow_id, position));
+CREATE TABLE IF NOT EXISTS invocations (
+    workflow_id INTEGER NOT NULL REFERENCES workflows(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    display_name TEXT,
+    id_ref TEXT,
+    PRIMARY KEY (workflow_id, position));
+CREATE TABLE IF NOT EXISTS selectors (
+    workflow_id INTEGER NOT NULL REFERENCES workflows(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    owner_tag TEXT NOT NULL,
+    owner_display_name TEXT,
+    owner_id_ref TEXT,
+    selector TEXT NOT NULL,
+    PRIMARY KEY (workflow_id, position));
+CREATE INDEX IF NOT EXISTS arguments_name ON arguments (name);
+CREATE INDEX IF NOT EXISTS arguments_type ON arguments (type);
+CREATE INDEX IF NOT EXISTS variables_name ON variables (name);
+CREATE INDEX IF NOT EXISTS variables_data_type ON variables (data_type);
+CREATE INDEX IF NOT EXISTS invocations_path ON invocations (path);
+CREATE INDEX IF NOT EXISTS selectors_selector ON selectors (selector);
+"""
+TABLES = ['project', 'workflows', *PART_COLUMNS]
+
+class Export(ABC):
+    """Export the workflows of the project, extracting only the ones changed since last time."""
+
+    def get_files(self) -> Dict[str, DiscoveredFile]:
+        """The workflow files by their path relative to project.json, with sizes and times."""
+        index = self.project.workflow_files
+        return {
+            index.get_relative_path(discovered.path): discovered
+            for discovered in self.project.discover_workflow_files()}
+
+    def get_workflow_data(self, relative_path: str, discovered: DiscoveredFile) -> Dict[str, Any]:
+        """The model of a workflow as plain data: its columns, and the rows of its parts."""
+        workflow = self.project.workflow_files.get(discovered.path)
+        summary = workflow.summary
+        metrics = workflow.get_activity_metrics()
+        data: Dict[str, Any] = dict(zip(WORKFLOW_COLUMNS, [
+            relative_path, discovered.size, discovered.mtime_ns, workflow.display_name,
+            workflow.get_annotation(),
+            None if summary.root_activity_tag is None else local_name(summary.root_activity_tag),
+            metrics.activity_count, metrics.max_depth]))
+        parts: Dict[str, Iterable[Tuple[Any, ...]]] = {
+            'arguments': workflow.get_arguments(),
+            'variables': workflow.get_variables(),
+            'invocations': (
+                invocation._replace(path=normalize_relative_path(invocation.path))
+                for invocation in summary.invocations),
+            'selectors': workflow.get_selectors(),
+        }
+        for part, records in parts.items():
+            data[part] = [dict(zip(PART_COLUMNS[part], record)) for record in records]
+        self.project.workflow_files.release()
+        return data
+
+    def get_project_data(self) -> Dict[str, Any]:
+        """The properties of the project, read from project.json."""
+        return {
+            'name': self.project.name,
+            'version': self.project.version,
+            'description': self.project.description,
+            'type': self.project.type,
+            'main': self.project.main,
+            'export_version': EXPORT_VERSION,
+        }
+
+    @abstractmethod
+    def export(self) -> None:
+        """Update the export: write the changed workflows, remove the deleted ones."""
+
+    def __init__(self, project: Project, target_dir: str = TARGET_DIR):
+        self.project = project
+        self.target_dir = target_dir
+        # paths relative to project.json written, and removed, by the last export
+        self.updated: List[str] = []
+        self.removed: List[str] = []
+
+class SQLiteExport(Export):
+    """Keep a normalized, indexed SQLite database of the project up to date."""
+
+    def get_target_path(self) -> str:
+        """Path of the database file."""
+        return os.path.join(self.target_dir, SQLITE_FILE)
+
+    @staticmethod
+    def get_export_version(connection: sqlite3.Connection) -> Optional[int]:
+        """The version of the existing database; None if it is new, or not an export."""
+        try:
+            row = connection.execute(
+                "SELECT value FROM project WHERE key = 'export_version'").fetchone()
+        except sqlite3.DatabaseError:
+            return None
+        return None if row is None else int(row[0])
+
+    def create_schema(self, connection: sqlite3.Connection) -> None:
+        """Create the tables, dropping the ones of an earlier version of the export."""
+        if self.get_export_version(connection) != EXPORT_VERSION:
+            for table in reversed(TABLES):
+                connection.execute(f'DROP TABLE IF EXISTS {table}')
+        connection.executescript(SCHEMA)
+
+    @staticmethod
+    def insert_workflow(connection: sqlite3.Connection, data: Dict[str, Any]) -> None:
+        """Insert the row of the workflow, and the rows of its parts."""
+        cursor = connection.execute(
+            f'INSERT INTO workflows ({", ".join(WORKFLOW_COLUMNS)}) '
+            f'VALUES ({", ".join("?" * len(WORKFLOW_COLUMNS))})',
+            [data[column] for column in WORKFLOW_COLUMNS])
+        workflow_id = cursor.lastrowid
+        for part, columns in PART_COLUMNS.items():
+            connection.executemany(
+                f'INSERT INTO {part} (workflow_id, position, {", ".join(columns)}) '
+                f'VALUES (?, ?, {", ".join("?" * len(columns))})',
+                ([workflow_id, position, *[row[column] for column in columns]]
+                    for position, row in enumerate(data[part])))
+
+    def export(self) -> None:
+        os.makedirs(self.target_dir, exist_ok=True)
+        connection = sqlite3.connect(self.get_target_path())
+        try:
+            connection.execute('PRAGMA foreign_keys = ON')
+            self.create_schema(connection)
+            with connection:
+                existing: Dict[str, Tuple[int, int, int]] = {
+                    path: (workflow_id, size, mtime_ns)
+                    for workflow_id, path, size, mtime_ns in connection.execute(
+                        'SELECT id, path, size, mtime_ns FROM workflows')}
+                self.updated, self.removed = [], []
+                for relative_path, discovered in self.get_files().items():
+                    row = existing.pop(relative_path, None)
+                    if row is not None and row[1:] == (discovered.size, discovered.mtime_ns):
+                        continue
+                    if row is not None:
+                        connection.execute('DELETE FROM workflows WHERE id = ?', [row[0]])
+                    self.insert_workflow(
+                        connection, self.get_workflow_data(relative_path, discovered))
+                    self.updated.append(relative_path)
+                for relative_path, row in existing.items():
+                    connection.execute('DELETE FROM workflows WHERE id = ?', [row[0]])
+                    self.removed.append(relative_path)
+                connection.executemany(
+                    'INSERT OR REPLACE INTO project (key, value) VALUES (?, ?)',
+                    self.get_project_data().items())
+        finally:
+            connection.close()
+        logging.info('SQLite export: %d workflows written, %d removed.',
+            len(self.updated), len(self.removed))
+
+class JsonLinesExport(Export):
+    """Keep a JSON lines file of the project up to date: one workflow per line, by path."""
+
+    def get_target_path(self) -> str:
+        """Path of the JSON lines file."""
+        return os.path.join(self.target_dir, JSONL_FILE)
+
+    def read_lines(self) -> Dict[str, Tuple[int, int, str]]:
+        """The lines of the earlier export: (size, modification time, line) by path."""
+        lines: Dict[str, Tuple[int, int, str]] = {}
+        try:
+            with open(self.get_target_path(), encoding='utf-8') as export_file:
+                for line in export_file:
+                    data = json.loads(line)
+                    # the first line describes the project
+                    if 'path' in data:
+                        lines[data['path']] = (data['size'], data['mtime_ns'], line)
+                    elif data.get('export_version') != EXPORT_VERSION:
+                        return {}
+        except (OSError, ValueError, KeyError):
+            return {}
+        return lines
+
+    @staticmethod
+    def render_line(data: Dict[str, Any]) -> str:
+        """Serialize one line, compactly."""
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+    def export(self) -> None:
+        previous_lines = self.read_lines()
+        self.updated = []
+        lines = [self.render_line(self.get_project_data())]
+        for relative_path, discovered in self.get_files().items():
+            previous = previous_lines.pop(relative_path, None)
+            if previous is not None and previous[:2] == (discovered.size, discovered.mtime_ns):
+                lines.append(previous[2])
+                continue
+            lines.append(self.render_line(self.get_workflow_data(relative_path, discovered)))
+            self.updated.append(relative_path)
+        self.removed = list(previous_lines)
+
+        os.makedirs(self.target_dir, exist_ok=True)
+        with open(self.get_target_path(), 'w', encoding='utf-8') as export_file:
+            export_file.writelines(lines)
+        logging.info('JSON lines export: %d workflows written, %d removed.',
+            len(self.updated), len(self.removed))
+
+EXPORTS = {SQLITE: SQLiteExport, JSONL: JsonLinesExport}
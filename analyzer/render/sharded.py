@@ -0,0 +1,202 @@
+"""
+Generate the documentation as multiple pages: one per workflow or per folder, an index page
+and a search index used by the index page to look up workflows on the client side.
+
+Pages are only rendered again when one of their workflow files changed since the last run.
+"""
+
+from collections import Counter
+import hashlib
+import json
+import logging
+import os
+from html import escape as e
+from typing import Any, Dict, List, Tuple
+
+from analyzer.analyze.project import Project
+from analyzer.render.documentation import (
+    Documentation, OUTPUT_TEMPLATE_HEAD, OUTPUT_TEMPLATE_HEADER, OUTPUT_TEMPLATE_MAIN,
+    OUTPUT_TEMPLATE_FOOTER, TARGET_DIR)
+
+INDEX_FILE = 'index.html'
+PAGES_DIR = 'pages'
+SEARCH_INDEX_FILE = 'search-index.json'
+MANIFEST_FILE = '.shards.json'
+
+# To be increased whenever the rendering changes, so that every page is rendered again.
+RENDER_VERSION = 4
+
+SHARD_BY_WORKFLOW = 'workflow'
+SHARD_BY_FOLDER = 'folder'
+
+OUTPUT_TEMPLATE_PAGE_HEADER = OUTPUT_TEMPLATE_HEAD.format(title='{0} - {1}') + """\
+        <header>
+            <p><a href="../{2}">{0}</a></p>
+        </header>
+        <main>
+"""
+OUTPUT_TEMPLATE_INDEX_TOC_ITEM = """
+                    <dt><a href="{0}">{1}</a></dt>
+                    <dd>{2}</dd>
+"""
+OUTPUT_TEMPLATE_SEARCH = """<input type="search" id="search" placeholder="Search workflows">
+            <ol id="results"></ol>
+            <script>
+                fetch('{0}').then(response => response.json()).then(index => {{
+                    const search = document.getElementById('search');
+                    const results = document.getElementById('results');
+                    search.addEventListener('input', () => {{
+                        const query = search.value.toLowerCase();
+                        results.replaceChildren(...(query === '' ? [] : index.workflows
+                            .filter(entry => JSON.stringify(entry).toLowerCase().includes(query))
+                            .map(([name, path, url]) => {{
+                                const item = document.createElement('li');
+                                const link = document.createElement('a');
+                                link.href = url;
+                                link.textContent = `${{name}} (${{path}})`;
+                                item.appendChild(link);
+                                return item;
+                            }})));
+                    }});
+                }});
+            </script>"""
+
+class ShardedDocumentation(Documentation):
+    """Build multi-page HTML documentation, rendering only the pages whose workflows changed."""
+
+    def __init__(self, project: Project, shard_by: str = SHARD_BY_WORKFLOW):
+        if shard_by not in (SHARD_BY_WORKFLOW, SHARD_BY_FOLDER):
+            raise ValueError(f'Unknown shard mode: {shard_by}')
+        self.shard_by = shard_by
+        self.pages_dir = os.path.join(TARGET_DIR, PAGES_DIR)
+        super().__init__(project)
+
+    def get_file_relative_path(self, file_path: str) -> str:
+        """Get the path of the workflow file relative to project.json, as in the documentation."""
+        return file_path[len(self.project.project_directory):]
+
+    def get_shard_name(self, file_path: str) -> str:
+        """Get the file name of the page documenting the workflow."""
+        relative_path = self.get_file_relative_path(file_path)
+        if self.shard_by == SHARD_BY_FOLDER:
+            relative_path = os.path.dirname(relative_path) or '.'
+        return relative_path.replace('-','--').replace('/','-').replace('.','_') + '.html'
+
+    def get_shards(self) -> Dict[str, List[str]]:
+        """Group the workflow files by the page documenting them, keeping the order of the index."""
+        shards: Dict[str, List[str]] = {}
+        for file_path in self.project.workflow_files.get_file_paths():
+            shards.setdefault(self.get_shard_name(file_path), []).append(file_path)
+        return shards
+
+    def get_fingerprint(self, file_paths: List[str]) -> str:
+        """Identify the state of the files of a page without reading them."""
+        digest = hashlib.sha256(json.dumps([
+            RENDER_VERSION, self.project.name, self.project.version, self.project.description,
+        ]).encode())
+        for file_path in file_paths:
+            status = os.stat(file_path)
+            digest.update(f'{file_path}\0{status.st_size}\0{status.st_mtime_ns}\0'.encode())
+        return digest.hexdigest()
+
+    def read_manifest(self) -> Dict[str, Any]:
+        """Read the state of the pages generated by the previous run."""
+        try:
+            with open(os.path.join(TARGET_DIR, MANIFEST_FILE), encoding='utf-8') as manifest_file:
+                return json.load(manifest_file)
+        except (OSError, ValueError):
+            return {}
+
+    def render_shard(self, shard: str,
+            file_paths: List[str]) -> Tuple[List[List[Any]], Dict[str, int]]:
+        """Write the page of the workflows; return their entries for the search index, and
+        their activity counts by tag, to be kept in the manifest for the unchanged pages."""
+        search_entries = []
+        tag_counts: Counter = Counter()
+        with open(os.path.join(self.pages_dir, shard), 'w', encoding='utf-8') as page_file:
+            page_file.write(OUTPUT_TEMPLATE_PAGE_HEADER.format(
+                e(self.project.name), e(shard), INDEX_FILE))
+            for file_path in file_paths:
+                workflow = self.project.workflow_files.get(file_path)
+                page_file.write(self.render_workflow_documentation(workflow))
+                search_entries.append([
+                    workflow.display_name or "",
+                    self.get_workflow_relative_path(workflow),
+                    f'{PAGES_DIR}/{shard}#{self.get_workflow_id(workflow)}',
+                    [argument.name for argument in workflow.get_arguments()],
+                    workflow.get_annotation() or "",
+                ])
+                tag_counts.update(workflow.get_activity_metrics().tag_counts)
+            page_file.write(OUTPUT_TEMPLATE_FOOTER)
+        return search_entries, dict(tag_counts)
+
+    def write_index(self, search_entries: List[List[Any]],
+            tag_counts: List[Dict[str, int]]) -> None:
+        """Write the index page, linking the workflows in the same order as the single page.
+        tag_counts are the activity counts of the pages, read from the manifest if unchanged."""
+        # the main workflow is not loaded: its page may be unchanged
+        main_file_path = (None if self.project.main is None
+            else self.project.workflow_files.get_file_path(self.project.main))
+        main_path = (self.get_file_relative_path(main_file_path)
+            if main_file_path is not None else None)
+        ordered_entries = (
+            [entry for entry in search_entries if entry[1] == main_path]
+            + [entry for entry in search_entries if entry[1] != main_path])
+
+        with open(self.target_path, 'w', encoding='utf-8') as index_file:
+            index_file.write(OUTPUT_TEMPLATE_HEADER.format(
+                e(self.project.name),
+                e(self.project.version),
+                e(self.project.description)))
+            index_file.writelines(
+                OUTPUT_TEMPLATE_INDEX_TOC_ITEM.format(e(url), e(name), e(path))
+                for name, path, url, _, _ in ordered_entries)
+            index_file.write(OUTPUT_TEMPLATE_MAIN)
+            index_file.write(OUTPUT_TEMPLATE_SEARCH.format(SEARCH_INDEX_FILE))
+            index_file.write(self.render_dependencies(tag_counts))
+            index_file.write(OUTPUT_TEMPLATE_FOOTER)
+
+        with open(os.path.join(TARGET_DIR, SEARCH_INDEX_FILE), 'w', encoding='utf-8') as index_file:
+            json.dump(
+                {"fields": ["name", "path", "url", "arguments", "annotation"],
+                    "workflows": search_entries},
+                index_file, separators=(',', ':'))
+
+    def build_documentation(self):
+        """Render the changed pages, remove the obsolete ones, then write the index."""
+        self.target_path = os.path.join(TARGET_DIR, INDEX_FILE)
+        os.makedirs(self.pages_dir, exist_ok=True)
+
+        previous_manifest = self.read_manifest()
+        shards = self.get_shards()
+        fingerprints = {
+            shard: self.get_fingerprint(file_paths) for shard, file_paths in shards.items()}
+        changed = set(shard
+            for shard in shards
+            if shard not in previous_manifest
+                or previous_manifest[shard]['fingerprint'] != fingerprints[shard]
+                or not os.path.exists(os.path.join(self.pages_dir, shard)))
+        self.project.workflow_files.load_all(
+            file_path for shard in changed for file_path in shards[shard])
+
+        manifest: Dict[str, Any] = {}
+        search_entries: List[List[Any]] = []
+        tag_counts: List[Dict[str, int]] = []
+        for shard, file_paths in shards.items():
+            if shard in changed:
+                logging.info('Rendering %s', shard)
+                shard_entries, shard_activities = self.render_shard(shard, file_paths)
+                manifest[shard] = {"fingerprint": fingerprints[shard],
+                    "search": shard_entries, "activities": shard_activities}
+            else:
+                manifest[shard] = previous_manifest[shard]
+            search_entries.extend(manifest[shard]['search'])
+            tag_counts.append(manifest[shard]['activities'])
+
+        for shard in previous_manifest:
+            if shard not in manifest and os.path.exists(os.path.join(self.pages_dir, shard)):
+                os.remove(os.path.join(self.pages_dir, shard))
+
+        self.write_index(search_entries, tag_counts)
+        with open(os.path.join(TARGET_DIR, MANIFEST_FILE), 'w', encoding='utf-8') as manifest_file:
+            json.dump(manifest, manifest_file, separators=(',', ':'))
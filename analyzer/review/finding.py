@@ -0,0 +1,14 @@
+"""Contains Finding, a violation of a rule found by the review."""
+
+from dataclasses import dataclass
+
+@dataclass
+class Finding():
+    """A rule violated by a workflow, variable or argument."""
+    rule: str
+    workflow: str
+    subject: str
+    message: str
+
+    def __str__(self):
+        return f'{self.rule}: {self.workflow}: "{self.subject}" {self.message}'
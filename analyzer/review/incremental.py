@@ -0,0 +1,116 @@
+"""Review only the workflows affected by a change, reusing the findings of an earlier review.
+
+A workflow is affected if its file changed, or if it invokes a changed (or deleted) file,
+as the contract of the invoked workflow, i.e. its arguments, may have changed.
+
+The invocations and the signatures of the unchanged workflows are taken from the state saved
+by the earlier review (see state.py), so that only the affected workflows are read. The other
+deliverables of a run, e.g. the documentation, still read every workflow: from the parse
+cache, if unchanged.
+"""
+
+import heapq
+import os
+import subprocess
+from typing import Iterable, List, Optional, Set, Tuple
+
+from analyzer.analyze.graph import InvocationGraph
+from analyzer.analyze.index import normalize_relative_path
+from analyzer.analyze.project import Project
+from analyzer.analyze.snapshot import SnapshotDelta
+from analyzer.analyze.workflow import Workflow
+from analyzer.review.finding import Finding
+from analyzer.review.results import NUNIT
+from analyzer.review.review import Review
+from analyzer.review.state import ReviewState
+
+# These rules depend on the entire project, so they are evaluated again in every review;
+# so are the rules comparing the project with a baseline snapshot.
+PROJECT_WIDE_RULES = frozenset(['workflows.mustHaveReference'])
+BASELINE_PREFIX = 'baseline.'
+
+def get_changed_files(project_directory: str, base_revision: str) -> List[str]:
+    """List the .xaml files changed since base_revision, relative to project.json.
+
+    Uncommitted and untracked files are considered changed too. Only the local repository is
+    used, no remote."""
+    def git(*arguments: str) -> List[str]:
+        result = subprocess.run(
+            ['git', *arguments], cwd=project_directory,
+            capture_output=True, text=True, check=True)
+        return [line for line in result.stdout.splitlines() if line != '']
+
+    changed = git('diff', '--name-only', '--relative', base_revision, '--', '*.xaml')
+    untracked = git('ls-files', '--others', '--exclude-standard', '--', '*.xaml')
+    return [normalize_relative_path(path) for path in dict.fromkeys(changed + untracked)]
+
+def get_affected_workflows(graph: InvocationGraph, changed_files: Iterable[str]) -> Set[str]:
+    """The changed workflows still existing, and the ones invoking any of the changed files."""
+    changed = set(map(normalize_relative_path, changed_files))
+    affected = {node for node in changed if node in graph.callers}
+    for node in changed:
+        affected.update(graph.callers.get(node, []))
+    # invocations of deleted files are not edges of the graph; the files invoked by an
+    # expression (graph.dynamic) are unknown until run time, so these are not matched
+    affected.update(
+        caller
+        for caller, callees in graph.missing.items()
+        if not changed.isdisjoint(callees))
+    return affected
+
+class IncrementalReview(Review):
+    """Review the affected workflows only; keep the earlier findings of the other ones.
+
+    Project-wide rules, like mustHaveReference, are evaluated entirely each time."""
+
+    # the arguments of Review, with the changes and what the earlier review left
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+            self, project: Project, changed_files: Iterable[str],
+            previous_findings: List[Finding], graph: Optional[InvocationGraph] = None,
+            output_format: str = NUNIT, delta: Optional[SnapshotDelta] = None,
+            previous_state: Optional[ReviewState] = None):
+        self.changed_files = [
+            os.path.relpath(path, project.project_directory) if os.path.isabs(path) else path
+            for path in changed_files]
+        self.previous_findings = previous_findings
+        # without it, every workflow is read to build the graph and the signatures
+        self.previous_state = previous_state
+        self.affected: Set[str] = set()
+        super().__init__(project, graph, output_format, delta)
+
+    def get_state(self) -> ReviewState:
+        """Read the invocations and the signatures of the changed workflows only."""
+        if self._state is None:
+            self._state = ReviewState.collect(
+                self.project, self.previous_state, self.changed_files)
+        return self._state
+
+    def get_workflows(self) -> Iterable[Workflow]:
+        """The workflows affected by the change."""
+        graph = self.get_graph()
+        self.affected = get_affected_workflows(graph, self.changed_files)
+        index = self.project.workflow_files
+        return [index.get_by_relative_path(node) for node in graph.nodes if node in self.affected]
+
+    def evaluate(self) -> None:
+        """Review the affected workflows, then add the still valid findings of the others."""
+        super().evaluate()
+        graph = self.get_graph()
+        # same order as in a full review: by rule, then by workflow
+        rule_order = {rule: order for order, rule in enumerate(self.rules_checked)}
+        workflow_order = {node: order for order, node in enumerate(graph.nodes)}
+        def get_order(finding: Finding) -> Tuple[int, int]:
+            return rule_order[finding.rule], workflow_order.get(finding.workflow, -1)
+
+        previous_findings = sorted((
+            finding for finding in self.previous_findings
+            if finding.workflow in graph.callers
+                and finding.workflow not in self.affected
+                and finding.rule in self.rules_checked
+                and finding.rule not in PROJECT_WIDE_RULES
+                and not finding.rule.startswith(BASELINE_PREFIX)), key=get_order)
+        # both are in the order of a full review, so they are merged in one pass, the new
+        # findings streamed from disk and written to it again if the memory budget is exceeded
+        new_findings = self.findings
+        self.findings = self.create_findings()
+        self.findings.extend(heapq.merge(new_findings, previous_findings, key=get_order))
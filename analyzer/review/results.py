@@ -0,0 +1,136 @@
+"""Write the results of the review for CI/CD tools, as NUnit 3 or JUnit XML, with flat memory.
+
+The totals of the run and of its suites are attributes of their start tags, so they must be
+known before the first case is written. Therefore the findings are counted while being spooled
+to a temporary file, then the document is streamed with lxml.etree.xmlfile in a final pass,
+one element at a time: no tree of the entire results is ever built.
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import astuple
+import json
+import tempfile
+from typing import Dict, Iterable, Iterator, List, TextIO
+
+from lxml.etree import Element, SubElement, xmlfile
+
+from analyzer.review.finding import Finding
+
+NUNIT = 'nunit'
+JUNIT = 'junit'
+FORMATS = [NUNIT, JUNIT]
+
+def spool_findings(findings: Iterable[Finding], rules: List[str],
+        spool: TextIO) -> Dict[str, int]:
+    """Write the findings into the spool file, one JSON line each, and count them by rule.
+
+    The findings must be grouped by rule, in the order of rules, as the review produces them."""
+    counts = {rule: 0 for rule in rules}
+    order = {rule: position for position, rule in enumerate(rules)}
+    current = 0
+    for finding in findings:
+        position = order[finding.rule]
+        if position < current:
+            raise ValueError(f'Findings of {finding.rule} are not grouped together.')
+        current = position
+        counts[finding.rule] += 1
+        spool.write(json.dumps(astuple(finding)) + '\n')
+    return counts
+
+def read_spool(spool: TextIO) -> Iterator[Finding]:
+    """Read the findings back from the spool file."""
+    spool.seek(0)
+    return (Finding(*json.loads(line)) for line in spool)
+
+class ResultWriter(ABC):
+    """Stream the results of the review into an XML file."""
+
+    def __init__(self, name: str, rules: List[str]):
+        # name of the test run: the project
+        self.name = name
+        # every rule checked is a suite, passed if it has no findings
+        self.rules = rules
+
+    def write(self, path: str, findings: Iterable[Finding]) -> None:
+        """Count the findings in a first pass, then write the document in a second one."""
+        with tempfile.TemporaryFile('w+', encoding='utf-8') as spool:
+            counts = spool_findings(findings, self.rules, spool)
+            with xmlfile(path, encoding='utf-8') as output:
+                output.write_declaration()
+                self.write_document(output, counts, read_spool(spool))
+
+    @abstractmethod
+    def write_document(self, output: xmlfile, counts: Dict[str, int],
+            findings: Iterator[Finding]) -> None:
+        """Write the root element; counts are the number of findings by rule."""
+
+class NUnitWriter(ResultWriter):
+    """NUnit 3 test-run: a test-suite per rule, a failed test-case per finding."""
+
+    def write_document(self, output: xmlfile, counts: Dict[str, int],
+            findings: Iterator[Finding]) -> None:
+        # a suite without findings has a single passed case
+        total = sum(max(1, count) for count in counts.values())
+        failed = sum(counts.values())
+        with output.element('test-run', {
+                'id': '0', 'name': self.name, 'total': str(total), 'failed': str(failed),
+                'passed': str(total - failed), 'result': 'Passed' if failed == 0 else 'Failed'}):
+            for suite_id, (rule, count) in enumerate(counts.items(), 1):
+                output.write('\n  ')
+                with output.element('test-suite', {
+                        'type': 'TestSuite', 'id': str(suite_id), 'name': rule,
+                        'result': 'Failed' if count else 'Passed',
+                        'total': str(max(1, count)), 'failed': str(count)}):
+                    if count == 0:
+                        output.write('\n    ')
+                        output.write(Element(
+                            'test-case', id=f'{suite_id}-0', name=rule, result='Passed'))
+                    for case_id in range(1, count + 1):
+                        output.write('\n    ')
+                        output.write(self.render_case(f'{suite_id}-{case_id}', next(findings)))
+                    output.write('\n  ')
+            output.write('\n')
+
+    @staticmethod
+    def render_case(case_id: str, finding: Finding) -> Element:
+        """A failed test-case, with the message of the finding."""
+        case = Element('test-case', id=case_id,
+            name=f'{finding.workflow}: {finding.subject}', result='Failed')
+        SubElement(SubElement(case, 'failure'), 'message').text = finding.message
+        return case
+
+class JUnitWriter(ResultWriter):
+    """JUnit testsuites: a testsuite per rule, a failed testcase per finding."""
+
+    def write_document(self, output: xmlfile, counts: Dict[str, int],
+            findings: Iterator[Finding]) -> None:
+        with output.element('testsuites', {
+                'name': self.name, 'tests': str(sum(max(1, count) for count in counts.values())),
+                'failures': str(sum(counts.values()))}):
+            for rule, count in counts.items():
+                output.write('\n  ')
+                with output.element('testsuite', {
+                        'name': rule, 'tests': str(max(1, count)), 'failures': str(count)}):
+                    if count == 0:
+                        output.write('\n    ')
+                        output.write(Element('testcase', name=rule, classname=rule))
+                    for _ in range(count):
+                        output.write('\n    ')
+                        output.write(self.render_case(next(findings)))
+                    output.write('\n  ')
+            output.write('\n')
+
+    @staticmethod
+    def render_case(finding: Finding) -> Element:
+        """A failed testcase, with the message of the finding."""
+        case = Element('testcase', name=f'{finding.workflow}: {finding.subject}',
+            classname=finding.rule)
+        SubElement(case, 'failure', message=finding.message, type=finding.rule)
+        return case
+
+WRITERS = {NUNIT: NUnitWriter, JUNIT: JUnitWriter}
+
+def write_results(path: str, name: str, rules: List[str], findings: Iterable[Finding],
+        output_format: str = NUNIT) -> None:
+    """Write the results of a review in the given format."""
+    WRITERS[output_format](name, rules).write(path, findings)
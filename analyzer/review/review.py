@@ -1,20 +1,545 @@
 """Review the project based on the validationRules.json file contained in its root.
 
 If it is not available, fall back to validationRules.json in the current module's folder.
+
+The rules are compiled once into checkers. Each checker evaluates a rule for every workflow,
+variable or argument of the project at once, working on columns (lists of names, annotations,
+etc.) rather than object by object.
 """
 
+from dataclasses import asdict, astuple, dataclass, field
+import json
+import logging
+import os
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from analyzer.analyze.contracts import ContractViolations, SignatureTable, check_invocation
+from analyzer.analyze.graph import InvocationGraph
+from analyzer.analyze.index import normalize_relative_path
+from analyzer.analyze.memory import SpillList
+from analyzer.analyze.metrics import get_default_display_name
 from analyzer.analyze.project import Project
+from analyzer.analyze.selectors import SelectorAnalysis, SelectorAnalyzer
+from analyzer.analyze.snapshot import SnapshotDelta
+from analyzer.analyze.records import ArgumentDirection, ArgumentRecord
+from analyzer.analyze.usages import Declaration, IdentifierIndex
+from analyzer.analyze.workflow import Workflow
+from analyzer.review.finding import Finding
+from analyzer.review.results import NUNIT, write_results
+from analyzer.review.state import STATE_FILE, ReviewState
+
+TARGET_DIR  = './deliverables/review'
+TARGET_FILE = 'ReviewResult.xml'
+# The findings in a machine-readable form, to be reused by incremental reviews.
+FINDINGS_FILE = 'findings.json'
+
+@dataclass
+class MetricColumns():
+    """The metrics of the workflows, column by column."""
+    argument_counts: List[int] = field(default_factory=list)
+    activity_counts: List[int] = field(default_factory=list)
+    nesting_depths: List[int] = field(default_factory=list)
+    deepest_paths: List[Tuple[str, ...]] = field(default_factory=list)
+
+@dataclass
+class ActivityColumns():
+    """What is checked of the activities, column by column; rows are named by the activity."""
+    # only used for the activities having their default names
+    activity_types: List[str] = field(default_factory=list)
+    # only used for selectors
+    selectors: List[str] = field(default_factory=list)
+    # only used for invocations of workflows of the project
+    invoked: List[str] = field(default_factory=list)
+    contract_violations: List[ContractViolations] = field(default_factory=list)
+
+@dataclass
+class UsageColumns():
+    """How the variables and arguments are used, column by column."""
+    usage_counts: List[int] = field(default_factory=list)
+    # the declaration hidden by the variable, and the activities using it out of its scope
+    shadowed: List[Optional[str]] = field(default_factory=list)
+    out_of_scope_uses: List[Tuple[str, ...]] = field(default_factory=list)
+
+@dataclass
+class Columns():
+    """The declarations of one kind (e.g. variables) of the entire project, column by column."""
+    workflows: List[str] = field(default_factory=list)
+    names: List[str] = field(default_factory=list)
+    annotations: List[Optional[str]] = field(default_factory=list)
+    default_values: List[Optional[str]] = field(default_factory=list)
+    # only used for workflows
+    metrics: MetricColumns = field(default_factory=MetricColumns)
+    # only used for activities, selectors and invocations
+    activities: ActivityColumns = field(default_factory=ActivityColumns)
+    # only used for variables and arguments
+    usages: UsageColumns = field(default_factory=UsageColumns)
+
+    def append(self, workflow: str, name: str, annotation: Optional[str],
+            default_value: Optional[str] = None) -> None:
+        """Add a row to the table."""
+        self.workflows.append(workflow)
+        self.names.append(name or "")
+        self.annotations.append(annotation)
+        self.default_values.append(default_value)
+
+# A checker returns the failing rows of the columns, with the reason of the failure.
+Checker = Callable[[Columns], Iterable[Tuple[int, str]]]
+
+def check_naming_convention(pattern: str) -> Checker:
+    """Names must match the pattern entirely. Each distinct name is matched only once."""
+    regex = re.compile(pattern)
+    def checker(columns: Columns) -> Iterable[Tuple[int, str]]:
+        invalid_names = {name for name in set(columns.names) if regex.fullmatch(name) is None}
+        return ((row, f'does not match {pattern}')
+            for row, name in enumerate(columns.names)
+            if name in invalid_names)
+    return checker
+
+def check_max_length(max_length: int) -> Checker:
+    """Names must not be longer than max_length."""
+    def checker(columns: Columns) -> Iterable[Tuple[int, str]]:
+        return ((row, f'is longer than {max_length} characters')
+            for row, name in enumerate(columns.names)
+            if len(name) > max_length)
+    return checker
+
+def check_annotation(columns: Columns) -> Iterable[Tuple[int, str]]:
+    """An annotation is required."""
+    return ((row, 'has no annotation')
+        for row, annotation in enumerate(columns.annotations)
+        if not annotation)
+
+def check_default_value(columns: Columns) -> Iterable[Tuple[int, str]]:
+    """A default value is required."""
+    return ((row, 'has no default value')
+        for row, default_value in enumerate(columns.default_values)
+        if not default_value)
+
+def check_max_count(column_name: str, max_count: int, description: str) -> Checker:
+    """The values of the (numeric) column must not exceed max_count."""
+    def checker(columns: Columns) -> Iterable[Tuple[int, str]]:
+        return ((row, f'has {count} {description} (more than {max_count})')
+            for row, count in enumerate(getattr(columns.metrics, column_name))
+            if count > max_count)
+    return checker
+
+def check_used(columns: Columns) -> Iterable[Tuple[int, str]]:
+    """Variables and arguments must be used by an expression."""
+    return ((row, 'is never used')
+        for row, usage_count in enumerate(columns.usages.usage_counts)
+        if usage_count == 0)
+
+def check_shadowing(columns: Columns) -> Iterable[Tuple[int, str]]:
+    """Variables must not hide the variables of the enclosing scopes, or the arguments."""
+    return ((row, f'hides {shadowed}')
+        for row, shadowed in enumerate(columns.usages.shadowed)
+        if shadowed is not None)
+
+def check_scope(columns: Columns) -> Iterable[Tuple[int, str]]:
+    """Variables must not be used outside of the scope declaring them."""
+    return ((row, 'is used outside of its scope by ' + ', '.join(uses))
+        for row, uses in enumerate(columns.usages.out_of_scope_uses)
+        if uses)
+
+def check_max_nesting(max_depth: int) -> Checker:
+    """Activities must not be nested deeper than max_depth; the deepest path is reported."""
+    def checker(columns: Columns) -> Iterable[Tuple[int, str]]:
+        return ((row, f'has {depth} nested activity layers (more than {max_depth}): '
+                + ' > '.join(columns.metrics.deepest_paths[row]))
+            for row, depth in enumerate(columns.metrics.nesting_depths)
+            if depth > max_depth)
+    return checker
+
+def check_default_name(activity_types: Iterable[str]) -> Checker:
+    """Activities of these types must be renamed from their default DisplayName."""
+    types = frozenset(activity_types)
+    def checker(columns: Columns) -> Iterable[Tuple[int, str]]:
+        return ((row, f'has the default DisplayName "{get_default_display_name(activity_type)}"')
+            for row, activity_type in enumerate(columns.activities.activity_types)
+            if activity_type in types)
+    return checker
+
+def check_selector(analyzer: SelectorAnalyzer,
+        describe: Callable[[SelectorAnalysis], Optional[str]]) -> Checker:
+    """Flag each occurrence of the selectors for which describe returns a problem.
+
+    Selectors are analysed by the (shared) analyzer, so each distinct selector only once."""
+    def checker(columns: Columns) -> Iterable[Tuple[int, str]]:
+        for row, selector in enumerate(columns.activities.selectors):
+            problem = describe(analyzer.analyze(selector))
+            if problem is not None:
+                yield row, problem
+    return checker
+
+def describe_list(description: str, issues: Tuple[str, ...]) -> Optional[str]:
+    """Describe the issues of a selector, if there are any."""
+    return f'{description}: ' + ', '.join(issues) if issues else None
+
+# the checks of the selectors, by the name of the rule enabling them
+SELECTOR_CHECKS: Dict[str, Callable[[SelectorAnalysis], Optional[str]]] = {
+    'checkValidXML': lambda analysis: (
+        None if analysis.error is None
+        else f'has a selector not being valid XML: {analysis.error}'),
+    'checkIdxAttribute': lambda analysis: describe_list(
+        'has a selector using idx', analysis.idx),
+    'checkWildcard': lambda analysis: describe_list(
+        'has a selector using wildcards', analysis.wildcards),
+    'checkRegex': lambda analysis: describe_list(
+        'has a selector using regular expressions', analysis.regex),
+}
+
+def check_contract(describe: Callable[[ContractViolations], Tuple[str, ...]],
+        description: str) -> Checker:
+    """Flag the invocations passing arguments not matching the invoked workflow."""
+    def checker(columns: Columns) -> Iterable[Tuple[int, str]]:
+        for row, violations in enumerate(columns.activities.contract_violations):
+            issues = describe(violations)
+            if issues:
+                yield row, f'{description} {columns.activities.invoked[row]}: ' + ', '.join(issues)
+    return checker
+
+# the checks of the arguments passed by invocations, by the name of the rule enabling them
+CONTRACT_CHECKS: Dict[str, Tuple[Callable[[ContractViolations], Tuple[str, ...]], str]] = {
+    'checkMissingArguments': (
+        lambda violations: violations.missing, 'does not pass the required arguments of'),
+    'checkExtraArguments': (
+        lambda violations: violations.extra, 'passes arguments not declared by'),
+    'checkArgumentDirections': (
+        lambda violations: violations.directions, 'passes arguments in another direction to'),
+    'checkArgumentTypes': (
+        lambda violations: violations.types, 'passes arguments of another type to'),
+}
+
+def compile_declaration_rules(rules: Dict[str, Any]) -> Dict[str, Checker]:
+    """Assemble the checkers valid for any kind of declaration: workflows, variables, arguments."""
+    checkers: Dict[str, Checker] = {}
+    naming_convention = rules.get('namingConvention', {})
+    if 'pattern' in naming_convention:
+        checkers['namingConvention'] = check_naming_convention(naming_convention['pattern'])
+    if 'maxLength' in naming_convention:
+        checkers['maxLength'] = check_max_length(naming_convention['maxLength'])
+    if rules.get('annotationRequired', False):
+        checkers['annotationRequired'] = check_annotation
+    if rules.get('defaultValueRequired', False):
+        checkers['defaultValueRequired'] = check_default_value
+    return checkers
+
+def compile_rules(rules: Dict[str, Any], selector_analyzer: Optional[SelectorAnalyzer] = None
+        ) -> Dict[str, Dict[str, Checker]]:
+    """Assemble the checkers by the kind of declarations they check, then by rule name."""
+    compiled = {
+        kind: compile_declaration_rules(rules.get(kind, {}))
+        for kind in ['workflows', 'variables', 'inArguments', 'outArguments', 'ioArguments']}
+
+    for kind in ['variables', 'inArguments', 'outArguments', 'ioArguments']:
+        if rules.get(kind, {}).get('mustBeUsed', False):
+            compiled[kind]['mustBeUsed'] = check_used
+    if not rules.get('variables', {}).get('allowShadowing', True):
+        compiled['variables']['allowShadowing'] = check_shadowing
+    if rules.get('variables', {}).get('checkScope', False):
+        compiled['variables']['checkScope'] = check_scope
+
+    workflow_rules = rules.get('workflows', {})
+    if 'maxArguments' in workflow_rules:
+        compiled['workflows']['maxArguments'] = check_max_count(
+            'argument_counts', workflow_rules['maxArguments'], 'arguments')
+    if 'maxActivityCount' in workflow_rules:
+        compiled['workflows']['maxActivityCount'] = check_max_count(
+            'activity_counts', workflow_rules['maxActivityCount'], 'activities')
+    if 'maxNestingLayer' in workflow_rules:
+        compiled['workflows']['maxNestingLayer'] = check_max_nesting(
+            workflow_rules['maxNestingLayer'])
+
+    # the rules of the activities are given by activity type
+    compiled['activities'] = {}
+    default_name_types = [
+        activity_type
+        for activity_type, activity_rules in rules.get('activities', {}).items()
+        if not activity_rules.get('allowDefaultName', True)]
+    if default_name_types:
+        compiled['activities']['allowDefaultName'] = check_default_name(default_name_types)
+
+    analyzer = selector_analyzer if selector_analyzer is not None else SelectorAnalyzer()
+    compiled['selectors'] = {
+        rule: check_selector(analyzer, describe)
+        for rule, describe in SELECTOR_CHECKS.items()
+        if rules.get('selectors', {}).get(rule, False)}
+
+    compiled['invocations'] = {
+        rule: check_contract(describe, description)
+        for rule, (describe, description) in CONTRACT_CHECKS.items()
+        if rules.get('invocations', {}).get(rule, False)}
+    return compiled
 
-class Review():
+# A baseline check returns the failing workflows (or the project), subjects and reasons.
+BaselineCheck = Callable[[SnapshotDelta], Iterable[Tuple[str, str, str]]]
+
+def check_increase(metric: str, max_increase: int, description: str) -> BaselineCheck:
+    """The metric of a workflow must not grow by more than max_increase since the baseline."""
+    def check(delta: SnapshotDelta) -> Iterable[Tuple[str, str, str]]:
+        for workflow, changes in delta.changed.items():
+            old, new = changes.get(metric, (0, 0))
+            if new - old > max_increase:
+                yield (workflow, workflow,
+                    f'has {new} {description}, {new - old} more than the baseline')
+    return check
+
+def check_new_annotation(delta: SnapshotDelta) -> Iterable[Tuple[str, str, str]]:
+    """New workflows must have an annotation, the others must keep theirs."""
+    for workflow, metrics in delta.current.workflows.items():
+        baseline = delta.baseline.workflows.get(workflow)
+        if baseline is None and not metrics.annotated:
+            yield workflow, workflow, 'is new, and has no annotation'
+        elif baseline is not None and baseline.annotated and not metrics.annotated:
+            yield workflow, workflow, 'lost its annotation'
+
+def check_coverage(delta: SnapshotDelta) -> Iterable[Tuple[str, str, str]]:
+    """The share of the workflows and of the arguments having an annotation must not decrease."""
+    return ((delta.current.project_name, name,
+            f'has {new:.1%} annotated, less than the baseline ({old:.1%})')
+        for name, (old, new) in delta.coverage.items()
+        if new < old)
+
+# rule: (metric, description of its unit)
+BASELINE_INCREASE_CHECKS = {
+    'maxArgumentsIncrease': ('arguments', 'arguments'),
+    'maxVariablesIncrease': ('variables', 'variables'),
+    'maxActivitiesIncrease': ('activities', 'activities'),
+    'maxNestingDepthIncrease': ('nesting_depth', 'nesting layers'),
+    'maxFanOutIncrease': ('fan_out', 'invoked workflows'),
+}
+
+def compile_baseline_rules(rules: Dict[str, Any]) -> Dict[str, BaselineCheck]:
+    """Assemble the checks of the changes since the baseline, by rule name."""
+    compiled = {
+        rule: check_increase(metric, rules[rule], description)
+        for rule, (metric, description) in BASELINE_INCREASE_CHECKS.items()
+        if rule in rules}
+    if rules.get('newWorkflowsAnnotationRequired', False):
+        compiled['newWorkflowsAnnotationRequired'] = check_new_annotation
+    if not rules.get('allowAnnotationCoverageDecrease', True):
+        compiled['allowAnnotationCoverageDecrease'] = check_coverage
+    return compiled
+
+def get_activity_label(display_name: Optional[str], id_ref: Optional[str]) -> str:
+    """Identify an activity in a finding: by its DisplayName, and its IdRef if it has one."""
+    if id_ref is None:
+        return display_name or ''
+    return f'{display_name} ({id_ref})' if display_name else id_ref
+
+def describe_declaration(usages: IdentifierIndex,
+        declaration: Optional[Declaration]) -> Optional[str]:
+    """Describe a declaration hidden by a variable: an argument, or the activity declaring it."""
+    if declaration is None:
+        return None
+    if declaration.scope == 0:
+        return 'an argument of the workflow'
+    scope = usages.get_scope(declaration.scope)
+    return 'a declaration of ' + get_activity_label(
+        scope.owner_display_name or scope.owner_tag, scope.owner_id_ref)
+
+ARGUMENT_KINDS = {
+    ArgumentDirection.in_arg: 'inArguments',
+    ArgumentDirection.out_arg: 'outArguments',
+    ArgumentDirection.inout_arg: 'ioArguments',
+}
+
+class ReviewFailedError(Exception):
+    """Raised when the project violates any of the rules."""
+
+class Review():  # pylint: disable=too-many-instance-attributes
     """Perform review. Generate XML output into deliverables, and verbose output on the
     terminal. In case the review is failed, error is raised."""
+    # Besides the rules and their results, the inputs given to a review (the output format, the
+    # graph shared by the daemon, the delta) and the state read once are kept as they are:
+    # grouping them would only add a level of indirection.
     VALIDATION_FILE_NAME = "validationRules.json"
 
-    def __init__(self, project: Project):
-        pass
+    def get_rules_path(self) -> str:
+        """Prefer the rules of the project, fall back to the default ones."""
+        project_rules = os.path.join(self.project.project_directory, self.VALIDATION_FILE_NAME)
+        if os.path.exists(project_rules):
+            return project_rules
+        return os.path.join(os.path.dirname(__file__), self.VALIDATION_FILE_NAME)
+
+    def load_rules(self) -> Dict[str, Any]:
+        """Read the rules file."""
+        with open(self.get_rules_path(), encoding='utf-8') as rules_file:
+            return json.load(rules_file)
+
+    def create_findings(self) -> Union[List[Finding], SpillList[Finding]]:
+        """An empty list of findings; within a memory budget, moved to disk once exceeded."""
+        if self.project.options.budget is None:
+            return []
+        return SpillList(self.project.options.budget, astuple, lambda row: Finding(*row))
+
+    def get_state(self) -> ReviewState:
+        """Read the invocations and the signatures of all workflows on first use."""
+        if self._state is None:
+            self._state = ReviewState.collect(self.project)
+        return self._state
+
+    def get_graph(self) -> InvocationGraph:
+        """Build the invocation graph on first use."""
+        if self._graph is None:
+            self._graph = InvocationGraph(self.project, self.get_state().get_references())
+        return self._graph
+
+    def get_workflows(self) -> Iterable[Workflow]:
+        """The workflows to be reviewed: all of them."""
+        return self.project.workflow_files
+
+    def get_columns(self) -> Dict[str, Columns]:
+        """Collect the declarations of all workflows, in one pass over the project."""
+        columns = {kind: Columns() for kind in
+            ['workflows', 'variables', 'inArguments', 'outArguments', 'ioArguments',
+                'activities', 'selectors', 'invocations']}
+        index = self.project.workflow_files
+        # the signatures of all workflows, even if only some of them are reviewed
+        signatures = (SignatureTable(self.get_state().get_signatures())
+            if self.checkers['invocations'] else None)
+        for workflow in self.get_workflows():
+            relative_path = index.get_relative_path(workflow.file_path)
+            arguments = list(workflow.get_arguments())
+
+            columns['workflows'].append(
+                relative_path, os.path.basename(relative_path), workflow.get_annotation())
+            metric_columns = columns['workflows'].metrics
+            metric_columns.argument_counts.append(len(arguments))
+            metrics = workflow.get_activity_metrics()
+            metric_columns.activity_counts.append(metrics.activity_count)
+            metric_columns.nesting_depths.append(metrics.max_depth)
+            metric_columns.deepest_paths.append(metrics.deepest_path)
+
+            # only the activities having their default names, identified by their IdRef
+            for activity_type, id_ref in metrics.default_named:
+                columns['activities'].append(relative_path, id_ref, None)
+                columns['activities'].activities.activity_types.append(activity_type)
+
+            for selector in workflow.get_selectors():
+                columns['selectors'].append(relative_path, get_activity_label(
+                    selector.owner_display_name, selector.owner_id_ref), None)
+                columns['selectors'].activities.selectors.append(selector.selector)
+
+            # invocations of files not in the project, or passing a dictionary, are not checked
+            for invocation in workflow.get_invocations() if signatures is not None else []:
+                signature = signatures.get(invocation.path)
+                if signature is None or invocation.arguments is None:
+                    continue
+                columns['invocations'].append(relative_path, get_activity_label(
+                    invocation.display_name, invocation.id_ref), None)
+                invocation_columns = columns['invocations'].activities
+                invocation_columns.invoked.append(normalize_relative_path(invocation.path))
+                invocation_columns.contract_violations.append(
+                    check_invocation(signature, invocation.arguments))
+
+            self.append_declarations(columns, relative_path, workflow, arguments)
+        return columns
+
+    @staticmethod
+    def append_declarations(columns: Dict[str, Columns], relative_path: str,
+            workflow: Workflow, arguments: List[ArgumentRecord]) -> None:
+        """Collect the variables and arguments of a workflow, with their usages."""
+        usages = workflow.get_usages()
+        variable_columns = columns['variables']
+        for variable in workflow.get_variables():
+            variable_columns.append(
+                relative_path, variable.name, variable.annotation, variable.default_value)
+            variable_columns.usages.usage_counts.append(
+                usages.get_usage_count(variable.name, variable.scope))
+            variable_columns.usages.shadowed.append(
+                describe_declaration(usages, usages.get_shadowed(variable.name, variable.scope)))
+            variable_columns.usages.out_of_scope_uses.append(tuple(dict.fromkeys(
+                usage.id_ref or '' for usage in usages.get_out_of_scope_usages(variable.name))))
+        for argument in arguments:
+            kind_columns = columns[ARGUMENT_KINDS[argument.direction]]
+            kind_columns.append(
+                relative_path, argument.name, argument.annotation, argument.default_value)
+            kind_columns.usages.usage_counts.append(usages.get_usage_count(argument.name, 0))
+
+    def evaluate(self) -> None:
+        """Run every checker over the columns of its kind of declarations."""
+        columns = self.get_columns()
+        for kind, checkers in self.checkers.items():
+            kind_columns = columns[kind]
+            for rule, checker in checkers.items():
+                self.rules_checked.append(f'{kind}.{rule}')
+                self.findings.extend(
+                    Finding(f'{kind}.{rule}', kind_columns.workflows[row],
+                        kind_columns.names[row], message)
+                    for row, message in checker(kind_columns))
+
+        if self.rules.get('workflows', {}).get('mustHaveReference', False):
+            self.rules_checked.append('workflows.mustHaveReference')
+            self.findings.extend(
+                Finding('workflows.mustHaveReference', workflow, workflow,
+                    'is not invoked by any workflow')
+                for workflow in self.get_graph().get_unreferenced())
+
+        # only checked when compared with a baseline snapshot
+        if self.delta is not None:
+            for rule, check in compile_baseline_rules(self.rules.get('baseline', {})).items():
+                self.rules_checked.append(f'baseline.{rule}')
+                self.findings.extend(
+                    Finding(f'baseline.{rule}', workflow, subject, message)
+                    for workflow, subject, message in check(self.delta))
+
+    def __init__(self, project: Project, graph: Optional[InvocationGraph] = None,
+            output_format: str = NUNIT, delta: Optional[SnapshotDelta] = None):
+        self.project = project
+        # of the results written for CI/CD tools: NUnit or JUnit
+        self.output_format = output_format
+        self._graph = graph
+        self._state: Optional[ReviewState] = None
+        # the changes since the baseline snapshot, if compared with one
+        self.delta = delta
+        self.rules = self.load_rules()
+        # the checkers of the selectors share one analyzer, for the entire project
+        self.checkers = compile_rules(self.rules)
+        self.rules_checked: List[str] = []
+        self.findings = self.create_findings()
+        self.evaluate()
+
+    @property
+    def passed(self) -> bool:
+        """The review is passed, if no rule is violated."""
+        return len(self.findings) == 0
 
     def write_deliverable(self) -> None:
         """Write the results as XML files to be picked up  by CI/CD tools"""
+        os.makedirs(TARGET_DIR, exist_ok=True)
+        write_results(os.path.join(TARGET_DIR, TARGET_FILE), self.project.name,
+            self.rules_checked, self.findings, self.output_format)
+        self.write_findings(os.path.join(TARGET_DIR, FINDINGS_FILE))
+        self.get_state().write(os.path.join(TARGET_DIR, STATE_FILE))
+
+    def write_findings(self, path: str) -> None:
+        """Save the findings, so that a later incremental review can reuse them.
+
+        Written one by one, the same way as json.dump(findings, indent=1) would."""
+        with open(path, 'w', encoding='utf-8') as findings_file:
+            separator = '[\n '
+            for finding in self.findings:
+                findings_file.write(separator)
+                findings_file.write(json.dumps(asdict(finding), indent=1).replace('\n', '\n '))
+                separator = ',\n '
+            findings_file.write('[]' if separator == '[\n ' else '\n]')
+
+    @staticmethod
+    def read_findings(path: str) -> List[Finding]:
+        """Read the findings saved by an earlier review."""
+        with open(path, encoding='utf-8') as findings_file:
+            return [Finding(**finding) for finding in json.load(findings_file)]
 
     def write_terminal_output(self) -> None:
         """Write the results to the terminal."""
+        for finding in self.findings:
+            logging.warning('%s', finding)
+        logging.info('Review: %d rules checked, %d findings.',
+            len(self.rules_checked), len(self.findings))
+
+    def raise_on_failure(self) -> None:
+        """Raise ReviewFailedError, if any rule is violated."""
+        if not self.passed:
+            raise ReviewFailedError(f'{len(self.findings)} review findings.')
@@ -0,0 +1,94 @@
+"""What a review needs to know of every workflow, kept with its findings for the next review.
+
+The invoked paths and the signature of each workflow are enough to build the invocation graph
+and the table of signatures. Stored with the size and the modification time of the file, they
+let an incremental review read the changed workflows only, not the entire project.
+"""
+
+import json
+import os
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from analyzer.analyze.contracts import Parameter, Signature, get_signature
+from analyzer.analyze.index import normalize_relative_path
+from analyzer.analyze.project import Project
+
+STATE_FILE = 'review-state.json'
+
+# To be increased whenever the state changes, so that an older one is not reused.
+STATE_VERSION = 1
+
+class WorkflowState(NamedTuple):
+    """The invocations and the arguments of a workflow, as of the size and time of its file."""
+    size: int
+    mtime_ns: int
+    # the invoked paths, as written in the invocations
+    references: Tuple[str, ...]
+    signature: Signature
+
+class ReviewState():
+    """The state of the workflows by their path relative to project.json, in the order of the
+    index."""
+
+    def __init__(self, workflows: Dict[str, WorkflowState]):
+        self.workflows = workflows
+
+    @classmethod
+    def collect(cls, project: Project, previous: Optional['ReviewState'] = None,
+            changed_files: Iterable[str] = ()) -> 'ReviewState':
+        """Read the state of the workflows; reuse the previous state of the files neither listed
+        as changed nor having another size or modification time since."""
+        index = project.workflow_files
+        changed = set(map(normalize_relative_path, changed_files))
+        known = {} if previous is None else previous.workflows
+        workflows: Dict[str, Optional[WorkflowState]] = {}
+        unknown = []
+        for file_path in index.get_file_paths():
+            relative_path = index.get_relative_path(file_path)
+            status = os.stat(file_path)
+            state = known.get(relative_path)
+            if (state is None or relative_path in changed
+                    or (state.size, state.mtime_ns) != (status.st_size, status.st_mtime_ns)):
+                unknown.append(file_path)
+                state = None
+            workflows[relative_path] = state
+
+        # all of them, in batches within a memory budget, or the few unknown ones
+        read = (index if len(unknown) == len(workflows)
+            else (index.get(file_path) for file_path in unknown))
+        for workflow in read:
+            status = os.stat(workflow.file_path)
+            workflows[index.get_relative_path(workflow.file_path)] = WorkflowState(
+                status.st_size, status.st_mtime_ns,
+                tuple(workflow.get_referenced_workflows()), get_signature(workflow))
+        return cls({path: state for path, state in workflows.items() if state is not None})
+
+    def get_references(self) -> Dict[str, Tuple[str, ...]]:
+        """The paths invoked by each workflow, see InvocationGraph."""
+        return {path: state.references for path, state in self.workflows.items()}
+
+    def get_signatures(self) -> Dict[str, Signature]:
+        """The signature of each workflow, see SignatureTable."""
+        return {path: state.signature for path, state in self.workflows.items()}
+
+    @classmethod
+    def read(cls, path: str) -> Optional['ReviewState']:
+        """Read the state written by an earlier review; None if there is none to reuse."""
+        try:
+            with open(path, encoding='utf-8') as state_file:
+                data = json.load(state_file)
+            if data['version'] != STATE_VERSION:
+                return None
+            return cls({
+                relative_path: WorkflowState(size, mtime_ns, tuple(references), {
+                    name: Parameter(*parameter) for name, parameter in signature.items()})
+                for relative_path, (size, mtime_ns, references, signature)
+                    in data['workflows'].items()})
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def write(self, path: str) -> None:
+        """Save the state, compactly."""
+        with open(path, 'w', encoding='utf-8') as state_file:
+            json.dump({'version': STATE_VERSION, 'workflows': self.workflows},
+                state_file, separators=(',', ':'))
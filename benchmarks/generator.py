@@ -0,0 +1,235 @@
+"""Generate synthetic UiPath projects of configurable size, for benchmarking the analyzer.
+
+The workflows mimic the files saved by Studio: arguments with annotations, variables, nested
+Sequence/If activities, UI activities with selectors, and InvokeWorkflowFile activities.
+Workflow i invokes workflows i*fan_out+1 ... i*fan_out+fan_out, so every workflow is reachable
+from Main.xaml.
+"""
+
+import argparse
+import json
+import os
+import random
+from dataclasses import dataclass
+from html import escape as e
+from typing import List
+
+ASSET_PROJECT_FILE = os.path.join(
+    os.path.dirname(__file__), os.pardir, 'tests', 'assets', 'project.json')
+
+WORKFLOW_TEMPLATE = """<Activity mc:Ignorable="sap sap2010 sads" x:Class="{name}"{defaults}
+ xmlns="http://schemas.microsoft.com/netfx/2009/xaml/activities"
+ xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"
+ xmlns:sads="http://schemas.microsoft.com/netfx/2010/xaml/activities/debugger"
+ xmlns:sap="http://schemas.microsoft.com/netfx/2009/xaml/activities/presentation"
+ xmlns:sap2010="http://schemas.microsoft.com/netfx/2010/xaml/activities/presentation"
+ xmlns:scg="clr-namespace:System.Collections.Generic;assembly=mscorlib"
+ xmlns:this="clr-namespace:"
+ xmlns:ui="http://schemas.uipath.com/workflow/activities"
+ xmlns:x="http://schemas.microsoft.com/winfx/2006/xaml">
+  <x:Members>{arguments}
+  </x:Members>
+  <sap2010:WorkflowViewState.IdRef>{name}_1</sap2010:WorkflowViewState.IdRef>
+  <TextExpression.NamespacesForImplementation>
+    <scg:List x:TypeArguments="x:String" Capacity="2">
+      <x:String>System</x:String>
+      <x:String>UiPath.Core</x:String>
+    </scg:List>
+  </TextExpression.NamespacesForImplementation>
+  <Sequence sap2010:Annotation.AnnotationText="{annotation}" DisplayName="{display_name}" \
+sap2010:WorkflowViewState.IdRef="Sequence_1">
+    <Sequence.Variables>{variables}
+    </Sequence.Variables>{body}
+  </Sequence>
+</Activity>
+"""
+ARGUMENT_TEMPLATE = """
+    <x:Property sap2010:Annotation.AnnotationText="{annotation}" Name="{name}" Type="{type}" />"""
+VARIABLE_TEMPLATE = """
+      <Variable x:TypeArguments="{type}" Name="{name}" Default="{default}" />"""
+IF_TEMPLATE = """
+{indent}<If Condition="[{condition}]" DisplayName="If {name}" \
+sap2010:WorkflowViewState.IdRef="If_{id}">
+{indent}  <If.Then>
+{indent}    <Sequence DisplayName="Then {name}" sap2010:WorkflowViewState.IdRef="Sequence_{id}">\
+{body}
+{indent}    </Sequence>
+{indent}  </If.Then>
+{indent}</If>"""
+SELECTOR_TEMPLATE = """
+{indent}<ui:Click DisplayName="Click {name}" sap2010:WorkflowViewState.IdRef="Click_{id}">
+{indent}  <ui:Click.Target>
+{indent}    <ui:Target Selector="{selector}" WaitForReady="INTERACTIVE" />
+{indent}  </ui:Click.Target>
+{indent}</ui:Click>"""
+ASSIGN_TEMPLATE = """
+{indent}<Assign DisplayName="Assign {name}" sap2010:WorkflowViewState.IdRef="Assign_{id}">
+{indent}  <Assign.To>
+{indent}    <OutArgument x:TypeArguments="x:String">[{name}]</OutArgument>
+{indent}  </Assign.To>
+{indent}  <Assign.Value>
+{indent}    <InArgument x:TypeArguments="x:String">[{name} + "."]</InArgument>
+{indent}  </Assign.Value>
+{indent}</Assign>"""
+INVOKE_TEMPLATE = """
+{indent}<ui:InvokeWorkflowFile DisplayName="Invoke {name}" \
+sap2010:WorkflowViewState.IdRef="InvokeWorkflowFile_{id}" WorkflowFileName="{path}">
+{indent}  <ui:InvokeWorkflowFile.Arguments>{arguments}
+{indent}  </ui:InvokeWorkflowFile.Arguments>
+{indent}</ui:InvokeWorkflowFile>"""
+INVOKE_ARGUMENT_TEMPLATE = """
+{indent}    <{direction}Argument x:TypeArguments="{type}" x:Key="{name}">\
+[{variable}]</{direction}Argument>"""
+
+# name prefix, direction, type, and the variable passed by the invoking workflows
+ARGUMENT_TYPES = [
+    ('in', 'In', 'x:String', 'strValue'),
+    ('out', 'Out', 'x:Int32', 'intCounter'),
+    ('io', 'InOut', 'scg:Dictionary(x:String, x:Object)', 'dicConfig'),
+    ('in', 'In', 'x:Boolean', 'boolFlag'),
+]
+SELECTORS = [
+    "<wnd app='notepad.exe' cls='Notepad' title='{0} - Notepad' />",
+    "<html app='chrome.exe' title='Portal*' /><webctrl id='{0}' tag='BUTTON' />",
+    "<wnd app='excel.exe' /><ctrl name='{0}' role='cell' idx='3' />",
+    "<html app='msedge.exe' matching:title='regex' title='^Report.*' />"
+    "<webctrl aaname='{0}' tag='A' />",
+]
+
+@dataclass
+class ProjectSize():
+    """The parameters of a generated project."""
+    workflows: int = 10
+    arguments: int = 4
+    variables: int = 4
+    depth: int = 3
+    selectors: int = 2
+    fan_out: int = 2
+
+class ProjectGenerator():
+    """Write a synthetic project into a folder."""
+
+    def __init__(self, size: ProjectSize, seed: int = 0):
+        self.size = size
+        self.random = random.Random(seed)
+        self.activity_id = 1
+
+    def get_workflow_path(self, index: int) -> str:
+        """Main.xaml, then workflows spread over a few folders."""
+        if index == 0:
+            return 'Main.xaml'
+        return f'Module{index % 7}/Workflow{index}.xaml'
+
+    def next_id(self) -> int:
+        """Get a unique number for the IdRef of an activity."""
+        self.activity_id += 1
+        return self.activity_id
+
+    def render_body(self, index: int, depth: int, invoked: List[int]) -> str:
+        """Render nested If activities, with the other activities at the innermost level."""
+        indent = '    ' + '      ' * depth
+        if depth < self.size.depth:
+            return IF_TEMPLATE.format(
+                indent=indent, condition=f'intCounter > {depth}', name=f'level {depth}',
+                id=self.next_id(), body=self.render_body(index, depth + 1, invoked))
+
+        fragments = [ASSIGN_TEMPLATE.format(indent=indent, name='strValue', id=self.next_id())]
+        for selector_index in range(self.size.selectors):
+            selector = self.random.choice(SELECTORS).format(f'element{selector_index}')
+            fragments.append(SELECTOR_TEMPLATE.format(
+                indent=indent, name=f'element {selector_index}', id=self.next_id(),
+                selector=e(selector)))
+        invoke_arguments = ''.join(
+            INVOKE_ARGUMENT_TEMPLATE.format(
+                indent=indent, direction=direction, type=argument_type,
+                name=self.get_argument_name(argument_index), variable=variable)
+            for argument_index, (_, direction, argument_type, variable)
+            in enumerate(map(self.get_argument_type, range(self.size.arguments))))
+        for invoked_index in invoked:
+            fragments.append(INVOKE_TEMPLATE.format(
+                indent=indent, name=f'Workflow{invoked_index}', id=self.next_id(),
+                path=self.get_workflow_path(invoked_index).replace('/', '\\'),
+                arguments=invoke_arguments))
+        return ''.join(fragments)
+
+    @staticmethod
+    def get_argument_type(argument_index: int):
+        """Cycle through the argument types."""
+        return ARGUMENT_TYPES[argument_index % len(ARGUMENT_TYPES)]
+
+    def get_argument_name(self, argument_index: int) -> str:
+        """Every workflow has the same arguments, so that invocations match the signatures."""
+        return f'{self.get_argument_type(argument_index)[0]}_ArgumentValue{argument_index}'
+
+    def render_workflow(self, index: int) -> str:
+        """Render the XAML of a workflow."""
+        name = os.path.splitext(os.path.basename(self.get_workflow_path(index)))[0]
+        arguments = []
+        defaults = []
+        for argument_index in range(self.size.arguments):
+            _, direction, argument_type, _ = self.get_argument_type(argument_index)
+            argument_name = self.get_argument_name(argument_index)
+            arguments.append(ARGUMENT_TEMPLATE.format(
+                annotation=f'Argument {argument_index} of {name}.',
+                name=argument_name, type=f'{direction}Argument({argument_type})'))
+            if direction == 'In' and argument_type == 'x:String':
+                defaults.append(f'\n this:{name}.{argument_name}="default"')
+        variables = [
+            VARIABLE_TEMPLATE.format(type='x:String', name='strValue', default='[String.Empty]'),
+            VARIABLE_TEMPLATE.format(type='x:Int32', name='intCounter', default='0'),
+            VARIABLE_TEMPLATE.format(
+                type='scg:Dictionary(x:String, x:Object)', name='dicConfig',
+                default='[New Dictionary(Of String, Object)]'),
+            VARIABLE_TEMPLATE.format(type='x:Boolean', name='boolFlag', default='False')]
+        variables.extend(
+            VARIABLE_TEMPLATE.format(
+                type='x:String', name=f'strVariable{variable_index}', default=e('[""]'))
+            for variable_index in range(max(0, self.size.variables - 4)))
+
+        first_invoked = index * self.size.fan_out + 1
+        invoked = [invoked_index
+            for invoked_index
+            in range(first_invoked, first_invoked + self.size.fan_out)
+            if invoked_index < self.size.workflows]
+
+        return WORKFLOW_TEMPLATE.format(
+            name=name, defaults=''.join(defaults), arguments=''.join(arguments),
+            annotation=e(f'Generated workflow number {index}.'),
+            display_name=f'Workflow {index}', variables=''.join(variables),
+            body=self.render_body(index, 0, invoked))
+
+    def generate(self, target_dir: str) -> None:
+        """Write project.json and the workflows."""
+        with open(ASSET_PROJECT_FILE, encoding='utf-8') as asset_file:
+            properties = json.load(asset_file)
+        properties['name'] = f'Benchmark{self.size.workflows}'
+        properties['description'] = f'Synthetic project: {self.size}'
+        properties['main'] = 'Main.xaml'
+
+        os.makedirs(target_dir, exist_ok=True)
+        with open(os.path.join(target_dir, 'project.json'), 'w', encoding='utf-8') as project_file:
+            json.dump(properties, project_file, indent=2)
+        for index in range(self.size.workflows):
+            workflow_path = os.path.join(target_dir, self.get_workflow_path(index))
+            os.makedirs(os.path.dirname(workflow_path), exist_ok=True)
+            with open(workflow_path, 'w', encoding='utf-8') as workflow_file:
+                workflow_file.write(self.render_workflow(index))
+
+def generate_project(target_dir: str, size: ProjectSize, seed: int = 0) -> None:
+    """Write a synthetic project of the given size into target_dir."""
+    ProjectGenerator(size, seed).generate(target_dir)
+
+def main(argv=None):
+    """Command line entry point: python -m benchmarks.generator TARGET_DIR --workflows 1000"""
+    parser = argparse.ArgumentParser(prog='benchmarks.generator', description=__doc__)
+    parser.add_argument('target_dir')
+    for name, default in vars(ProjectSize()).items():
+        parser.add_argument(f'--{name.replace("_", "-")}', type=int, default=default)
+    parser.add_argument('--seed', type=int, default=0)
+    arguments = vars(parser.parse_args(argv))
+    target_dir = arguments.pop('target_dir')
+    seed = arguments.pop('seed')
+    generate_project(target_dir, ProjectSize(**arguments), seed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Benchmark the analyzer on synthetic projects of growing size.
+
+    python -m benchmarks.run --sizes 10 100 1000 10000
+
+Every size is measured in a fresh process, so that the peak memory of a size is not inherited
+from the previous one. The results are compared to a stored baseline: the run fails if any
+timing or the peak memory grew by more than the tolerance.
+"""
+
+import argparse
+from dataclasses import asdict
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from analyzer.analyze.memory import get_peak_rss_kb
+from analyzer.analyze.options import AnalysisOptions
+from analyzer.analyze.project import Project
+from analyzer.render.documentation import Documentation
+from analyzer.review.review import Review
+from benchmarks.generator import ProjectSize, generate_project
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+DEFAULT_SIZES = [10, 100, 1000]
+DEFAULT_TOLERANCE = 0.25
+# Timing differences below this are measurement noise, even if above the tolerance.
+NOISE_SECONDS = 0.05
+METRICS = ['parse', 'documentation', 'review', 'peak_rss_kb']
+
+def measure(size: ProjectSize, jobs: int) -> Dict[str, Any]:
+    """Generate a project, then time the phases of the analysis on it."""
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as work_dir:
+        project_dir = os.path.join(work_dir, 'project')
+        generate_project(project_dir, size)
+        os.chdir(work_dir)
+        os.mkdir('deliverables')
+
+        results: Dict[str, Any] = {'size': asdict(size), 'jobs': jobs}
+        start = time.perf_counter()
+        project = Project(project_dir, AnalysisOptions(jobs=jobs))
+        project.workflow_files.load_all()
+        results['parse'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        Documentation(project)
+        results['documentation'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        Review(project)
+        results['review'] = time.perf_counter() - start
+
+        results['peak_rss_kb'] = get_peak_rss_kb()
+    return results
+
+def measure_in_new_process(size: ProjectSize, jobs: int) -> Dict[str, Any]:
+    """Measure in a spawned (not forked) process, starting with a clean memory footprint."""
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        return pool.apply(measure, (size, jobs))
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]],
+        tolerance: float) -> List[str]:
+    """List the metrics having grown by more than the tolerance, compared to the baseline."""
+    baseline_by_size = {json.dumps(entry['size'], sort_keys=True): entry for entry in baseline}
+    regressions = []
+    for entry in results:
+        base = baseline_by_size.get(json.dumps(entry['size'], sort_keys=True))
+        if base is None:
+            continue
+        for metric in METRICS:
+            if entry.get(metric) is None or base.get(metric) is None:
+                continue
+            noise = 0 if metric == 'peak_rss_kb' else NOISE_SECONDS
+            if entry[metric] > base[metric] * (1 + tolerance) + noise:
+                regressions.append(
+                    f'{entry["size"]["workflows"]} workflows: {metric} '
+                    f'{entry[metric]:.3f} > {base[metric]:.3f}')
+    return regressions
+
+def main(argv=None):
+    """Run the benchmark, print the results, compare to or store the baseline."""
+    parser = argparse.ArgumentParser(prog='benchmarks.run', description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+        help='numbers of workflows of the generated projects')
+    for name, default in vars(ProjectSize()).items():
+        if name != 'workflows':
+            parser.add_argument(f'--{name.replace("_", "-")}', type=int, default=default)
+    parser.add_argument('--jobs', type=int, default=1)
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true',
+        help='store the results as the new baseline instead of comparing them')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    arguments = parser.parse_args(argv)
+
+    size_parameters = {name: getattr(arguments, name)
+        for name in vars(ProjectSize()) if name != 'workflows'}
+    results = []
+    for workflows in arguments.sizes:
+        entry = measure_in_new_process(
+            ProjectSize(workflows=workflows, **size_parameters), arguments.jobs)
+        print(f'{workflows:>6} workflows: parse {entry["parse"]:.3f}s, '
+            f'documentation {entry["documentation"]:.3f}s, review {entry["review"]:.3f}s, '
+            f'peak RSS {entry["peak_rss_kb"]} kB')
+        results.append(entry)
+
+    if arguments.save_baseline:
+        with open(arguments.baseline, 'w', encoding='utf-8') as baseline_file:
+            json.dump(results, baseline_file, indent=1)
+        return
+
+    if not os.path.exists(arguments.baseline):
+        print(f'No baseline in {arguments.baseline}; use --save-baseline to store one.')
+        return
+    with open(arguments.baseline, encoding='utf-8') as baseline_file:
+        regressions = compare(results, json.load(baseline_file), arguments.tolerance)
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
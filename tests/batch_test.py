@@ -0,0 +1,54 @@
+"""Test the analysis of several projects in one run."""
+
+import json
+import os
+import shutil
+
+from analyzer.__main__ import main
+from analyzer.analyze.options import AnalysisOptions
+from analyzer.batch import SUMMARY_FILE, TARGET_DIR, BatchAnalysis
+from analyzer.render.documentation import Documentation
+from benchmarks.generator import ProjectSize, generate_project
+
+def test_batch(tmp_path, monkeypatch):
+    """Every project is analyzed into its own folder; nested projects are kept apart."""
+    root = tmp_path / 'root'
+    generate_project(str(root / 'First'), ProjectSize(workflows=4))
+    generate_project(str(root / 'First' / 'Nested'), ProjectSize(workflows=2))
+    generate_project(str(root / 'Second'), ProjectSize(workflows=3))
+    (root / 'Broken').mkdir()
+    (root / 'Broken' / 'project.json').write_text('{', encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+
+    def document(project):
+        Documentation(project)
+
+    results = BatchAnalysis(str(root), document, AnalysisOptions(jobs=2)).run()
+
+    assert [(result.path, result.workflows) for result in results] == [
+        ('Broken', 0), ('First', 4), ('First/Nested', 2), ('Second', 3)]
+    assert results[0].error is not None
+    assert os.path.exists(os.path.join(
+        TARGET_DIR, 'projects', 'First-Nested', 'deliverables', 'documentation'))
+    with open(os.path.join(TARGET_DIR, SUMMARY_FILE), encoding='utf-8') as summary_file:
+        summary = json.load(summary_file)
+    assert (summary['projects'], summary['workflows'], summary['failed']) == (4, 9, 1)
+
+def test_batch_baseline(tmp_path, monkeypatch):
+    """Each project is compared with its own snapshot of the earlier batch run."""
+    root = tmp_path / 'root'
+    generate_project(str(root / 'First'), ProjectSize(workflows=4))
+    generate_project(str(root / 'Second'), ProjectSize(workflows=3))
+    monkeypatch.chdir(tmp_path)
+    main([str(root), '--batch', '--no-cache'])
+    shutil.move(TARGET_DIR, 'base')
+    generate_project(str(root / 'Third'), ProjectSize(workflows=2))
+
+    main([str(root), '--batch', '--no-cache', '--baseline', 'base'])
+    for name in ('First', 'Second'):
+        with open(os.path.join(TARGET_DIR, 'projects', name, 'deliverables', 'snapshot',
+                'delta.json'), encoding='utf-8') as delta_file:
+            delta = json.load(delta_file)
+        assert not delta['added'] and not delta['changed'] and not delta['removed']
+    assert not os.path.exists(os.path.join(
+        TARGET_DIR, 'projects', 'Third', 'deliverables', 'snapshot', 'delta.json'))
@@ -0,0 +1,18 @@
+"""Test the persistent cache of workflow summaries."""
+
+import os
+
+from analyzer.analyze.cache import ParseCache
+from analyzer.analyze.extractor import extract_workflow
+
+def test_cache(tmp_path):
+    """Summaries read from the cache equal freshly extracted ones."""
+    workflow_path = os.path.join(os.path.dirname(__file__), 'assets/Main.xaml')
+    cache = ParseCache(str(tmp_path))
+
+    assert cache.extract(workflow_path) == extract_workflow(workflow_path)
+    assert len(os.listdir(tmp_path)) == 1
+    assert cache.extract(workflow_path) == extract_workflow(workflow_path)
+
+    ParseCache(str(tmp_path), max_size=0).prune()
+    assert len(os.listdir(tmp_path)) == 0
@@ -0,0 +1,53 @@
+"""Test checking the arguments passed by invocations against the invoked workflows."""
+
+import os
+
+from analyzer.analyze.contracts import Parameter, check_invocation
+from analyzer.analyze.project import Project
+from analyzer.analyze.records import PassedArgumentRecord
+from analyzer.review.review import Review
+from benchmarks.generator import ProjectSize, generate_project
+
+def test_check_invocation():
+    """Missing, extra, wrongly directed and wrongly typed arguments are told apart."""
+    signature = {
+        'in_Name': Parameter('In', 'String', True),
+        'in_Optional': Parameter('In', 'String', False),
+        'out_Count': Parameter('Out', 'Int32', False),
+        'io_Config': Parameter('InOut', 'Dictionary(String, Object)', True),
+    }
+    violations = check_invocation(signature, [
+        PassedArgumentRecord('out_Count', 'In', 'Int32'),
+        PassedArgumentRecord('io_Config', 'InOut', 'Dictionary(String,Object)'),
+        PassedArgumentRecord('in_Other', 'In', 'String'),
+    ])
+    assert violations.missing == ('in_Name (In String)',)
+    assert violations.extra == ('in_Other',)
+    assert violations.directions == ('out_Count (In, not Out)',)
+    assert violations.types == ()
+
+    assert check_invocation(signature, [
+        PassedArgumentRecord('in_Name', 'In', 'Int32'),
+        PassedArgumentRecord('io_Config', 'InOut', 'Object')]).types == (
+            'in_Name (Int32, not String)', 'io_Config (Object, not Dictionary(String, Object))')
+
+def test_review_contracts(tmp_path):
+    """Renaming an argument of a workflow breaks its callers."""
+    generate_project(str(tmp_path), ProjectSize(workflows=3, fan_out=2))
+    review = Review(Project(str(tmp_path)))
+    assert not any(finding.rule.startswith('invocations.') for finding in review.findings)
+
+    callee = os.path.join(tmp_path, 'Module1', 'Workflow1.xaml')
+    with open(callee, encoding='utf-8') as workflow_file:
+        content = workflow_file.read()
+    with open(callee, 'w', encoding='utf-8') as workflow_file:
+        workflow_file.write(content.replace('in_ArgumentValue3', 'in_RenamedValue3'))
+
+    findings = [finding
+        for finding in Review(Project(str(tmp_path))).findings
+        if finding.rule.startswith('invocations.')]
+    assert [(finding.rule, finding.workflow) for finding in findings] == [
+        ('invocations.checkMissingArguments', 'Main.xaml'),
+        ('invocations.checkExtraArguments', 'Main.xaml')]
+    assert findings[0].message == ('does not pass the required arguments of '
+        'Module1/Workflow1.xaml: in_RenamedValue3 (In Boolean)')
@@ -0,0 +1,59 @@
+"""Test the project kept up to date in memory, and served over HTTP."""
+
+import json
+import os
+import threading
+from urllib.request import urlopen
+
+from analyzer.analyze.project import Project
+from analyzer.daemon import AnalysisServer, ProjectWatcher
+from analyzer.review.review import Review
+from benchmarks.generator import ProjectSize, generate_project
+
+def touch(path, content=None):
+    """Change a file, making sure that its modification time changes too."""
+    if content is not None:
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+def test_refresh(tmp_path):
+    """Only changed, added and deleted files are noticed; the review stays exact."""
+    generate_project(str(tmp_path), ProjectSize(workflows=4))
+    watcher = ProjectWatcher(Project(str(tmp_path)))
+    workflows = sorted(os.path.relpath(path, tmp_path) for path in watcher.states)
+    assert watcher.refresh() == []
+    watcher.get_review()
+
+    first, second = (os.path.join(tmp_path, workflow) for workflow in workflows[:2])
+    touch(first)
+    with open(second, encoding='utf-8') as file:
+        content = file.read()
+    os.remove(second)
+    added = os.path.join(tmp_path, 'Added.xaml')
+    touch(added, content)
+
+    assert sorted(watcher.refresh()) == sorted(['Added.xaml', *workflows[:2]])
+    assert watcher.refresh() == []
+    assert len(watcher.project.workflow_files) == len(workflows)
+    assert watcher.get_review().findings == Review(Project(str(tmp_path))).findings
+
+def test_server(tmp_path):
+    """The endpoints answer with the current state of the project."""
+    generate_project(str(tmp_path), ProjectSize(workflows=2))
+    server = AnalysisServer(('127.0.0.1', 0), ProjectWatcher(Project(str(tmp_path))))
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,))
+    thread.start()
+    try:
+        url = f'http://127.0.0.1:{server.server_port}'
+        with urlopen(url + '/status') as response:
+            assert json.load(response)['workflows'] == 2
+        with urlopen(url + '/review') as response:
+            assert 'findings' in json.load(response)
+        with urlopen(url + '/documentation') as response:
+            assert response.read().startswith(b'<!doctype html>')
+    finally:
+        server.shutdown()
+        thread.join()
+        server.server_close()
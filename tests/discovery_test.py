@@ -0,0 +1,42 @@
+"""Test the discovery of the workflow files."""
+
+import os
+
+from analyzer.analyze.discovery import compile_patterns, discover_files, is_matched
+
+def write_files(directory, relative_paths):
+    """Create the files, with their relative paths as their content."""
+    for relative_path in relative_paths:
+        path = os.path.join(directory, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(relative_path)
+
+def test_patterns():
+    """The .gitignore syntax: anchoring, directories, ** and negation."""
+    rules = compile_patterns(['*.xaml', '!Keep.xaml', '/Top/', 'a/**/b.xaml', '# comment'])
+    assert is_matched(rules, 'Sub/Any.xaml', False)
+    assert not is_matched(rules, 'Sub/Keep.xaml', False)
+    assert is_matched(rules, 'Top', True)
+    assert not is_matched(rules, 'Sub/Top', True)
+    assert not is_matched(compile_patterns(['Top/']), 'Top', False)
+    assert is_matched(rules, 'a/x/y/b.xaml', False)
+
+def test_discover_files(tmp_path):
+    """Excluded folders are skipped, .gitignore files are honored, sizes are reported."""
+    write_files(tmp_path, [
+        'Main.xaml', 'Sub/Flow.xaml', 'Sub/notes.txt',
+        '.screenshots/Shot.xaml', 'node_modules/x/Lib.xaml', 'Analyzer/tests/assets/Test.xaml',
+        'Old/Obsolete.xaml', 'Sub/Generated.xaml', 'Archive/Archived.xaml'])
+    write_files(tmp_path, ['.gitignore', 'Sub/.gitignore'])
+    with open(tmp_path / '.gitignore', 'w', encoding='utf-8') as gitignore:
+        gitignore.write('Old/\n')
+    with open(tmp_path / 'Sub' / '.gitignore', 'w', encoding='utf-8') as gitignore:
+        gitignore.write('Generated.xaml\n')
+
+    found = discover_files(str(tmp_path), exclude=['Archive/'])
+    assert [os.path.relpath(file.path, tmp_path) for file in found] == [
+        'Main.xaml', os.path.join('Sub', 'Flow.xaml')]
+    assert found[0].size == len('Main.xaml')
+
+    assert len(discover_files(str(tmp_path), use_gitignore=False)) == 5
@@ -0,0 +1,23 @@
+"""Test the generated HTML documentation."""
+
+from os.path import join, dirname
+
+from analyzer.analyze.project import Project
+from analyzer.render.documentation import Documentation, TARGET_DIR, TARGET_FILE
+
+def test_documentation(tmp_path, monkeypatch):
+    """Every workflow gets a section and a table of contents entry, exactly once."""
+    project = Project(join(dirname(__file__), 'assets/'))
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'deliverables').mkdir()
+
+    Documentation(project)
+
+    with open(join(TARGET_DIR, TARGET_FILE), encoding='utf-8') as documentation_file:
+        documentation = documentation_file.read()
+    assert documentation.count('<h2 id=') == 4
+    assert documentation.count('<dt>') == 4
+    assert documentation.index('General Business Process</h2>') < documentation.index(
+        'Process</h2>')
+    assert 'Activities: 42, nested 7 layers deep, 1 with default name' in documentation
+    assert documentation.rstrip().endswith('</html>')
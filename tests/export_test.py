@@ -0,0 +1,57 @@
+"""Test the export of the project model into SQLite and JSON lines."""
+
+import json
+import os
+import sqlite3
+
+from analyzer.analyze.project import Project
+from analyzer.render.export import JsonLinesExport, SQLiteExport
+from benchmarks.generator import ProjectSize, generate_project
+
+def test_sqlite_export(tmp_path):
+    """The model can be queried by type and by invoked workflow; updates are incremental."""
+    project_directory = str(tmp_path / 'project')
+    generate_project(project_directory, ProjectSize(workflows=4))
+    export = SQLiteExport(Project(project_directory), str(tmp_path / 'export'))
+    export.export()
+    assert len(export.updated) == 4
+
+    with sqlite3.connect(export.get_target_path()) as connection:
+        invoked = connection.execute('SELECT path FROM invocations LIMIT 1').fetchone()[0]
+        callers = connection.execute(
+            'SELECT w.path FROM invocations i JOIN workflows w ON w.id = i.workflow_id '
+            'WHERE i.path = ?', [invoked]).fetchall()
+        assert len(callers) > 0
+        argument_count = connection.execute('SELECT COUNT(*) FROM arguments').fetchone()[0]
+        assert argument_count == 4 * 4
+    connection.close()
+
+    workflows = sorted(export.get_files())
+    os.remove(os.path.join(project_directory, workflows[0]))
+    changed = os.path.join(project_directory, workflows[1])
+    stat = os.stat(changed)
+    os.utime(changed, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    export = SQLiteExport(Project(project_directory), str(tmp_path / 'export'))
+    export.export()
+    assert (export.updated, export.removed) == ([workflows[1]], [workflows[0]])
+    with sqlite3.connect(export.get_target_path()) as connection:
+        assert connection.execute('SELECT COUNT(*) FROM arguments').fetchone()[0] == 3 * 4
+    connection.close()
+
+def test_json_lines_export(tmp_path):
+    """One line for the project, then one per workflow; unchanged lines are reused."""
+    project_directory = str(tmp_path / 'project')
+    generate_project(project_directory, ProjectSize(workflows=3))
+    export = JsonLinesExport(Project(project_directory), str(tmp_path / 'export'))
+    export.export()
+    with open(export.get_target_path(), encoding='utf-8') as export_file:
+        content = export_file.read()
+    lines = [json.loads(line) for line in content.splitlines()]
+    assert len(lines) == 4
+    assert len(lines[1]['arguments']) == 4
+
+    export.export()
+    assert not export.updated
+    with open(export.get_target_path(), encoding='utf-8') as export_file:
+        assert export_file.read() == content
@@ -0,0 +1,23 @@
+"""Test for the single-pass extraction of workflow files."""
+
+import os
+
+from analyzer.analyze.extractor import extract_workflow
+
+def test_extract_workflow():
+    """All parts needed for the analysis are collected from the file."""
+    workflow_path = os.path.join(os.path.dirname(__file__), 'assets/Main.xaml')
+    summary = extract_workflow(workflow_path)
+
+    assert summary.root_activity_attributes['DisplayName'] == 'General Business Process'
+    assert [argument.name for argument in summary.arguments] == ['in_OrchestratorQueueName']
+    assert summary.arguments[0].direction == 'In'
+    assert len(summary.variables) == 11
+    invoked = [invocation.path for invocation in summary.invocations]
+    assert 'Process.xaml' in invoked
+    assert 'Framework/InitAllSettings.xaml' in invoked
+    assert [(argument.name, argument.direction, argument.type)
+        for argument in summary.invocations[0].arguments] == [
+            ('in_ConfigFile', 'In', 'String'), ('in_ConfigSheets', 'In', 'String[]'),
+            ('out_Config', 'Out', 'Dictionary(String, Object)')]
+    assert summary.activity_metrics.activity_counts['StateMachine'] == 1
@@ -0,0 +1,18 @@
+"""Test the synthetic project generator used by the benchmarks."""
+
+from analyzer.analyze.graph import InvocationGraph
+from analyzer.analyze.project import Project
+from benchmarks.generator import ProjectSize, generate_project
+
+def test_generate_project(tmp_path):
+    """The generated project has the requested size, and every workflow is reachable."""
+    generate_project(str(tmp_path), ProjectSize(workflows=15, arguments=5, depth=2, selectors=3))
+    project = Project(str(tmp_path))
+    graph = InvocationGraph(project)
+
+    assert len(project.workflow_files) == 15
+    assert graph.get_unreachable() == []
+    main = project.get_main_workflow()
+    assert len(list(main.get_arguments())) == 5
+    assert len(list(main.get_elements_with_selectors())) == 3
+    assert main.get_activity_counts()['If'] == 2
@@ -0,0 +1,67 @@
+"""Test the invocation graph of a project."""
+
+from os.path import join, dirname
+
+from analyzer.analyze.graph import InvocationGraph
+from analyzer.analyze.project import Project
+from analyzer.review.incremental import get_affected_workflows
+
+WORKFLOW_TEMPLATE = """<Activity x:Class="{0}"
+ xmlns="http://schemas.microsoft.com/netfx/2009/xaml/activities"
+ xmlns:ui="http://schemas.uipath.com/workflow/activities"
+ xmlns:x="http://schemas.microsoft.com/winfx/2006/xaml">
+  <Sequence DisplayName="{0}">{1}
+  </Sequence>
+</Activity>
+"""
+INVOKE_TEMPLATE = """
+    <ui:InvokeWorkflowFile DisplayName="Invoke" WorkflowFileName="{0}" />"""
+
+def test_graph_assets():
+    """Main invokes Process; the rest of the assets are not invoked."""
+    graph = InvocationGraph(Project(join(dirname(__file__), 'assets/')))
+
+    assert graph.get_entry_points() == ['Main.xaml']
+    assert graph.get_reachable() == {'Main.xaml', 'Process.xaml'}
+    assert graph.get_unreachable() == ['RunAllTests.xaml', 'TakeScreenshot.xaml']
+    assert graph.get_fan_in()['Process.xaml'] == 1
+    assert 'Framework/InitAllSettings.xaml' in graph.missing['Main.xaml']
+    assert not graph.get_cycles()
+
+def test_graph_cycles(tmp_path):
+    """Workflows invoking each other recursively are detected."""
+    invocations = {
+        'Main': ['A.xaml', 'Sub\\B.xaml'],
+        'A': ['Sub\\B.xaml'],
+        'Sub/B': ['A.xaml'],
+        'Loop': ['Loop.xaml'],
+    }
+    (tmp_path / 'Sub').mkdir()
+    for name, invoked in invocations.items():
+        (tmp_path / f'{name}.xaml').write_text(WORKFLOW_TEMPLATE.format(
+            name, ''.join(INVOKE_TEMPLATE.format(path) for path in invoked)))
+    (tmp_path / 'project.json').write_text('{"description": "", "main": "Main.xaml"}')
+
+    graph = InvocationGraph(Project(str(tmp_path)))
+
+    assert sorted(graph.get_cycles()) == [['A.xaml', 'Sub/B.xaml'], ['Loop.xaml']]
+    assert graph.get_unreachable() == ['Loop.xaml']
+    assert graph.get_unreferenced() == []
+    assert graph.get_fan_out()['Main.xaml'] == 2
+    assert '"Main.xaml" -> "A.xaml";' in graph.to_dot()
+
+def test_graph_dynamic(tmp_path):
+    """Files invoked by an expression are dynamic invocations, not missing files."""
+    invoked = ['Process.xaml', '[Row(&quot;WorkflowFile&quot;).ToString]', '[in_Path]']
+    (tmp_path / 'Main.xaml').write_text(WORKFLOW_TEMPLATE.format(
+        'Main', ''.join(INVOKE_TEMPLATE.format(path) for path in invoked)))
+    (tmp_path / 'Process.xaml').write_text(WORKFLOW_TEMPLATE.format('Process', ''))
+    (tmp_path / 'project.json').write_text('{"description": "", "main": "Main.xaml"}')
+
+    graph = InvocationGraph(Project(str(tmp_path)))
+
+    assert graph.edges['Main.xaml'] == ['Process.xaml']
+    assert graph.dynamic == {'Main.xaml': ['[Row("WorkflowFile").ToString]', '[in_Path]']}
+    assert not graph.missing
+    assert 'red' not in graph.to_dot()
+    assert get_affected_workflows(graph, ['[in_Path]']) == set()
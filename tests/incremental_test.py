@@ -0,0 +1,52 @@
+"""Test reviewing the changed workflows only."""
+
+import os
+from os.path import join, dirname
+
+from analyzer.analyze.extractor import extract_workflow
+from analyzer.analyze.project import Project
+from analyzer.review.incremental import IncrementalReview, get_affected_workflows
+from analyzer.review.review import FINDINGS_FILE, TARGET_DIR, Review
+from analyzer.review.state import STATE_FILE, ReviewState
+from benchmarks.generator import ProjectSize, generate_project
+
+def test_incremental_review():
+    """Reviewing the changes on top of a full review gives the same findings."""
+    project = Project(join(dirname(__file__), 'assets/'))
+    full_review = Review(project)
+
+    review = IncrementalReview(project, ['Process.xaml'], full_review.findings)
+
+    assert review.affected == {'Process.xaml', 'Main.xaml'}
+    assert review.findings == full_review.findings
+
+def test_affected_by_deleted_file():
+    """Callers of deleted workflows are affected too."""
+    graph = Review(Project(join(dirname(__file__), 'assets/'))).get_graph()
+
+    assert get_affected_workflows(graph, ['Framework\\InitAllSettings.xaml']) == {'Main.xaml'}
+
+def test_reuse_state(tmp_path, monkeypatch):
+    """Only the changed workflow and its callers are read, the others come from the state."""
+    project_directory = str(tmp_path / 'project')
+    generate_project(project_directory, ProjectSize(workflows=6, fan_out=2))
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('deliverables')
+    Review(Project(project_directory)).write_deliverable()
+
+    with open(join(project_directory, 'Module2', 'Workflow2.xaml'), 'a',
+            encoding='utf-8') as workflow_file:
+        workflow_file.write('\n')
+    project = Project(project_directory)
+    read = []
+    def extract(file_path):
+        read.append(os.path.relpath(file_path, project_directory).replace(os.sep, '/'))
+        return extract_workflow(file_path)
+    project.workflow_files.extract = extract
+    review = IncrementalReview(project, ['Module2/Workflow2.xaml'],
+        Review.read_findings(join(TARGET_DIR, FINDINGS_FILE)),
+        previous_state=ReviewState.read(join(TARGET_DIR, STATE_FILE)))
+
+    assert sorted(read) == sorted(review.affected)
+    assert 'Module1/Workflow1.xaml' not in read
+    assert review.findings == Review(Project(project_directory)).findings
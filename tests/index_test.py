@@ -0,0 +1,21 @@
+"""Test the path-indexed collection of workflows."""
+
+from os.path import join, dirname
+
+from analyzer.analyze.index import WorkflowIndex
+from analyzer.analyze.project import Project
+
+def test_index():
+    """Workflows are found by absolute and relative paths, and loaded only once."""
+    project_directory: str = join(dirname(__file__), 'assets/')
+    index: WorkflowIndex = Project(project_directory).workflow_files
+
+    main = index.get(join(project_directory, 'Main.xaml'))
+    assert main is not None
+    assert main.display_name == 'General Business Process'
+    assert index.get_by_relative_path('./Main.xaml') is main
+    assert index.get_by_relative_path('Missing.xaml') is None
+
+    # the index can be iterated repeatedly, in the same order
+    assert list(index) == list(index)
+    assert len(list(index)) == len(index) == 4
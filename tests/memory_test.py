@@ -0,0 +1,70 @@
+"""Test analyzing a project within a memory budget."""
+
+import os
+
+from analyzer.analyze import index, memory
+from analyzer.analyze.memory import MemoryBudget, SpillList
+from analyzer.analyze.options import AnalysisOptions
+from analyzer.analyze.project import Project
+from analyzer.render.documentation import Documentation, TARGET_DIR as DOCUMENTATION_DIR
+from analyzer.review.incremental import IncrementalReview
+from analyzer.review.review import Review, TARGET_DIR as REVIEW_DIR
+from benchmarks.generator import ProjectSize, generate_project
+
+def test_spill_list():
+    """Items are moved to disk once the budget is exceeded, and read back in order."""
+    spill_list: SpillList[str] = SpillList(MemoryBudget(0))
+    spill_list.extend(f'item {number}' for number in range(memory.CHECK_INTERVAL - 1))
+    assert not spill_list.spilled
+    spill_list.extend(['last but one', 'last'])
+    assert spill_list.spilled
+    assert len(spill_list) == memory.CHECK_INTERVAL + 1
+    assert list(spill_list)[-3:] == [f'item {memory.CHECK_INTERVAL - 2}', 'last but one', 'last']
+
+def analyze(project: Project) -> Review:
+    """Write the documentation and the review; return the review."""
+    os.makedirs(DOCUMENTATION_DIR)
+    Documentation(project)
+    review = Review(project)
+    review.write_deliverable()
+    return review
+
+def read_deliverables():
+    """The content of the deliverables, by path."""
+    return {
+        path: open(path, encoding='utf-8').read()
+        for path in [
+            os.path.join(DOCUMENTATION_DIR, 'Documentation.html'),
+            os.path.join(REVIEW_DIR, 'ReviewResult.xml'),
+            os.path.join(REVIEW_DIR, 'findings.json')]}
+
+def test_bounded_run(tmp_path, monkeypatch):
+    """Dropping workflows and spilling results gives the same deliverables."""
+    project_directory = str(tmp_path / 'project')
+    generate_project(project_directory, ProjectSize(workflows=20))
+    monkeypatch.setattr(index, 'BATCH_SIZE', 4)
+    monkeypatch.setattr(memory, 'CHECK_INTERVAL', 8)
+
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('unbounded/deliverables')
+    os.chdir('unbounded')
+    analyze(Project(project_directory))
+    unbounded = read_deliverables()
+
+    os.makedirs('../bounded/deliverables')
+    os.chdir('../bounded')
+    review = analyze(Project(project_directory, AnalysisOptions(budget=MemoryBudget(0))))
+    assert review.findings.spilled
+    assert read_deliverables() == unbounded
+
+def test_bounded_incremental_review(tmp_path, monkeypatch):
+    """The merged findings of an incremental review stay on disk within the budget."""
+    project_directory = str(tmp_path / 'project')
+    generate_project(project_directory, ProjectSize(workflows=20))
+    monkeypatch.setattr(memory, 'CHECK_INTERVAL', 8)
+    full_review = Review(Project(project_directory))
+
+    review = IncrementalReview(Project(project_directory, AnalysisOptions(budget=MemoryBudget(0))),
+        ['Module3/Workflow3.xaml'], list(full_review.findings))
+    assert isinstance(review.findings, SpillList) and review.findings.spilled
+    assert list(review.findings) == full_review.findings
@@ -0,0 +1,48 @@
+"""Test the activity metrics measured on extraction."""
+
+import os
+
+from analyzer.analyze.extractor import extract_workflow
+from analyzer.analyze.metrics import get_default_display_name, measure_activities
+from analyzer.analyze.workflow import Workflow
+
+NESTED_WORKFLOW = """<Activity x:Class="Nested"
+ xmlns="http://schemas.microsoft.com/netfx/2009/xaml/activities"
+ xmlns:sap2010="http://schemas.microsoft.com/netfx/2010/xaml/activities/presentation"
+ xmlns:x="http://schemas.microsoft.com/winfx/2006/xaml">
+  <Sequence DisplayName="Outer" sap2010:WorkflowViewState.IdRef="Sequence_1">
+    <If sap2010:WorkflowViewState.IdRef="If_1">
+      <If.Then>
+        <Sequence DisplayName="Sequence" sap2010:WorkflowViewState.IdRef="Sequence_2">
+          <Delay DisplayName="Wait" sap2010:WorkflowViewState.IdRef="Delay_1" />
+        </Sequence>
+      </If.Then>
+    </If>
+    <MultipleAssign DisplayName="Multiple Assign" sap2010:WorkflowViewState.IdRef="MA_1" />
+  </Sequence>
+</Activity>
+"""
+
+def test_metrics(tmp_path):
+    """Counts, depth, deepest path and default names, the same from the stream and the tree."""
+    workflow_path = tmp_path / 'Nested.xaml'
+    workflow_path.write_text(NESTED_WORKFLOW, encoding='utf-8')
+    metrics = extract_workflow(str(workflow_path)).activity_metrics
+
+    assert metrics.activity_counts == {'Sequence': 2, 'If': 1, 'Delay': 1, 'MultipleAssign': 1}
+    assert metrics.max_depth == 4
+    assert metrics.deepest_path == ('Outer', 'If', 'Sequence', 'Wait')
+    assert metrics.default_named == (
+        ('If', 'If_1'), ('Sequence', 'Sequence_2'), ('MultipleAssign', 'MA_1'))
+    assert measure_activities(Workflow(str(workflow_path)).get_root_activity()) == metrics
+
+def test_metrics_assets():
+    """The metrics of the extraction equal the ones measured on the parsed tree."""
+    assets = os.path.join(os.path.dirname(__file__), 'assets')
+    workflow = Workflow(os.path.join(assets, 'RunAllTests.xaml'))
+    assert workflow.get_activity_metrics() == measure_activities(workflow.get_root_activity())
+
+def test_default_display_name():
+    """Activity types are split into words."""
+    assert get_default_display_name('StateMachine') == 'State Machine'
+    assert get_default_display_name('ForEach') == 'For Each'
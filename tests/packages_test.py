@@ -0,0 +1,278 @@
+"""Test resolving the dependencies to local packages, and listing the activities they export."""
+
+import json
+import os
+import struct
+from typing import List, Sequence, Tuple
+import zipfile
+
+import pytest
+
+from analyzer.__main__ import main
+from analyzer.analyze.assemblies import AssemblyError, get_activity_types
+from analyzer.analyze.extractor import extract_workflow
+from analyzer.analyze.memory import MemoryBudget
+from analyzer.analyze.options import AnalysisOptions
+from analyzer.analyze.packages import Dependencies, PackageIndex, PackageVersion, VersionRange
+from analyzer.analyze.project import Project
+from analyzer.render.documentation import Documentation, TARGET_DIR, TARGET_FILE
+from analyzer.render.sharded import INDEX_FILE, ShardedDocumentation
+from benchmarks.generator import ProjectSize, generate_project
+
+TYPE_REFS = [('System.Activities', 'CodeActivity`1'), ('System.Activities', 'NativeActivity'),
+    ('System', 'Object')]
+# GENERICINST CLASS CodeActivity`1 <string>: the coded index of TypeRef 1 is 1 << 2 | 1
+TYPE_SPECS = [bytes([0x15, 0x12, 0x05, 0x01, 0x0E])]
+# (flags, namespace, name, base type as a TypeDefOrRef coded index)
+TYPE_DEFS = [
+    (0x00, '', '<Module>', 0),
+    # public abstract, deriving from NativeActivity
+    (0x81, 'Acme.Activities', 'AcmeActivity', 2 << 2 | 1),
+    # public, deriving from AcmeActivity, then from CodeActivity<string>
+    (0x01, 'Acme.Activities', 'Click', 2 << 2),
+    (0x01, 'Acme.Activities', 'GetText', 1 << 2 | 2),
+    # not activities: not deriving from one, internal
+    (0x01, 'Acme.Activities', 'Helper', 3 << 2 | 1),
+    (0x00, 'Acme.Activities', 'Hidden', 2 << 2 | 1),
+]
+
+def build_streams(type_refs: Sequence[Tuple[str, str]],
+        type_defs: Sequence[Tuple[int, str, str, int]], type_specs: Sequence[bytes]
+        ) -> List[Tuple[bytes, bytes]]:
+    """The tables up to TypeSpec and their heaps, by stream name."""
+    strings = bytearray(b'\0')
+    def add_string(text: str) -> int:
+        strings.extend(text.encode() + b'\0')
+        return len(strings) - len(text.encode()) - 1
+    blobs = bytearray(b'\0')
+    def add_blob(blob: bytes) -> int:
+        blobs.extend(bytes([len(blob)]) + blob)
+        return len(blobs) - len(blob) - 1
+
+    # Module, TypeRef, TypeDef and TypeSpec, with 2-byte indexes
+    rows = [struct.pack('<HHHHH', 0, add_string('Acme.Activities.dll'), 0, 0, 0)]
+    rows += [struct.pack('<HHH', 0, add_string(name), add_string(namespace))
+        for namespace, name in type_refs]
+    rows += [struct.pack('<IHHHHH', flags, add_string(name), add_string(namespace), extends, 1, 1)
+        for flags, namespace, name, extends in type_defs]
+    rows += [struct.pack('<H', add_blob(signature)) for signature in type_specs]
+    counts = [1, len(type_refs), len(type_defs), len(type_specs)]
+    valid = 1 << 0x00 | 1 << 0x01 | 1 << 0x02 | 1 << 0x1B
+    tables = (struct.pack('<IBBBBQQ', 0, 2, 0, 0, 1, valid, 0)
+        + struct.pack('<4I', *counts) + b''.join(rows))
+
+    return [(b'#~', tables), (b'#Strings', bytes(strings)), (b'#Blob', bytes(blobs))]
+
+def build_metadata(streams: Sequence[Tuple[bytes, bytes]]) -> bytes:
+    """The metadata root, with its streams."""
+    padded = [(name + b'\0' * (4 - len(name) % 4), content + b'\0' * (-len(content) % 4))
+        for name, content in streams]
+    version = b'v4.0.30319\0\0'
+    offset = 16 + len(version) + 4 + sum(8 + len(name) for name, _ in padded)
+    headers = b''
+    for name, content in padded:
+        headers += struct.pack('<II', offset, len(content)) + name
+        offset += len(content)
+    return (struct.pack('<IHHII', 0x424A5342, 1, 1, 0, len(version)) + version
+        + struct.pack('<HH', 0, len(padded)) + headers
+        + b''.join(content for _, content in padded))
+
+def build_assembly(namespace: str = 'Acme.Activities') -> bytes:
+    """A PE32 file with the metadata of a .NET assembly, with a few types and no code."""
+    type_defs = [(flags, namespace if type_namespace else '', name, extends)
+        for flags, type_namespace, name, extends in TYPE_DEFS]
+    metadata = build_metadata(build_streams(TYPE_REFS, type_defs, TYPE_SPECS))
+    # .text: the CLI header, then the metadata
+    section_rva, section_offset = 0x2000, 0x200
+    text = struct.pack('<IHHII', 72, 2, 5, section_rva + 72, len(metadata)).ljust(72, b'\0')
+    text += metadata
+    optional_header = bytearray(224)
+    struct.pack_into('<H', optional_header, 0, 0x10B)
+    struct.pack_into('<II', optional_header, 96 + 8 * 14, section_rva, 72)
+    headers = (b'MZ'.ljust(0x3C, b'\0') + struct.pack('<I', 0x40) + b'PE\0\0'
+        + struct.pack('<HHIIIHH', 0x14C, 1, 0, 0, 0, len(optional_header), 0x2102)
+        + bytes(optional_header)
+        + struct.pack('<8sIIII16x', b'.text', len(text), section_rva, len(text), section_offset))
+    return headers.ljust(section_offset, b'\0') + text
+
+def build_package(path: str, workflows: Sequence[str] = (),
+        namespace: str = 'Acme.Activities') -> None:
+    """A .nupkg with the assembly for two frameworks, and workflows."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(f'{namespace}.nuspec', '<package />')
+        archive.writestr(f'lib/net461/{namespace}.dll', build_assembly(namespace))
+        archive.writestr(f'lib/net6.0/{namespace}.dll', build_assembly(namespace))
+        archive.writestr(f'lib/net461/de/{namespace}.resources.dll', b'not read')
+        for workflow in workflows:
+            archive.writestr(f'content/{workflow}', '<Activity />')
+
+def test_activity_types():
+    """Public concrete classes deriving from *Activity, directly or not, are activities."""
+    assert get_activity_types(build_assembly()) == [
+        'Acme.Activities.Click', 'Acme.Activities.GetText']
+    with pytest.raises(AssemblyError):
+        get_activity_types(b'MZ' + bytes(200))
+    with pytest.raises(AssemblyError):
+        get_activity_types(b'<Activity />')
+
+def test_version_ranges():
+    """Ranges contain the versions NuGet would take; prereleases only if asked for."""
+    version = PackageVersion.parse
+    assert version('1.0') == version('1.0.0.0') < version('1.0.1-beta.2') < version('1.0.1-beta.10')
+    assert version('1.0.1-beta.10') < version('1.0.1') < version('1.0.1.1')
+    assert str(version('22.10.3+build.5')) == '22.10.3'
+    assert str(version('1.2.3.4-Preview')) == '1.2.3.4-preview'
+
+    assert version('1.5') in VersionRange.parse('1.0')
+    assert version('0.9') not in VersionRange.parse('1.0')
+    assert version('2.0-beta') not in VersionRange.parse('1.0')
+    assert version('2.0-beta') in VersionRange.parse('[2.0-alpha, )')
+    assert version('1.0') in VersionRange.parse('[1.0]')
+    assert version('1.0.1') not in VersionRange.parse('[1.0]')
+    assert version('2.0') not in VersionRange.parse('[1.0,2.0)')
+    assert version('2.0') in VersionRange.parse('(,2.0]')
+    assert version('1.0') not in VersionRange.parse('(1.0,2.0]')
+    for invalid in ('1.*', '(1.0)', '[1.0', '[1.0,2.0,3.0]', 'latest'):
+        with pytest.raises(ValueError):
+            VersionRange.parse(invalid)
+
+def test_resolve(tmp_path):
+    """The lowest applicable version is taken, from a flat folder or the global packages."""
+    for version in ('1.0.0', '1.2.0', '2.0.0-beta'):
+        build_package(str(tmp_path / 'global' / 'acme.activities' / version
+            / f'acme.activities.{version}.nupkg'))
+    build_package(str(tmp_path / 'feed' / 'Acme.Activities.1.1.0.nupkg'))
+    index = PackageIndex([str(tmp_path / 'feed'), str(tmp_path / 'global')])
+
+    resolved = index.resolve('Acme.Activities', '1.1')
+    assert resolved.version == '1.1.0'
+    assert resolved.path == str(tmp_path / 'feed' / 'Acme.Activities.1.1.0.nupkg')
+    assert index.resolve('acme.activities', '[1.2.0]').version == '1.2.0'
+    assert index.resolve('Acme.Activities', '[2.0, )').version is None
+    assert index.resolve('Acme.Activities', '[2.0.0-alpha, )').version == '2.0.0-beta'
+    assert index.resolve('Acme.Activities', 'latest').version is None
+    assert index.resolve('Other.Activities', '1.0').path is None
+
+def test_index_cache(tmp_path):
+    """Packages are read once; later runs read what they export from the cache."""
+    path = str(tmp_path / 'feed' / 'Acme.Activities.1.0.0.nupkg')
+    build_package(path, ['Workflows/Get%20Text.xaml'])
+    cache_path = str(tmp_path / 'cache' / 'index.json')
+
+    index = PackageIndex([str(tmp_path / 'feed')], cache_path)
+    exports = index.get_exports(path)
+    assert exports.activities == ('Acme.Activities.Click', 'Acme.Activities.GetText')
+    assert exports.workflows == ('content/Workflows/Get Text.xaml',)
+    assert index.get_exports(path) is exports
+    assert index.opened == 1
+    index.save()
+
+    index = PackageIndex([str(tmp_path / 'feed')], cache_path)
+    assert index.get_exports(path) == exports
+    assert index.opened == 0
+
+    build_package(path)
+    assert index.get_exports(path).workflows == ()
+    assert index.opened == 1
+
+AMBIGUOUS_WORKFLOW = """<Activity x:Class="Main"
+ xmlns="http://schemas.microsoft.com/netfx/2009/xaml/activities"
+ xmlns:acme="clr-namespace:Acme.Activities;assembly=Acme.Activities"
+ xmlns:other="clr-namespace:Other.Activities;assembly=Other.Activities"
+ xmlns:sap2010="http://schemas.microsoft.com/netfx/2010/xaml/activities/presentation"
+ xmlns:x="http://schemas.microsoft.com/winfx/2006/xaml">
+  <Sequence sap2010:WorkflowViewState.IdRef="Sequence_1">
+    <acme:Click sap2010:WorkflowViewState.IdRef="Click_1" />
+    <acme:Click sap2010:WorkflowViewState.IdRef="Click_2" />
+    <other:Click sap2010:WorkflowViewState.IdRef="Click_3" />
+    <other:GetText sap2010:WorkflowViewState.IdRef="GetText_1" />
+  </Sequence>
+</Activity>
+"""
+
+def test_ambiguous_activity_names(tmp_path):
+    """Activities of the same name in two packages are told apart by their clr-namespace."""
+    for package in ('Acme.Activities', 'Other.Activities'):
+        build_package(str(tmp_path / 'feed' / f'{package}.1.0.0.nupkg'), namespace=package)
+    dependencies = Dependencies({'Acme.Activities': '1.0.0', 'Other.Activities': '1.0.0'},
+        PackageIndex([str(tmp_path / 'feed')]))
+    assert dependencies.by_name['Click'] is None
+
+    workflow_path = tmp_path / 'Main.xaml'
+    workflow_path.write_text(AMBIGUOUS_WORKFLOW, encoding='utf-8')
+    metrics = extract_workflow(str(workflow_path)).activity_metrics
+    assert metrics.activity_counts == {'Sequence': 1, 'Click': 3, 'GetText': 1}
+    assert dependencies.get_used_activities([metrics.tag_counts]) == {
+        'Acme.Activities': {'Click': 2},
+        'Other.Activities': {'Click': 1, 'GetText': 1},
+    }
+
+def generate_dependent_project(tmp_path) -> str:
+    """A project depending on Acme.Activities, found in the feed folder, and on a missing one."""
+    project_directory = tmp_path / 'project'
+    generate_project(str(project_directory), ProjectSize(workflows=3))
+    project_file = project_directory / 'project.json'
+    properties = json.loads(project_file.read_text(encoding='utf-8'))
+    properties['dependencies'] = {'Acme.Activities': '[1.0.0]', 'Missing.Activities': '1.0'}
+    project_file.write_text(json.dumps(properties), encoding='utf-8')
+    build_package(str(tmp_path / 'feed' / 'Acme.Activities.1.0.0.nupkg'))
+    return str(project_directory)
+
+def test_documented_dependencies(tmp_path):
+    """The documentation lists the dependencies, and the activities of theirs in use."""
+    project = Project(generate_dependent_project(tmp_path),
+        AnalysisOptions(packages=PackageIndex([str(tmp_path / 'feed')])))
+    documentation = ''.join(Documentation(project, build=False).render_documentation())
+    assert '<h2 id="dependencies">Dependencies</h2>' in documentation
+    assert '<td>2 activities, 0 workflows</td>\n            <td>Click (' in documentation
+    assert '<td>Missing.Activities</td>\n            <td>1.0</td>\n            <td>not found</td>' \
+        in documentation
+
+def test_documented_dependencies_budget(tmp_path):
+    """Within a memory budget, the activities are counted without loading the workflows again."""
+    project_directory = generate_dependent_project(tmp_path)
+    packages = PackageIndex([str(tmp_path / 'feed')])
+    documentation = ''.join(Documentation(Project(project_directory,
+        AnalysisOptions(packages=packages)), build=False).render_documentation())
+
+    project = Project(project_directory, AnalysisOptions(packages=packages,
+        budget=MemoryBudget(0)))
+    extracted: List[str] = []
+    project.workflow_files.on_extract = lambda relative_path, summary: extracted.append(
+        relative_path)
+    assert ''.join(Documentation(project, build=False).render_documentation()) == documentation
+    assert len(extracted) == len(set(extracted)) == len(project.workflow_files)
+
+def test_sharded_dependencies(tmp_path, monkeypatch):
+    """The index page counts the activities of the unchanged pages without loading them."""
+    project_directory = generate_dependent_project(tmp_path)
+    packages = PackageIndex([str(tmp_path / 'feed')])
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('deliverables')
+    ShardedDocumentation(Project(project_directory, AnalysisOptions(packages=packages)))
+    with open(os.path.join(TARGET_DIR, INDEX_FILE), encoding='utf-8') as index_file:
+        index_page = index_file.read()
+    assert '<td>Click (' in index_page
+
+    project = Project(project_directory, AnalysisOptions(packages=packages))
+    def extract(file_path):
+        raise AssertionError(f'{file_path} loaded')
+    project.workflow_files.extract = extract
+    ShardedDocumentation(project)
+    with open(os.path.join(TARGET_DIR, INDEX_FILE), encoding='utf-8') as index_file:
+        assert index_file.read() == index_page
+
+def test_global_packages_opt_in(tmp_path, monkeypatch):
+    """The global packages folder of NuGet is only looked up with --global-packages."""
+    project_directory = generate_dependent_project(tmp_path)
+    monkeypatch.setenv('NUGET_PACKAGES', str(tmp_path / 'feed'))
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('deliverables')
+    def read_documentation(*options: str) -> str:
+        main([project_directory, '--no-cache', *options])
+        with open(os.path.join(TARGET_DIR, TARGET_FILE), encoding='utf-8') as documentation_file:
+            return documentation_file.read()
+
+    assert 'id="dependencies"' not in read_documentation()
+    assert '<td>Click (' in read_documentation('--global-packages')
@@ -0,0 +1,52 @@
+"""Test the profiling of an analysis."""
+
+import json
+from os.path import join, dirname
+
+from analyzer import __main__
+from analyzer.analyze.project import Project
+from analyzer.profiler import Profiler, REPORT_FILE, TARGET_DIR, TRACE_FILE
+from benchmarks.generator import ProjectSize, generate_project
+
+def test_profile_assets(tmp_path):
+    """Every parsed file is reported, and the phases appear on the timeline."""
+    profiler = Profiler(enabled=True)
+    project = Project(join(dirname(__file__), 'assets/'))
+    profiler.instrument(project)
+    with profiler.phase('extraction'):
+        project.workflow_files.load_all()
+    profiler.write_report(str(tmp_path))
+
+    with open(tmp_path / REPORT_FILE, encoding='utf-8') as report_file:
+        report = json.load(report_file)
+    assert report['counters']['files'] == len(project.workflow_files)
+    assert report['counters']['elements_visited'] > report['counters']['files']
+    assert 'extraction' in report['phases']
+    assert {entry['file'] for entry in report['slowestFiles']} >= {'Main.xaml', 'Process.xaml'}
+
+    with open(tmp_path / TRACE_FILE, encoding='utf-8') as trace_file:
+        events = json.load(trace_file)['traceEvents']
+    assert {event['cat'] for event in events} == {'phase', 'parse'}
+
+def test_profile_disabled(tmp_path):
+    """A disabled profiler measures and writes nothing."""
+    profiler = Profiler()
+    with profiler.phase('extraction'):
+        pass
+    profiler.write_report(str(tmp_path))
+    assert profiler.phases == {}
+    assert not list(tmp_path.iterdir())
+
+def test_profile_batch(tmp_path, monkeypatch):
+    """The projects of a batch are profiled into one report."""
+    root = tmp_path / 'root'
+    generate_project(str(root / 'First'), ProjectSize(workflows=4))
+    generate_project(str(root / 'Second'), ProjectSize(workflows=3))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(__main__, 'profiler', Profiler())
+    __main__.main([str(root), '--batch', '--no-cache', '--profile'])
+
+    with open(tmp_path / TARGET_DIR / REPORT_FILE, encoding='utf-8') as report_file:
+        report = json.load(report_file)
+    assert report['counters']['files'] == 7
+    assert 'documentation' in report['phases']
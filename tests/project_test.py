@@ -2,6 +2,7 @@
 
 from os.path import join, dirname
 
+from analyzer.analyze.options import AnalysisOptions
 from analyzer.analyze.project import Project
 
 def test_project():
@@ -11,3 +12,13 @@ def test_project():
 
     assert project.name == "MISSING NAME"
     assert project.description == "UiPath REFramework Template"
+
+def test_project_parallel():
+    """Parallel loading yields the same workflows in the same order."""
+    project_directory: str = join(dirname(__file__), 'assets/')
+    sequential = [workflow.display_name for workflow in Project(project_directory).workflow_files]
+    parallel = [workflow.display_name
+        for workflow in Project(project_directory, AnalysisOptions(jobs=2)).workflow_files]
+
+    assert parallel == sequential
+    assert 'General Business Process' in parallel
@@ -0,0 +1,43 @@
+"""Test the streaming writers of the review results."""
+
+import lxml.etree as ET
+import pytest
+
+from analyzer.review.finding import Finding
+from analyzer.review.results import JUNIT, NUNIT, write_results
+
+RULES = ['workflows.annotationRequired', 'variables.namingConvention']
+FINDINGS = [
+    Finding(RULES[1], 'Main.xaml', 'Config', 'does not match [a-z]+'),
+    Finding(RULES[1], 'Process.xaml', 'Item', 'does not match [a-z]+'),
+]
+
+def test_nunit(tmp_path):
+    """Totals are computed for the run and for each suite; passed rules get a passed case."""
+    path = str(tmp_path / 'results.xml')
+    write_results(path, 'Project', RULES, iter(FINDINGS), NUNIT)
+
+    test_run = ET.parse(path).getroot()
+    assert (test_run.get('total'), test_run.get('failed'), test_run.get('passed')) == (
+        '3', '2', '1')
+    passed_suite, failed_suite = test_run
+    assert passed_suite.get('result') == 'Passed'
+    assert failed_suite.get('failed') == '2'
+    assert [case.get('name') for case in failed_suite] == [
+        'Main.xaml: Config', 'Process.xaml: Item']
+    assert failed_suite.findtext('test-case/failure/message') == 'does not match [a-z]+'
+
+def test_junit(tmp_path):
+    """The same results, as JUnit testsuites."""
+    path = str(tmp_path / 'results.xml')
+    write_results(path, 'Project', RULES, FINDINGS, JUNIT)
+
+    test_suites = ET.parse(path).getroot()
+    assert (test_suites.get('tests'), test_suites.get('failures')) == ('3', '2')
+    assert len(test_suites[1].findall('testcase/failure')) == 2
+
+def test_ungrouped_findings(tmp_path):
+    """Findings must come grouped by rule, in the order of the rules."""
+    with pytest.raises(ValueError):
+        write_results(str(tmp_path / 'results.xml'), 'Project', RULES,
+            [FINDINGS[0], Finding(RULES[0], 'Main.xaml', 'Main.xaml', 'has no annotation')])
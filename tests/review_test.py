@@ -0,0 +1,41 @@
+"""Test the review of a project against the validation rules."""
+
+from os.path import join, dirname
+
+from analyzer.analyze.project import Project
+from analyzer.review.review import (
+    Columns, Review, check_default_name, check_max_nesting, check_naming_convention)
+
+def test_naming_convention():
+    """Names must match the pattern entirely."""
+    columns = Columns()
+    for name in ['in_Config', 'in_TransactionItem', 'Config', 'in_TransactionItem']:
+        columns.append('Main.xaml', name, None)
+
+    failing_rows = [row for row, _ in check_naming_convention(r'in_([A-Z][a-z]+)+')(columns)]
+    assert failing_rows == [2]
+
+def test_review():
+    """The assets violate some of the default rules."""
+    review = Review(Project(join(dirname(__file__), 'assets/')))
+
+    assert not review.passed
+    assert 'variables.namingConvention' in review.rules_checked
+    failing_rules = {finding.rule for finding in review.findings}
+    assert 'inArguments.defaultValueRequired' in failing_rules
+    assert 'workflows.namingConvention' not in failing_rules
+
+def test_activity_rules():
+    """The nesting depth and the default names are checked on the extracted metrics."""
+    columns = Columns()
+    columns.append('Main.xaml', 'Main.xaml', None)
+    columns.metrics.nesting_depths.append(3)
+    columns.metrics.deepest_paths.append(('Main', 'If', 'Then'))
+    assert list(check_max_nesting(2)(columns)) == [
+        (0, 'has 3 nested activity layers (more than 2): Main > If > Then')]
+
+    columns = Columns()
+    for id_ref, activity_type in [('If_1', 'If'), ('Delay_1', 'Delay')]:
+        columns.append('Main.xaml', id_ref, None)
+        columns.activities.activity_types.append(activity_type)
+    assert [row for row, _ in check_default_name(['If'])(columns)] == [0]
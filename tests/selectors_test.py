@@ -0,0 +1,30 @@
+"""Test the analysis of the selectors."""
+
+from analyzer.analyze.selectors import SelectorAnalyzer, analyze_selector
+from analyzer.review.review import Columns, check_selector
+
+def test_analyze_selector():
+    """idx, wildcards and regular expressions are found; invalid XML is reported."""
+    assert analyze_selector("<wnd app='notepad.exe' cls='Notepad' />") == analyze_selector('')
+    assert analyze_selector("<wnd app='excel.exe' /><ctrl role='cell' idx='3' />").idx == (
+        "ctrl idx='3'",)
+    assert analyze_selector("<html title='Portal*' />").wildcards == ("html title='Portal*'",)
+    regex = analyze_selector("<html matching:title='regex' title='^Report.*' />")
+    assert regex.regex == ("html title='^Report.*'",)
+    assert regex.wildcards == ()
+    assert analyze_selector("<wnd app='notepad.exe'").error is not None
+    assert analyze_selector("[\"<wnd title='\" + strTitle + \"' />\"]").dynamic
+    assert analyze_selector('{x:Null}').dynamic
+
+def test_selector_cache():
+    """Every distinct selector is parsed once; each occurrence gets a finding."""
+    analyzer = SelectorAnalyzer()
+    columns = Columns()
+    for owner in ['Click (Click_1)', 'Click (Click_2)', 'Type Into (TypeInto_1)']:
+        columns.append('Main.xaml', owner, None)
+        columns.activities.selectors.append("<wnd app='excel.exe' /><ctrl idx='2' />")
+
+    checker = check_selector(analyzer, lambda analysis: 'uses idx' if analysis.idx else None)
+    assert [row for row, _ in checker(columns)] == [0, 1, 2]
+    assert len(analyzer) == 1
+    assert analyzer.hits == 2
@@ -0,0 +1,32 @@
+"""Test the multi-page documentation."""
+
+import json
+import os
+from os.path import join, dirname
+
+from analyzer.analyze.project import Project
+from analyzer.render.sharded import (
+    ShardedDocumentation, INDEX_FILE, PAGES_DIR, SEARCH_INDEX_FILE)
+from analyzer.render.documentation import TARGET_DIR
+
+def test_sharded_documentation(tmp_path, monkeypatch):
+    """One page per workflow is written, and unchanged pages are not rendered again."""
+    project_directory = join(dirname(__file__), 'assets/')
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'deliverables').mkdir()
+
+    ShardedDocumentation(Project(project_directory))
+
+    pages = sorted(os.listdir(join(TARGET_DIR, PAGES_DIR)))
+    assert len(pages) == 4
+    assert os.path.exists(join(TARGET_DIR, INDEX_FILE))
+    with open(join(TARGET_DIR, SEARCH_INDEX_FILE), encoding='utf-8') as search_index_file:
+        search_index = json.load(search_index_file)
+    assert search_index['workflows'][0][0] == 'General Business Process'
+    assert search_index['workflows'][0][3] == ['in_OrchestratorQueueName']
+
+    modified_times = {page: os.stat(join(TARGET_DIR, PAGES_DIR, page)).st_mtime_ns
+        for page in pages}
+    ShardedDocumentation(Project(project_directory))
+    assert modified_times == {page: os.stat(join(TARGET_DIR, PAGES_DIR, page)).st_mtime_ns
+        for page in pages}
@@ -0,0 +1,60 @@
+"""Test the snapshots of the workflow metrics, and their comparison with a baseline."""
+
+import os
+
+from analyzer.analyze.project import Project
+from analyzer.analyze.snapshot import Snapshot, SnapshotDelta, WorkflowMetrics
+from analyzer.review.review import Review
+from benchmarks.generator import ProjectSize, generate_project
+
+def test_snapshot(tmp_path):
+    """The snapshot is read back as written."""
+    generate_project(str(tmp_path / 'project'), ProjectSize(workflows=3, fan_out=2))
+    snapshot = Snapshot.from_project(Project(str(tmp_path / 'project')))
+    snapshot.write(str(tmp_path / 'metrics.json'))
+
+    restored = Snapshot.read(str(tmp_path / 'metrics.json'))
+    assert restored.workflows == snapshot.workflows
+    metrics = restored.workflows['Module1/Workflow1.xaml']
+    assert isinstance(metrics, WorkflowMetrics)
+    assert (metrics.arguments, metrics.variables, metrics.annotated,
+        metrics.annotated_arguments, metrics.fan_out) == (4, 4, 1, 4, 0)
+    assert restored.workflows['Main.xaml'].fan_out == 2
+
+def test_compare_with_baseline(tmp_path):
+    """A new argument and a new unannotated workflow fail the review; nothing else does."""
+    project_directory = str(tmp_path / 'project')
+    generate_project(project_directory, ProjectSize(workflows=3))
+    baseline = Snapshot.from_project(Project(project_directory))
+
+    changed = os.path.join(project_directory, 'Module1', 'Workflow1.xaml')
+    with open(changed, encoding='utf-8') as workflow_file:
+        content = workflow_file.read()
+    with open(changed, 'w', encoding='utf-8') as workflow_file:
+        workflow_file.write(content.replace('  </x:Members>',
+            '    <x:Property sap2010:Annotation.AnnotationText="New." Name="in_NewValue" '
+            'Type="InArgument(x:String)" />\n  </x:Members>'))
+    with open(os.path.join(project_directory, 'Module2', 'Workflow2.xaml'),
+            encoding='utf-8') as workflow_file:
+        content = workflow_file.read()
+    with open(os.path.join(project_directory, 'Module2', 'Workflow3.xaml'), 'w',
+            encoding='utf-8') as workflow_file:
+        workflow_file.write(content.replace(
+            'sap2010:Annotation.AnnotationText="Generated workflow number 2."', ''))
+
+    project = Project(project_directory)
+    delta = SnapshotDelta(baseline, Snapshot.from_project(project))
+    assert delta.added == ['Module2/Workflow3.xaml']
+    assert delta.removed == []
+    assert delta.changed == {
+        'Module1/Workflow1.xaml': {'arguments': (4, 5), 'annotated_arguments': (4, 5)}}
+    assert delta.coverage['workflows'] == (1.0, 0.75)
+
+    findings = [(finding.rule, finding.workflow, finding.subject)
+        for finding in Review(project, delta=delta).findings
+        if finding.rule.startswith('baseline.')]
+    assert findings == [
+        ('baseline.maxArgumentsIncrease', 'Module1/Workflow1.xaml', 'Module1/Workflow1.xaml'),
+        ('baseline.newWorkflowsAnnotationRequired', 'Module2/Workflow3.xaml',
+            'Module2/Workflow3.xaml'),
+        ('baseline.allowAnnotationCoverageDecrease', project.name, 'workflows')]
@@ -0,0 +1,73 @@
+"""Test tokenizing expressions, and resolving the identifiers they use to declarations."""
+
+import io
+import os
+
+from analyzer.analyze.expressions import CSHARP, tokenize_expression
+from analyzer.analyze.extractor import extract_workflow
+from analyzer.analyze.project import Project
+from analyzer.analyze.usages import Declaration, IdentifierIndex
+from analyzer.review.review import Review
+
+WORKFLOW = b"""<Activity x:Class="Scopes"
+    xmlns="http://schemas.microsoft.com/netfx/2009/xaml/activities"
+    xmlns:sap2010="http://schemas.microsoft.com/netfx/2010/xaml/activities/presentation"
+    xmlns:x="http://schemas.microsoft.com/winfx/2006/xaml">
+  <x:Members>
+    <x:Property Name="in_Name" Type="InArgument(x:String)" />
+  </x:Members>
+  <Sequence DisplayName="Outer" sap2010:WorkflowViewState.IdRef="Sequence_1">
+    <Sequence.Variables>
+      <Variable x:TypeArguments="x:Int32" Name="Counter" />
+    </Sequence.Variables>
+    <Sequence DisplayName="Inner" sap2010:WorkflowViewState.IdRef="Sequence_2">
+      <Sequence.Variables>
+        <Variable x:TypeArguments="x:Int32" Name="counter" />
+        <Variable x:TypeArguments="x:String" Name="Message" />
+      </Sequence.Variables>
+      <Assign sap2010:WorkflowViewState.IdRef="Assign_1">
+        <Assign.To><OutArgument x:TypeArguments="x:String">[Message]</OutArgument></Assign.To>
+        <Assign.Value>
+          <InArgument x:TypeArguments="x:String">[$"Hello {in_Name}, " + COUNTER.ToString]</InArgument>
+        </Assign.Value>
+      </Assign>
+    </Sequence>
+    <WriteLine Text="[Message]" sap2010:WorkflowViewState.IdRef="WriteLine_1" />
+  </Sequence>
+</Activity>
+"""
+
+def test_tokenize_expression():
+    """Strings, members and numbers are skipped; interpolation holes are not."""
+    assert tokenize_expression('row("Name").ToString + in_Name.Trim') == ('row', 'in_Name')
+    assert tokenize_expression('$"{Counter + 1:D2} of {{Total}}" & dt!Name') == (
+        'Counter', 'dt')
+    assert not tokenize_expression('"a ""quoted"" string"c')
+    assert tokenize_expression('@"C:\\temp" + path.Length > 1e5', CSHARP) == ('path',)
+
+def test_identifier_index():
+    """VB identifiers resolve case-insensitively to the innermost declaration."""
+    summary = extract_workflow('Scopes.xaml', io.BytesIO(WORKFLOW))
+    usages = IdentifierIndex(summary)
+    outer, inner = [variable.scope for variable in summary.variables[:2]]
+    assert usages.get_scope(inner).owner_display_name == 'Inner'
+    assert usages.get_scope(inner).parent == outer
+
+    assert usages.get_usage_count('in_Name', 0) == 1
+    assert usages.get_usage_count('Counter', outer) == 0
+    assert usages.get_usage_count('counter', inner) == 1
+    assert usages.get_shadowed('counter', inner) == Declaration('counter', outer)
+    assert [usage.id_ref for usage in usages.get_out_of_scope_usages('Message')] == [
+        'WriteLine_1']
+
+def test_review_usages():
+    """The counters of RunAllTests are declared twice, and the outer ones are never used."""
+    project = Project(os.path.join(os.path.dirname(__file__), 'assets'))
+    findings = [
+        (finding.rule, finding.subject, finding.message)
+        for finding in Review(project).findings
+        if finding.rule.startswith('variables.') and finding.workflow == 'RunAllTests.xaml']
+    assert ('variables.allowShadowing', 'StartTime',
+        'hides a declaration of Run All Tests (Sequence_2)') in findings
+    assert ('variables.mustBeUsed', 'dt_Tests', 'is never used') in findings
+    assert not any(rule == 'variables.checkScope' for rule, _, _ in findings)
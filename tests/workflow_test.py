@@ -1,6 +1,9 @@
 """Test for Workflow()"""
 
 import os
+import pickle
+
+from analyzer.analyze.records import ArgumentDirection
 from analyzer.analyze.workflow import Workflow
 
 def test_workflow():
@@ -8,3 +11,17 @@ def test_workflow():
     workflow_path = os.path.join(os.path.dirname(__file__), 'assets/Main.xaml')
     workflow_instance = Workflow(workflow_path)
     assert workflow_instance.display_name == 'General Business Process'
+
+def test_workflow_records():
+    """Arguments and variables are plain records; the parsed tree can be dropped."""
+    workflow_path = os.path.join(os.path.dirname(__file__), 'assets/Main.xaml')
+    workflow_instance = Workflow(workflow_path)
+    assert workflow_instance.get_root_activity() is not None
+
+    workflow_instance.drop_document()
+    restored = pickle.loads(pickle.dumps(workflow_instance.summary))
+    assert restored == workflow_instance.summary
+    argument = next(iter(workflow_instance.get_arguments()))
+    assert (argument.name, argument.direction, argument.type) == (
+        'in_OrchestratorQueueName', ArgumentDirection.in_arg, 'String')
+    assert all(variable.name for variable in workflow_instance.get_variables())